@@ -0,0 +1,100 @@
+"""
+Per-turn overhead of getting the sub-agents of the orchestrator,
+building them on every tool call (before) or taking them from the registry (after).
+
+A turn here gets a summary, a question and an article agent and resolves their model,
+as the first request of each agent does. No request is sent.
+
+Usage:
+  python benchmarks/bench_agent_registry.py
+  python benchmarks/bench_agent_registry.py -m claude -n 200
+"""
+
+import argparse
+import os
+import time
+
+from rich.console import Console
+from rich.table import Table
+
+from askademic.article import ArticleAgent
+from askademic.question import QuestionAgent
+from askademic.registry import AgentRegistry
+from askademic.summary import SummaryAgent
+from askademic.utils import choose_model
+
+console = Console()
+
+# resolving a model only needs the key to be set, nothing is sent
+for key in ["GEMINI_API_KEY", "ANTHROPIC_API_KEY"]:
+    os.environ.setdefault(key, "benchmark")
+
+
+def turn_before(model, model_settings):
+    agents = [
+        SummaryAgent(model),
+        QuestionAgent(model, model_settings),
+        ArticleAgent(model, model_settings, use_cache=True),
+    ]
+    for agent in agents:
+        agent_model = (
+            agent._summary_agent.model
+            if isinstance(agent, SummaryAgent)
+            else agent._agent.model
+        )
+        agent_model.wrapped
+
+
+def turn_after(registry, model, model_settings):
+    model = registry.model(model)
+    agents = [
+        registry.get(SummaryAgent, model),
+        registry.get(QuestionAgent, model, model_settings),
+        registry.get(ArticleAgent, model, model_settings, use_cache=True),
+    ]
+    for agent in agents:
+        model.wrapped
+
+
+def timed(turn, n_turns: int) -> list[float]:
+    timings = []
+    for _ in range(n_turns):
+        start = time.perf_counter()
+        turn()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent registry")
+    parser.add_argument("-m", "--model", choices=["gemini", "claude"], default="gemini")
+    parser.add_argument("-n", "--turns", type=int, default=100)
+    args = parser.parse_args()
+
+    model, model_settings = choose_model(args.model)
+    registry = AgentRegistry()
+
+    results = {
+        "before (built per call)": timed(
+            lambda: turn_before(model, model_settings), args.turns
+        ),
+        "after (registry)": timed(
+            lambda: turn_after(registry, model, model_settings), args.turns
+        ),
+    }
+
+    table = Table(title=f"Per-turn overhead, {args.turns} turns, {model}")
+    for column in ["", "slowest (ms)", "median (ms)", "p95 (ms)"]:
+        table.add_column(column)
+    for name, timings in results.items():
+        table.add_row(
+            name,
+            f"{1000 * max(timings):.2f}",
+            f"{1000 * timings[len(timings) // 2]:.3f}",
+            f"{1000 * timings[int(0.95 * len(timings))]:.3f}",
+        )
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
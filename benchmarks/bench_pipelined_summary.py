@@ -0,0 +1,156 @@
+"""
+End-to-end latency of summarising a day of a category, fetching the whole listing
+and then summarising it (before) or summarising each page as it arrives (after).
+
+arXiv is replaced by a local HTTP server answering with synthetic listings after
+a delay per request and per article, and the model by a function answering after
+a delay per call and per prompt token. Nothing is sent outside.
+
+Usage:
+  python benchmarks/bench_pipelined_summary.py
+  python benchmarks/bench_pipelined_summary.py -a 400 --min-interval 3 --page-size 100
+"""
+
+import argparse
+import asyncio
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+from rich.console import Console
+from rich.table import Table
+
+import askademic.listings
+from askademic.http_client import HttpClient
+from askademic.listings import ListingStore, load_listings, stream_listing
+from askademic.summary import Category, SummaryAgent
+from askademic.tokens import estimate_tokens
+
+console = Console()
+
+DAY = "2025-03-28"
+
+
+def make_handler(n_articles: int, request_delay: float, article_delay: float):
+    class ArxivStandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            start = int(params["start"][0])
+            page = range(start, min(n_articles, start + int(params["max_results"][0])))
+            time.sleep(request_delay + article_delay * len(page))
+
+            entries = "".join(
+                f"<entry><id>http://arxiv.org/abs/2503.{i:05d}v1</id>"
+                + f"<updated>{DAY}T10:00:00Z</updated>"
+                + f"<published>{DAY}T10:00:00Z</published>"
+                + f"<title>Article {i}</title>"
+                + f"<summary>Abstract {i}. {'Words of the abstract. ' * 50}</summary>"
+                + "</entry>"
+                for i in page
+            )
+            body = (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                + f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return ArxivStandIn
+
+
+def make_model(call_delay: float, token_delay: float) -> FunctionModel:
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        prompt = str(messages[-1].parts[-1].content)
+        await asyncio.sleep(call_delay + token_delay * estimate_tokens(prompt))
+        return ModelResponse(
+            parts=[ToolCallPart(info.output_tools[0].name, {"summary": "Summary."})]
+        )
+
+    return FunctionModel(respond)
+
+
+async def timed(agent: SummaryAgent) -> float:
+    category = Category(category_id="cs.LG", category_name="Machine Learning")
+    start = time.perf_counter()
+    await agent.summarise(category, latest_day=DAY)
+    return time.perf_counter() - start
+
+
+def run(args, pipelined: bool) -> float:
+    client = HttpClient(min_interval=args.min_interval)
+    with tempfile.TemporaryDirectory() as directory:
+        # a new store, so that the listing is fetched each time
+        store = ListingStore(Path(directory) / "listings.db")
+        agent = SummaryAgent(
+            make_model(args.call_delay, args.token_delay),
+            max_batch_tokens=args.batch_tokens,
+            cluster=False,
+            pipelined=pipelined,
+            use_llm_cache=False,
+        )
+        agent._page_size = args.page_size
+        agent._stream_listing = partial(stream_listing, store=store, client=client)
+        agent._retrieve_recent_articles = lambda category, latest_day, max_results: [
+            a["abstract"]
+            for a in load_listings(
+                category, latest_day, latest_day, store=store, client=client
+            )[latest_day][:max_results]
+        ]
+        try:
+            return asyncio.run(timed(agent))
+        finally:
+            store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipelined summaries")
+    parser.add_argument("-a", "--articles", type=int, default=300)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--batch-tokens", type=int, default=20_000)
+    parser.add_argument("--request-delay", type=float, default=1.0)
+    parser.add_argument("--article-delay", type=float, default=0.01)
+    parser.add_argument("--min-interval", type=float, default=0.0)
+    parser.add_argument("--call-delay", type=float, default=2.0)
+    parser.add_argument("--token-delay", type=float, default=0.0001)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        make_handler(args.articles, args.request_delay, args.article_delay),
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    askademic.listings.ARXIV_BASE_URL = f"http://127.0.0.1:{server.server_port}/"
+
+    try:
+        results = {
+            "before (fetch, then summarise)": run(args, pipelined=False),
+            "after (pipelined)": run(args, pipelined=True),
+        }
+    finally:
+        server.shutdown()
+
+    table = Table(
+        title=f"End-to-end latency, {args.articles} articles, "
+        + f"pages of {args.page_size}"
+    )
+    for column in ["", "latency (s)"]:
+        table.add_column(column)
+    for name, latency in results.items():
+        table.add_row(name, f"{latency:.2f}")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
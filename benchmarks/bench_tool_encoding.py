@@ -0,0 +1,91 @@
+"""
+Tokens of the tool outputs the models read, a page of search results and the
+abstracts of a listing, in the current format (before) and the compact encoding
+(after), with abstracts whole or clipped to a few sentences.
+
+Records are made from the arXiv metadata sample of the tests, unless a query is
+given, in which case a page of a real arXiv search is used.
+
+Usage:
+  python benchmarks/bench_tool_encoding.py
+  python benchmarks/bench_tool_encoding.py -n 20 --max-sentences 3
+  python benchmarks/bench_tool_encoding.py --query "lyapunov exponents"
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+from rich.console import Console
+from rich.table import Table
+
+from askademic.encoding import encode_abstracts, encode_articles
+from askademic.tokens import count_tokens
+from askademic.tools import _search_records
+
+console = Console()
+
+SAMPLE = (
+    Path(__file__).parents[1] / "tests" / "fixtures" / "arxiv-metadata-sample.jsonl"
+)
+CURSOR = "0123456789abcdef0123456789abcdef"
+
+
+def sample_records(n: int) -> list[dict]:
+    papers = []
+    for line in SAMPLE.read_text().splitlines():
+        try:
+            papers.append(json.loads(line))
+        except json.JSONDecodeError:
+            # the sample has an invalid line, for the ingestion tests
+            continue
+    # abstracts as arXiv gives them, with their line breaks and padding
+    return [
+        {
+            "article_link": f"https://arxiv.org/pdf/{p['id']}v{i // len(papers) + 1}",
+            "title": p["title"],
+            "abstract": p["abstract"],
+        }
+        for i, p in ((i, papers[i % len(papers)]) for i in range(n))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tool output encodings")
+    parser.add_argument("-n", "--results", type=int, default=20)
+    parser.add_argument("--max-sentences", type=int, default=3)
+    parser.add_argument("--query", default=None)
+    args = parser.parse_args()
+
+    if args.query:
+        records = _search_records(args.query, "abs", 0, args.results)
+    else:
+        records = sample_records(args.results)
+    abstracts = [r["abstract"] for r in records]
+
+    outputs = {
+        "search page, json (before)": encode_articles(records, next_page_cursor=CURSOR),
+        "search page, compact": encode_articles(
+            records, "compact", next_page_cursor=CURSOR
+        ),
+        f"search page, compact, {args.max_sentences} sentences": encode_articles(
+            records,
+            "compact",
+            max_sentences=args.max_sentences,
+            next_page_cursor=CURSOR,
+        ),
+        # the summaries used to format the list of abstracts as is
+        "listing abstracts, list (before)": str(abstracts),
+        "listing abstracts, compact": encode_abstracts(abstracts, "compact"),
+    }
+
+    table = Table(title=f"Tokens of tool outputs, {len(records)} articles")
+    for column in ["", "characters", "tokens"]:
+        table.add_column(column)
+    for name, text in outputs.items():
+        table.add_row(name, str(len(text)), str(count_tokens(text)))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
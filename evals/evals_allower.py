@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 from rich.console import Console
 
 from askademic.allower import allower_agent_base
+from askademic.allower_classifier import AllowerClassifier
 from askademic.prompts.general import USER_PROMPT_ALLOWER_TEMPLATE
 from askademic.utils import choose_model
 
@@ -34,6 +35,11 @@ eval_cases = [
     AllowerTestCase("Tell me a joke about physics.", False),
     AllowerTestCase("What are the implications of quantum entanglement?", True),
     AllowerTestCase("What is the meaning of life?", False),
+    AllowerTestCase("What is the best method to study for an exam?", False),
+    AllowerTestCase(
+        "Is the stock market going up tomorrow, give me a statistical proof", False
+    ),
+    AllowerTestCase("Who won the election 2024.12345", False),
 ]
 
 console = Console()
@@ -43,10 +49,7 @@ MAX_ATTEMPTS = 5
 
 async def run_evals(model_family: str):
 
-    allower_agent = allower_agent_base
     model, model_settings = choose_model(model_family)
-    allower_agent.model = model
-    allower_agent.model_settings = model_settings
 
     c_passed, c_failed = 0, 0
     for case in eval_cases:
@@ -56,8 +59,10 @@ async def run_evals(model_family: str):
             try:
 
                 print(f"Evaluating case: {case.question}")
-                response = await allower_agent.run(
-                    USER_PROMPT_ALLOWER_TEMPLATE.format(question=case.question)
+                response = await allower_agent_base.run(
+                    USER_PROMPT_ALLOWER_TEMPLATE.format(question=case.question),
+                    model=model,
+                    model_settings=model_settings,
                 )
 
                 if response.output.is_scientific != case.is_scientic_gt:
@@ -82,3 +87,33 @@ async def run_evals(model_family: str):
             + f":x: [bold red]Failed: {c_failed}[/bold red]"
         )
     console.print(f":white_check_mark: [bold green]Passed: {c_passed}[/bold green]")
+
+
+def run_local_evals():
+    """
+    Check the local fast path of the allower on the eval cases, offline.
+    The cases it leaves to the LLM are counted as deferred.
+    """
+    classifier = AllowerClassifier()
+
+    c_decided, c_correct = 0, 0
+    for case in eval_cases:
+        allowed = classifier.classify(case.question)
+        if allowed is None:
+            print(f"Deferred to the LLM: {case.question}")
+            continue
+        c_decided += 1
+        if allowed.is_scientific == case.is_scientic_gt:
+            c_correct += 1
+        else:
+            print(f"Test failed for question: {case.question}")
+
+    console.print(f"[bold cyan]Total cases: {len(eval_cases)}[/bold cyan]")
+    console.print(f"[bold cyan]Decided locally: {c_decided}[/bold cyan]")
+    console.print(
+        f"[bold green]Correct local decisions: {c_correct}/{c_decided}[/bold green]"
+    )
+
+
+if __name__ == "__main__":
+    run_local_evals()
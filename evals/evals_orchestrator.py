@@ -12,7 +12,7 @@ from rich.console import Console
 
 from askademic.article import ArticleResponse
 from askademic.general import GeneralResponse
-from askademic.orchestrator import orchestrator_agent_base
+from askademic.orchestrator import Context, orchestrator_agent_base
 from askademic.question import QuestionAnswerResponse
 from askademic.summary import SummaryResponse
 from askademic.utils import choose_model
@@ -78,10 +78,7 @@ MAX_ATTEMPTS = 5
 
 async def run_evals(model_family: str):
 
-    orchestrator_agent = orchestrator_agent_base
     model, model_settings = choose_model(model_family)
-    orchestrator_agent.model = model
-    orchestrator_agent.model_settings = model_settings
 
     c_passed, c_failed = 0, 0
     for case in eval_cases:
@@ -92,8 +89,11 @@ async def run_evals(model_family: str):
             try:
                 print(f"Evaluating case: {case.request}")
 
-                response = await orchestrator_agent.run(
+                response = await orchestrator_agent_base.run(
                     case.request,
+                    model=model,
+                    model_settings=model_settings,
+                    deps=Context(model=model, model_settings=model_settings),
                     usage_limits=UsageLimits(request_limit=20),  # limit requests
                 )
                 if not isinstance(response.output.response, case.response_type):
@@ -0,0 +1,97 @@
+import logging
+from datetime import datetime
+
+from askademic.allower import AllowResponse
+from askademic.category_classifier import FILLER_WORDS, stem, tokenize
+from askademic.taxonomy import get_taxonomy
+from askademic.utils import find_arxiv_id
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+# words of research topics, besides the vocabulary of the arXiv categories
+TOPIC_WORDS = {
+    "conjecture", "crispr", "entanglement", "gene", "genome", "lemma", "llm",
+    "molecule", "neural", "neuroscience", "particle", "protein", "quantum",
+    "spectroscopy", "theorem", "transformer",
+}  # fmt: skip
+
+# words of scientific requests that are everyday words too: they support a topic,
+# but are not enough on their own, e.g. "the best method to study for an exam"
+SUPPORT_WORDS = {
+    "accuracy", "algorithm", "benchmark", "cell", "climate", "dataset", "diffusion",
+    "empirical", "equation", "evaluation", "experiment", "experimental",
+    "hypothesis", "inference", "method", "methodology", "optimization", "proof",
+    "regression", "simulation", "statistical",
+}  # fmt: skip
+
+# words of category names that are everyday words too
+COMMON_WORDS = {
+    "and", "art", "game", "general", "history", "life", "management", "market",
+    "other", "overview", "popular", "portfolio", "pricing", "risk", "social",
+    "society", "sound", "trading",
+}  # fmt: skip
+
+# words saying a request is about research, but not about what
+REQUEST_WORDS = {"arxiv", "paper", "preprint", "research", "study"}
+
+# words asking about the article of an ID, e.g. "What does 2401.12345 say?"
+ARTICLE_WORDS = {
+    "about", "article", "explain", "read", "say", "summarise", "summarize",
+    "summary",
+}  # fmt: skip
+
+# words that make a request look like small talk or a joke, whatever its topic
+NON_SCIENTIFIC_WORDS = {
+    "cake", "chat", "coffee", "cook", "cooking", "dating", "film", "football",
+    "funny", "hello", "hey", "hi", "holiday", "horoscope", "joke", "lyric",
+    "movie", "poem", "pun", "recipe", "riddle", "song", "story", "travel",
+    "vacation", "weather",
+}  # fmt: skip
+
+
+class AllowerClassifier:
+    """
+    Accept clearly scientific requests without calling the allower LLM.
+    A request is clearly scientific if it has an arXiv URL, or an arXiv ID and words
+    about articles, or a category ID, or at least min_hits distinct words of
+    scientific requests, one of them at least about a topic (from the vocabulary of
+    the arXiv categories, or TOPIC_WORDS), and no word of small talk.
+    Returns None otherwise, and the caller asks the LLM: requests are never rejected
+    locally, nor accepted on account of the conversation they follow.
+    """
+
+    def __init__(self, min_hits: int = 2):
+        self._min_hits = min_hits
+        self._taxonomy = get_taxonomy()
+
+        vocabulary = set()
+        for phrase in list(self._taxonomy.phrases) + list(self._taxonomy.aliases):
+            vocabulary.update(stem(t) for t in tokenize(phrase))
+        vocabulary -= FILLER_WORDS | COMMON_WORDS | SUPPORT_WORDS | REQUEST_WORDS
+        self._topics = vocabulary | TOPIC_WORDS
+
+    def classify(self, request: str) -> AllowResponse | None:
+        """The allower response if the request is clearly scientific, None otherwise."""
+        tokens = tokenize(request)
+        stems = {stem(t) for t in tokens}
+        if find_arxiv_id(request) and (
+            "arxiv.org" in request.lower() or stems & (ARTICLE_WORDS | REQUEST_WORDS)
+        ):
+            return self._accept(request, "arXiv ID")
+
+        if any(self._taxonomy.canonical_id(t) for t in tokens if "." in t):
+            return self._accept(request, "category ID")
+
+        if stems & NON_SCIENTIFIC_WORDS:
+            return None
+        topics = stems & self._topics
+        support = stems & (SUPPORT_WORDS | REQUEST_WORDS)
+        if topics and len(topics | support) >= self._min_hits:
+            return self._accept(request, "vocabulary")
+        return None
+
+    def _accept(self, request: str, method: str) -> AllowResponse:
+        logger.info(f"{datetime.now()}: Allowed locally ({method}): {request[:100]}")
+        return AllowResponse(is_scientific=True, pun="")
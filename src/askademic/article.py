@@ -1,19 +1,74 @@
+import asyncio
 import logging
 import re
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.settings import ModelSettings
 
-from askademic.prompts.general import SYSTEM_PROMPT_ARTICLE_AGENT
-from askademic.tools import get_article, search_articles_by_title
+from askademic.encoding import check_encoding, default_encoding
+from askademic.llm_cache import cached_model
+from askademic.passages import ARTICLE_TAGS_PATTERN
+from askademic.progress import report_progress
+from askademic.prompts.general import (
+    SYSTEM_PROMPT_ARTICLE_AGENT,
+    SYSTEM_PROMPT_ARTICLE_READER,
+    USER_PROMPT_ARTICLE_TEMPLATE,
+)
+from askademic.taxonomy import get_taxonomy
+from askademic.tokens import TokenBudget, turn_budget
+from askademic.tools import get_article, next_page, search_articles_by_title
+from askademic.utils import extract_arxiv_id, find_arxiv_ids
 
 today = datetime.now().strftime("%Y-%m-%d")
 logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
 logger = logging.getLogger(__name__)
 
 
+# words of requests to explain or summarise an article, or asking about it
+READING_WORDS = {
+    "describe", "does", "explain", "how", "summarise", "summarize", "summary",
+    "tell", "tldr", "what", "which", "who", "why",
+}  # fmt: skip
+
+# words of requests that look for other articles, e.g. "papers citing 1706.03762"
+SEARCH_WORDS = {
+    "after", "articles", "before", "cite", "cited", "cites", "citing", "compare",
+    "find", "latest", "list", "newest", "other", "others", "papers", "recent",
+    "related", "search", "similar", "since",
+}  # fmt: skip
+
+
+def article_to_read(request: str) -> str | None:
+    """
+    The arXiv ID of the article a request is about, if the request can be answered by
+    reading that article alone: it names exactly one article, by ID or link, and
+    besides it has nothing but words explaining, summarising or asking about it.
+    Returns None otherwise, e.g. for "find papers similar to 1706.03762".
+    """
+    arxiv_ids = find_arxiv_ids(request)
+    if len(arxiv_ids) != 1:
+        return None
+
+    words = []
+    for word in request.lower().split():
+        word = word.strip("()[]<>{},;:!?.\"'")
+        if word and not extract_arxiv_id(word):
+            words.append(word)
+    if not words:
+        return arxiv_ids[0]
+
+    taxonomy = get_taxonomy()
+    if set(words) & SEARCH_WORDS or any(
+        taxonomy.canonical_id(w) for w in words if "." in w
+    ):
+        return None
+    if set(words) & READING_WORDS or request.rstrip().endswith("?"):
+        return arxiv_ids[0]
+    return None
+
+
 class ArticleResponse(BaseModel):
     """
     The response to the article agent.
@@ -32,14 +87,43 @@ class ArticleResponse(BaseModel):
 class ArticleAgentDeps(BaseModel):
     """Dependencies for the article agent."""
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     use_cache: bool = True
+    # what the tool outputs of the run can still take
+    budget: TokenBudget = Field(default_factory=TokenBudget)
+    # how search results are written
+    encoding: str = "json"
+    max_sentences: int | None = None
+
+
+def prefetch_article(arxiv_id: str, use_cache: bool = True) -> asyncio.Task:
+    """Start fetching the PDF of an article in the background."""
+    link = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+    logger.info(f"{datetime.now()}: Prefetching {link}")
+    report_progress(f"Fetching the PDF of {link}")
+    return asyncio.create_task(
+        asyncio.to_thread(get_article, link, use_cache=use_cache)
+    )
 
 
 class ArticleAgent:
     def __init__(
-        self, model: str, model_settings: ModelSettings = None, use_cache: bool = True
+        self,
+        model: str,
+        model_settings: ModelSettings = None,
+        use_cache: bool = True,
+        use_llm_cache: bool = True,
+        encoding: str | None = None,
+        max_sentences: int | None = None,
     ):
         self.use_cache = use_cache
+        # how search results are written, json or compact (default ASKADEMIC_ENCODING)
+        self._encoding = check_encoding(encoding or default_encoding())
+        self._max_sentences = max_sentences
+        model = cached_model(model, use_llm_cache)
+        # the tokens of tool outputs per run
+        self._turn_tokens = turn_budget(model)
 
         self._agent = Agent(
             model=model,
@@ -49,19 +133,53 @@ class ArticleAgent:
             deps_type=ArticleAgentDeps,
         )
 
+        # answers from the text of an article fetched beforehand, without tools
+        self._reader_agent = Agent(
+            model=model,
+            model_settings=model_settings,
+            system_prompt=SYSTEM_PROMPT_ARTICLE_READER,
+            output_type=ArticleResponse,
+        )
+
         @self._agent.tool
         def search_by_title(ctx: RunContext[ArticleAgentDeps], title: str) -> str:
             """
             Search arXiv for articles matching a title.
-            Returns a JSON string with article links and abstracts.
+            Returns the articles found, with their arXiv IDs (or links), titles
+            and abstracts, and the cursor of the next results.
 
             Args:
                 title: The title or keywords to search for.
             """
             logger.info(f"{datetime.now()}: Searching articles by title: {title}")
-            result = search_articles_by_title(title)
+            report_progress(f"Searching arXiv for the title: {title}")
+            budget = ctx.deps.budget
+            result = search_articles_by_title(
+                title,
+                max_tokens=budget.allowance(),
+                encoding=ctx.deps.encoding,
+                max_sentences=ctx.deps.max_sentences,
+            )
             logger.info(f"{datetime.now()}: Search results: {result[:200]}...")
-            return result
+            return budget.spend(result)
+
+        @self._agent.tool
+        def next_search_page(ctx: RunContext[ArticleAgentDeps], cursor: str) -> str:
+            """
+            Get the next results of a title search, from its next_page_cursor.
+
+            Args:
+                cursor: The next_page_cursor returned by the previous search or page.
+            """
+            logger.info(f"{datetime.now()}: Getting the next page of a search")
+            budget = ctx.deps.budget
+            result = next_page(
+                cursor,
+                max_tokens=budget.allowance(),
+                encoding=ctx.deps.encoding,
+                max_sentences=ctx.deps.max_sentences,
+            )
+            return budget.spend(result)
 
         @self._agent.tool
         def fetch_article(ctx: RunContext[ArticleAgentDeps], link: str) -> str:
@@ -75,9 +193,15 @@ class ArticleAgent:
             # Normalize the link to PDF format
             normalized_link = self._normalize_arxiv_link(link)
             logger.info(f"{datetime.now()}: Fetching article: {normalized_link}")
-            result = get_article(normalized_link, use_cache=ctx.deps.use_cache)
+            report_progress(f"Fetching the PDF of {normalized_link}")
+            budget = ctx.deps.budget
+            result = get_article(
+                normalized_link,
+                use_cache=ctx.deps.use_cache,
+                max_tokens=budget.allowance(),
+            )
             logger.info(f"{datetime.now()}: Article fetched, length: {len(result)}")
-            return result
+            return budget.spend(result)
 
     def _normalize_arxiv_link(self, link: str) -> str:
         """
@@ -115,6 +239,14 @@ class ArticleAgent:
         # If we couldn't parse it, return as-is and let the downstream handle the error
         return link
 
+    def _deps(self) -> ArticleAgentDeps:
+        return ArticleAgentDeps(
+            use_cache=self.use_cache,
+            budget=TokenBudget(self._turn_tokens),
+            encoding=self._encoding,
+            max_sentences=self._max_sentences,
+        )
+
     async def run(self, request: str):
         """
         Run the article agent to answer a question about an article.
@@ -128,7 +260,13 @@ class ArticleAgent:
         """
         logger.info(f"{datetime.now()}: ArticleAgent received request: {request}")
 
-        deps = ArticleAgentDeps(use_cache=self.use_cache)
+        # a request to read a single article given by ID or link needs no search
+        # nor tool call
+        arxiv_id = article_to_read(request)
+        if arxiv_id is not None:
+            return await self.read(request, arxiv_id)
+
+        deps = self._deps()
         result = await self._agent.run(request, deps=deps)
 
         # Normalize the article_link to PDF format in the output
@@ -138,3 +276,41 @@ class ArticleAgent:
 
         logger.info(f"{datetime.now()}: ArticleAgent completed request")
         return result
+
+    async def read(
+        self, request: str, arxiv_id: str, fetch: asyncio.Task | None = None
+    ):
+        """
+        Answer a request about an article whose arXiv ID is known.
+        The PDF is fetched straight away, and the model reads it in a single call.
+        If the article cannot be fetched, the request goes through the tools instead.
+
+        Args:
+            request: The question to answer about the article.
+            arxiv_id: The arXiv ID of the article.
+            fetch: The fetch of the article, if already started with prefetch_article.
+
+        Returns:
+            The agent result, with article_link in PDF format.
+        """
+        link = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
+        logger.info(f"{datetime.now()}: ArticleAgent reading {link} directly")
+        if fetch is None:
+            fetch = prefetch_article(arxiv_id, use_cache=self.use_cache)
+
+        article = await fetch
+        # get_article wraps its text in tags, and gives no text if it could not
+        # connect
+        if ARTICLE_TAGS_PATTERN.sub("", article) in ("", "Article Not Found"):
+            logger.info(f"{datetime.now()}: {link} not found, using the tools")
+            deps = self._deps()
+            return await self._agent.run(request, deps=deps)
+
+        report_progress(f"Reading {link}")
+        result = await self._reader_agent.run(
+            USER_PROMPT_ARTICLE_TEMPLATE.format(article=article, request=request)
+        )
+        result.output.article_link = link
+
+        logger.info(f"{datetime.now()}: ArticleAgent completed request")
+        return result
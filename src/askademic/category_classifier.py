@@ -0,0 +1,208 @@
+import difflib
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from askademic.taxonomy import get_taxonomy
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+# words of a summary request that say nothing about its topic
+FILLER_WORDS = {
+    "a", "about", "advancements", "advances", "all", "an", "and", "any", "are",
+    "arxiv", "article", "articles", "been", "can", "category", "day",
+    "developments", "do", "does", "findings", "for", "from", "get",
+    "give", "has", "have", "in", "is", "last", "latest", "literature", "me",
+    "most", "new", "newest", "of", "on", "paper", "papers", "please",
+    "publications", "published", "recent", "recently", "research", "show",
+    "summarise", "summarize", "summary", "tell", "the", "there", "this", "to",
+    "today", "topic", "trends", "what", "whats", "with", "work", "works",
+    "yesterday", "you",
+}  # fmt: skip
+
+
+@dataclass
+class CategoryMatch:
+    category_id: str
+    category_name: str
+    method: str
+    confidence: float
+
+
+def get_decisions_path() -> Path:
+    """Create and return the path of the learned category decisions"""
+    cache_dir = Path(os.path.expanduser("~/.askademic/cache"))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir / "category_decisions.json"
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower().replace("'", ""))
+
+
+def stem(token: str) -> str:
+    """Crude plural stripping, enough for "galaxy" to match "galaxies"."""
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("s") and not token.endswith("ss") and len(token) > 3:
+        return token[:-1]
+    return token
+
+
+class CategoryClassifier:
+    """
+    Map a summary request to a category of the taxonomy without calling an LLM,
+    when the answer is clear. Tried in order:
+    - past decisions for the same topic (learned from the LLM fallback)
+    - a category ID in the request (e.g. "cs.CL")
+    - the topic being exactly a category name or alias
+    - a category name or alias covering most of the topic, if no other
+      category is named
+    - a fuzzy match of the topic with a name or alias
+    - a TF-IDF model over the words of the names and aliases, if the best
+      category clearly beats the second one
+    Returns None otherwise, and the caller asks the LLM.
+    """
+
+    def __init__(
+        self,
+        decisions_path: Path | None = None,
+        min_score: float = 0.8,
+        min_margin: float = 0.25,
+        max_decisions: int = 5000,
+    ):
+        self._decisions_path = decisions_path or get_decisions_path()
+        self._min_score = min_score
+        self._min_margin = min_margin
+        self._max_decisions = max_decisions
+        self._lock = threading.Lock()
+
+        self._taxonomy = get_taxonomy()
+        self._names = {cid: c.name for cid, c in self._taxonomy.categories.items()}
+        # names and aliases, lowercased, to category IDs
+        self._phrases = self._taxonomy.phrases
+
+        self._decisions = self._load_decisions()
+        self._build_tfidf()
+
+    def _load_decisions(self) -> dict[str, str]:
+        if not self._decisions_path.exists():
+            return {}
+        try:
+            return json.loads(self._decisions_path.read_text())
+        except json.JSONDecodeError:
+            return {}
+
+    def _build_tfidf(self):
+        documents: dict[str, Counter] = {cid: Counter() for cid in self._names}
+        phrases = [(name, cid) for cid, name in self._names.items()]
+        for phrase, cid in phrases + list(self._taxonomy.aliases.items()):
+            documents[cid].update(stem(t) for t in tokenize(phrase))
+
+        document_frequency = Counter()
+        for terms in documents.values():
+            document_frequency.update(terms.keys())
+        n = len(documents)
+        self._idf = {t: math.log(n / df) + 1 for t, df in document_frequency.items()}
+        self._vectors = {cid: self._tfidf(terms) for cid, terms in documents.items()}
+
+    def _tfidf(self, terms: Counter) -> dict[str, float]:
+        # words unknown to the model get the highest weight: a query made mostly
+        # of them does not look like any category
+        max_idf = max(self._idf.values(), default=1.0)
+        vector = {t: c * self._idf.get(t, max_idf) for t, c in terms.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {t: v / norm for t, v in vector.items()}
+
+    def topic(self, request: str) -> str:
+        """The request without filler words, lowercased."""
+        return " ".join(t for t in tokenize(request) if t not in FILLER_WORDS)
+
+    def _match(self, cid: str, method: str, confidence: float) -> CategoryMatch:
+        logger.info(f"{datetime.now()}: Category {cid} classified locally ({method})")
+        return CategoryMatch(cid, self._names[cid], method, confidence)
+
+    def classify(self, request: str) -> CategoryMatch | None:
+        topic = self.topic(request)
+        if not topic:
+            return None
+
+        if topic in self._decisions and self._decisions[topic] in self._names:
+            return self._match(self._decisions[topic], "learned", 1.0)
+
+        ids = {self._taxonomy.canonical_id(t) for t in tokenize(request)} - {None}
+        if len(ids) == 1:
+            return self._match(ids.pop(), "id", 1.0)
+
+        if topic in self._phrases:
+            return self._match(self._phrases[topic], "name", 1.0)
+
+        # the names or aliases contained in the topic, as whole words, leaving out
+        # those only there as part of a longer one (e.g. "physics" in "quantum physics")
+        padded = f" {topic} "
+        contained = [p for p in self._phrases if f" {p} " in padded]
+        contained = [
+            p
+            for p in contained
+            if not any(q != p and f" {p} " in f" {q} " for q in contained)
+        ]
+        if contained:
+            # a request naming several categories has to be answered by the LLM
+            if len({self._phrases[p] for p in contained}) > 1:
+                return None
+            longest = max(len(p.split()) for p in contained)
+            coverage = longest / len(topic.split())
+            if coverage > 0.5:
+                return self._match(self._phrases[contained[0]], "name", coverage)
+
+        close = difflib.get_close_matches(topic, self._phrases, n=2, cutoff=0.88)
+        close_ids = {self._phrases[p] for p in close}
+        if len(close_ids) == 1:
+            return self._match(close_ids.pop(), "fuzzy", 0.9)
+
+        query = self._tfidf(Counter(stem(t) for t in tokenize(topic)))
+        scores = sorted(
+            (
+                (sum(w * vector.get(t, 0.0) for t, w in query.items()), cid)
+                for cid, vector in self._vectors.items()
+            ),
+            reverse=True,
+        )
+        (best_score, best_id), (second_score, _) = scores[0], scores[1]
+        if (
+            best_score >= self._min_score
+            and best_score - second_score >= self._min_margin
+        ):
+            return self._match(best_id, "tfidf", best_score)
+
+        return None
+
+    def learn(self, request: str, category_id: str) -> None:
+        """Remember the category chosen for the topic of a request."""
+        topic = self.topic(request)
+        category_id = self._taxonomy.canonical_id(category_id)
+        if not topic or category_id is None:
+            return
+        with self._lock:
+            self._decisions.pop(topic, None)
+            self._decisions[topic] = category_id
+            # forget the oldest decisions first
+            while len(self._decisions) > self._max_decisions:
+                self._decisions.pop(next(iter(self._decisions)))
+            try:
+                self._decisions_path.write_text(json.dumps(self._decisions))
+            except OSError as e:
+                logger.error(
+                    f"{datetime.now()}: Failed to save category decisions: {e}"
+                )
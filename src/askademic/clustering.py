@@ -0,0 +1,163 @@
+import logging
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime
+
+import numpy as np
+
+from askademic.category_classifier import FILLER_WORDS, stem, tokenize
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+# words of abstracts that say nothing about their topic
+STOP_WORDS = FILLER_WORDS | {
+    "also", "approach", "as", "at", "be", "both", "but", "by", "each", "et",
+    "existing", "however", "into", "it", "its", "may", "method", "methods",
+    "model", "models", "more", "not", "novel", "or", "our", "over", "paper",
+    "propose", "proposed", "result", "results", "show", "shows", "such", "than",
+    "that", "their", "them", "these", "they", "through", "use", "used", "using",
+    "via", "we", "which", "while", "within", "without",
+}  # fmt: skip
+
+
+def clustering_enabled() -> bool:
+    """Whether big listings are clustered by topic before summarising (ASKADEMIC_CLUSTER=1)."""
+    return os.getenv("ASKADEMIC_CLUSTER", "0") == "1"
+
+
+@dataclass
+class Cluster:
+    """Abstracts of one topic, by index, the most central first."""
+
+    members: list[int]
+    keywords: list[str]
+
+    @property
+    def size(self) -> int:
+        return len(self.members)
+
+
+def tfidf(documents: list[str]) -> tuple[np.ndarray, list[str]]:
+    """
+    The TF-IDF matrix of documents, one L2-normalised row per document,
+    over the terms in at least two documents and in at most 90% of them
+    (all the terms if that leaves none).
+    """
+    tokens = [
+        [stem(t) for t in tokenize(d) if t not in STOP_WORDS and len(t) > 2]
+        for d in documents
+    ]
+    n_docs = len(documents)
+    df: dict[str, int] = {}
+    for doc in tokens:
+        for term in set(doc):
+            df[term] = df.get(term, 0) + 1
+
+    vocabulary = sorted(t for t, n in df.items() if 2 <= n <= max(2, 0.9 * n_docs))
+    if not vocabulary:
+        vocabulary = sorted(df)
+    index = {t: i for i, t in enumerate(vocabulary)}
+
+    counts = np.zeros((n_docs, len(vocabulary)))
+    for i, doc in enumerate(tokens):
+        for term in doc:
+            if term in index:
+                counts[i, index[term]] += 1
+
+    idf = np.log((1 + n_docs) / (1 + np.array([df[t] for t in vocabulary]))) + 1
+    matrix = np.log1p(counts) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms), vocabulary
+
+
+def kmeans(
+    x: np.ndarray, k: int, n_iter: int = 50, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Spherical k-means (cosine similarity) of L2-normalised rows, seeded with k-means++.
+    Returns the label of each row and the normalised centroids.
+    """
+    rng = np.random.default_rng(seed)
+    n = x.shape[0]
+    centroids = [x[rng.integers(n)]]
+    for _ in range(1, k):
+        distance = 1 - np.max(x @ np.array(centroids).T, axis=1)
+        distance = np.clip(distance, 0, None)
+        if distance.sum() == 0:
+            centroids.append(x[rng.integers(n)])
+        else:
+            centroids.append(x[rng.choice(n, p=distance / distance.sum())])
+    centroids = np.array(centroids)
+
+    labels = np.full(n, -1)
+    for _ in range(n_iter):
+        similarity = x @ centroids.T
+        new_labels = np.argmax(similarity, axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for c in range(k):
+            members = x[labels == c]
+            if len(members) == 0:
+                # reseed an empty cluster with the row furthest from its centroid
+                far = np.argmin(similarity[np.arange(n), labels])
+                centroids[c] = x[far]
+                labels[far] = c
+                continue
+            centroid = members.sum(axis=0)
+            norm = np.linalg.norm(centroid)
+            centroids[c] = centroid / norm if norm else centroid
+    return labels, centroids
+
+
+def default_n_clusters(n_documents: int, max_clusters: int = 12) -> int:
+    """A number of topics growing with the square root of the number of documents."""
+    return max(1, min(max_clusters, n_documents, round(math.sqrt(n_documents / 2))))
+
+
+def cluster_abstracts(
+    abstracts: list[str],
+    n_clusters: int | None = None,
+    n_keywords: int = 5,
+    seed: int = 0,
+) -> list[Cluster]:
+    """
+    Group abstracts by topic, with TF-IDF vectors and k-means, on CPU.
+    Args:
+        abstracts: the abstracts
+        n_clusters: the number of topics. Default grows with the number of abstracts.
+        n_keywords: the number of keywords of each topic
+        seed: the seed of the k-means initialisation, for reproducible clusters
+    Returns:
+        clusters: the clusters, the biggest first, their members the most central first
+    """
+    if not abstracts:
+        return []
+    if n_clusters is None:
+        n_clusters = default_n_clusters(len(abstracts))
+    n_clusters = max(1, min(n_clusters, len(abstracts)))
+
+    x, vocabulary = tfidf(abstracts)
+    labels, centroids = kmeans(x, n_clusters, seed=seed)
+    similarity = x @ centroids.T
+
+    clusters = []
+    for c in range(n_clusters):
+        members = np.flatnonzero(labels == c)
+        if len(members) == 0:
+            continue
+        members = members[np.argsort(-similarity[members, c], kind="stable")]
+        weights = x[members].sum(axis=0)
+        top = np.argsort(-weights, kind="stable")[:n_keywords]
+        keywords = [vocabulary[i] for i in top if weights[i] > 0]
+        clusters.append(Cluster(members=members.tolist(), keywords=keywords))
+
+    clusters.sort(key=lambda cluster: -cluster.size)
+    logger.info(
+        f"{datetime.now()}: {len(abstracts)} abstracts in {len(clusters)} clusters "
+        + f"of sizes {[c.size for c in clusters]}"
+    )
+    return clusters
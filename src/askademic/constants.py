@@ -17,6 +17,7 @@ MISTRAL_LARGE_MODEL_ID = "mistral:mistral-large-latest"
 
 # ARXIV URLS
 ARXIV_BASE_URL = "http://export.arxiv.org/api/query?"
+ARXIV_OAI_URL = "https://oaipmh.arxiv.org/oai"
 
 # User-agents for requests (to rotate)
 USER_AGENTS = [
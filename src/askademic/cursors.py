@@ -0,0 +1,140 @@
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+
+class _ResultSet:
+    """The pages of one search, fetched or being fetched."""
+
+    def __init__(self, fetch_page: Callable[[int], list], start: int, page_size: int):
+        self.fetch_page = fetch_page
+        self.start = start
+        self.page_size = page_size
+        self.pages: dict[int, Future] = {}
+        self.last_used = time.monotonic()
+
+
+class CursorStore:
+    """
+    Result sets of searches kept in memory behind opaque cursors.
+
+    A cursor names a page of a result set. Once a result set is being paged through
+    (its second page was asked for), each page served has the next one fetched in the
+    background, so that asking for it does not wait on the network. The first page of
+    a search does not: most searches are never paged, and each fetch is an arXiv call.
+    Cursors expire after ttl seconds without use; at most max_cursors result sets
+    are kept, the least recently used being dropped first.
+    """
+
+    def __init__(self, max_cursors: int = 128, ttl: float = 1800, max_workers: int = 4):
+        self._max_cursors = max_cursors
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._results: OrderedDict[str, _ResultSet] = OrderedDict()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="prefetch"
+        )
+
+    def open(
+        self,
+        fetch_page: Callable[[int], list],
+        first_page: list,
+        start: int,
+        page_size: int,
+    ) -> str | None:
+        """
+        Keep the result set of a search whose first page was just fetched.
+        Returns the cursor of the next page, or None if there cannot be one
+        (the first page is not full).
+        Args:
+            fetch_page: fetches the page starting at a result index
+            first_page: the results of the first page
+            start: the index of the first result of the first page
+            page_size: the number of results per page
+        """
+        if len(first_page) < page_size:
+            return None
+
+        result_id = secrets.token_urlsafe(8)
+        results = _ResultSet(fetch_page, start, page_size)
+        first = Future()
+        first.set_result(first_page)
+        results.pages[0] = first
+
+        with self._lock:
+            self._evict()
+            self._results[result_id] = results
+        return f"{result_id}.1"
+
+    def next_page(self, cursor: str) -> tuple[list, str | None]:
+        """
+        The results of the page a cursor names, and the cursor of the page after,
+        or None if it is the last page. Serving the same cursor twice returns the
+        same page. Raises KeyError if the cursor is unknown or expired.
+        """
+        result_id, _, page = cursor.rpartition(".")
+        with self._lock:
+            self._evict()
+            results = self._results.get(result_id)
+            if results is None or not page.isdigit():
+                raise KeyError(cursor)
+            page = int(page)
+            results.last_used = time.monotonic()
+            self._results.move_to_end(result_id)
+            future = results.pages.get(page) or self._prefetch(results, page)
+
+        # waits only if the prefetch is still running
+        try:
+            records = future.result()
+        except Exception:
+            # fetch it again next time
+            with self._lock:
+                results.pages.pop(page, None)
+            raise
+        if len(records) < results.page_size:
+            return records, None
+
+        with self._lock:
+            self._prefetch(results, page + 1)
+        return records, f"{result_id}.{page + 1}"
+
+    def _prefetch(self, results: _ResultSet, page: int) -> Future:
+        if page not in results.pages:
+            logger.info(f"{datetime.now()}: Prefetching page {page}")
+            results.pages[page] = self._executor.submit(
+                results.fetch_page, results.start + page * results.page_size
+            )
+        return results.pages[page]
+
+    def _evict(self):
+        now = time.monotonic()
+        for result_id in [
+            r
+            for r, results in self._results.items()
+            if now - results.last_used > self._ttl
+        ]:
+            del self._results[result_id]
+        while len(self._results) >= self._max_cursors:
+            self._results.popitem(last=False)
+
+
+_cursor_store: CursorStore | None = None
+_cursor_store_lock = threading.Lock()
+
+
+def get_cursor_store() -> CursorStore:
+    """Return the process-wide cursor store."""
+    global _cursor_store
+    with _cursor_store_lock:
+        if _cursor_store is None:
+            _cursor_store = CursorStore()
+    return _cursor_store
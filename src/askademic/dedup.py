@@ -0,0 +1,130 @@
+import logging
+import re
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from askademic.utils import extract_arxiv_id
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+# a Mersenne prime larger than any 32-bit shingle hash
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def shingles(text: str, k: int = 3) -> set[str]:
+    """The set of word k-shingles of a text, after lowercasing and removing punctuation."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < k:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(window) for window in zip(*(tokens[i:] for i in range(k)))}
+
+
+class MinHasher:
+    """
+    MinHash signatures with num_perm universal hash functions (a * x + b mod p),
+    computed for all shingles of a text at once with NumPy.
+    """
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, 1 << 31, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, shingle_set: set[str]) -> np.ndarray:
+        if not shingle_set:
+            return np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode()) for s in shingle_set),
+            dtype=np.uint64,
+            count=len(shingle_set),
+        )
+        # a, b < 2**31 and the hashes are < 2**32, so a * x + b fits in 64 bits
+        return ((self._a * hashes + self._b) % MERSENNE_PRIME).min(axis=1)
+
+
+def estimate_jaccard(signature_a: np.ndarray, signature_b: np.ndarray) -> float:
+    return float(np.mean(signature_a == signature_b))
+
+
+def find_near_duplicates(
+    texts: list[str],
+    threshold: float = 0.7,
+    num_perm: int = 64,
+    bands: int = 16,
+) -> list[list[int]]:
+    """
+    Group the texts that are near-duplicates of each other.
+    Candidate pairs come from locality-sensitive hashing over bands of the MinHash
+    signatures and are kept when their estimated Jaccard similarity is >= threshold.
+    Returns groups of indices, in order of first appearance.
+    """
+    minhasher = MinHasher(num_perm=num_perm)
+    signatures = [minhasher.signature(shingles(t)) for t in texts]
+    band_signatures = [s.reshape(bands, num_perm // bands) for s in signatures]
+
+    parent = list(range(len(texts)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for band in range(bands):
+        buckets: dict[bytes, int] = {}
+        for i, signature in enumerate(band_signatures):
+            key = signature[band].tobytes()
+            j = buckets.setdefault(key, i)
+            if j != i and find(i) != find(j):
+                if estimate_jaccard(signatures[i], signatures[j]) >= threshold:
+                    parent[max(find(i), find(j))] = min(find(i), find(j))
+
+    groups: dict[int, list[int]] = {}
+    for i in range(len(texts)):
+        groups.setdefault(find(i), []).append(i)
+    return list(groups.values())
+
+
+def collapse_near_duplicates(records: list[dict], threshold: float = 0.7) -> list[dict]:
+    """
+    Collapse search results that are the same work: versions of the same arXiv ID
+    and near-duplicate titles + abstracts. Records are dicts with "article_link",
+    "title" and "abstract", in ranking order. The best ranked record of each group
+    is kept, with the links of the others listed under "alternates".
+    """
+    if len(records) < 2:
+        return records
+
+    # same arXiv ID means same work, whatever the version and the text
+    by_id: dict[str, list[int]] = {}
+    for i, record in enumerate(records):
+        arxiv_id = extract_arxiv_id(record["article_link"]) or record["article_link"]
+        by_id.setdefault(arxiv_id, []).append(i)
+    id_groups = list(by_id.values())
+
+    representatives = [records[g[0]] for g in id_groups]
+    texts = [f"{r['title']} {r['abstract']}" for r in representatives]
+    groups = [
+        sorted(i for j in group for i in id_groups[j])
+        for group in find_near_duplicates(texts, threshold=threshold)
+    ]
+
+    collapsed = []
+    for group in groups:
+        record = dict(records[group[0]])
+        alternates = [records[i]["article_link"] for i in group[1:]]
+        if alternates:
+            record["alternates"] = alternates
+        collapsed.append(record)
+
+    if len(collapsed) < len(records):
+        logger.info(
+            f"{datetime.now()}: Collapsed {len(records)} results into {len(collapsed)}"
+        )
+    return collapsed
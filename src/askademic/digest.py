@@ -0,0 +1,195 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from pydantic_ai.settings import ModelSettings
+
+from askademic.summary import Category, SummaryAgent, SummaryResponse, model_key
+from askademic.taxonomy import get_taxonomy
+from askademic.tools import identify_latest_day
+from askademic.utils import (
+    last_announcement,
+    latest_announced_day,
+    next_announcement,
+)
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS digests (
+    category TEXT NOT NULL,
+    day TEXT NOT NULL,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (category, day, model)
+);
+"""
+
+
+def get_digests_path() -> Path:
+    """Create and return the path of the local digest database"""
+    store_dir = Path(os.path.expanduser("~/.askademic"))
+    store_dir.mkdir(parents=True, exist_ok=True)
+    return store_dir / "digests.db"
+
+
+class DigestStore:
+    """
+    Summaries of the latest articles of a category (SummaryResponse), keyed by
+    category, day of publication and model, in SQLite.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self._path = Path(path) if path else get_digests_path()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def put(self, response: SummaryResponse, model: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO digests (category, day, model, response, created_at) "
+                + "VALUES (?, ?, ?, ?, ?) ON CONFLICT(category, day, model) "
+                + "DO UPDATE SET response = excluded.response, "
+                + "created_at = excluded.created_at",
+                (
+                    response.category.category_id,
+                    response.latest_published_day,
+                    model,
+                    response.model_dump_json(),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def get(self, category: str, day: str, model: str) -> SummaryResponse | None:
+        row = self._connection.execute(
+            "SELECT response FROM digests WHERE category = ? AND day = ? AND model = ?",
+            (category, day, model),
+        ).fetchone()
+        return SummaryResponse.model_validate_json(row[0]) if row else None
+
+    def get_current(
+        self, category: str, model: str, now: datetime | None = None
+    ) -> SummaryResponse | None:
+        """
+        The digest of the latest day of a category, if it is of the day of the latest
+        announcement and was made after it, so that no newer articles can exist.
+        A digest of an older day, e.g. made just after an announcement but before
+        the API showed it, is not current.
+        """
+        row = self._connection.execute(
+            "SELECT response, day, created_at FROM digests "
+            + "WHERE category = ? AND model = ? ORDER BY day DESC LIMIT 1",
+            (category, model),
+        ).fetchone()
+        if (
+            not row
+            or row[1] < latest_announced_day(now)
+            or datetime.fromisoformat(row[2]) < last_announcement(now)
+        ):
+            return None
+        return SummaryResponse.model_validate_json(row[0])
+
+
+_digest_store: DigestStore | None = None
+_digest_store_lock = threading.Lock()
+
+
+def get_digest_store() -> DigestStore:
+    """Return the process-wide digest store, opening it on first use."""
+    global _digest_store
+    with _digest_store_lock:
+        if _digest_store is None:
+            _digest_store = DigestStore()
+    return _digest_store
+
+
+class DigestScheduler:
+    """
+    Precompute the digests of a set of categories after each arXiv announcement,
+    so that summary requests for them are served from the digest store.
+    """
+
+    def __init__(
+        self,
+        categories: list[str],
+        model: str,
+        model_settings: ModelSettings = None,
+        store: DigestStore | None = None,
+        summary_agent: SummaryAgent | None = None,
+        delay: timedelta = timedelta(minutes=30),
+    ):
+        """
+        Args:
+            categories: the IDs of the categories
+            model: the model summarising the articles
+            model_settings: the settings of the model
+            store: the digest store. Default is the local one.
+            summary_agent: the agent summarising. Default is a new SummaryAgent,
+                the digests being stored by the scheduler.
+            delay: how long after an announcement to start, for the API to catch up
+        """
+        taxonomy = get_taxonomy()
+        self._categories = []
+        for category_id in categories:
+            category = taxonomy.get(category_id)
+            if category is None:
+                raise ValueError(f"Unknown category '{category_id}'.")
+            self._categories.append(
+                Category(category_id=category.id, category_name=category.name)
+            )
+
+        self._store = store if store is not None else get_digest_store()
+        self._model_key = model_key(model)
+        self._summary_agent = summary_agent or SummaryAgent(model, model_settings)
+        self._delay = delay
+
+        self._identify_latest_day = identify_latest_day
+
+    async def run_once(self) -> list[SummaryResponse]:
+        """Compute the digests of the latest day missing from the store."""
+        computed = []
+        for category in self._categories:
+            latest_day = self._identify_latest_day(category.category_id)
+            if latest_day == "Not Found":
+                logger.error(f"{datetime.now()}: No latest day for {category}")
+                continue
+            if self._store.get(category.category_id, latest_day, self._model_key):
+                continue
+
+            logger.info(
+                f"{datetime.now()}: Computing digest of {category.category_id} "
+                + f"for {latest_day}"
+            )
+            try:
+                response = await self._summary_agent.summarise(category, latest_day)
+            except Exception as e:
+                logger.error(
+                    f"{datetime.now()}: Digest of {category.category_id} failed: {e}"
+                )
+                continue
+            self._store.put(response, self._model_key)
+            computed.append(response)
+        return computed
+
+    async def run_forever(self):
+        """Compute the missing digests now, then after every announcement."""
+        while True:
+            await self.run_once()
+            wake_up = last_announcement() + self._delay
+            if wake_up <= datetime.now(timezone.utc):
+                wake_up = next_announcement() + self._delay
+            logger.info(f"{datetime.now()}: Next digests at {wake_up.isoformat()}")
+            seconds = (wake_up - datetime.now(timezone.utc)).total_seconds()
+            await asyncio.sleep(max(seconds, 0))
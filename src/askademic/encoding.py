@@ -0,0 +1,119 @@
+import json
+import os
+import re
+
+from askademic.utils import extract_arxiv_id
+
+# how lists of articles are written for the models:
+# - json: JSON objects, indented, with full links
+# - compact: a table with a header line and a line per article, separated by "|",
+#   with arXiv IDs instead of links and no whitespace padding
+ENCODINGS = ("json", "compact")
+
+# the fields holding links to articles, written as arXiv IDs in the compact encoding
+LINK_FIELDS = {"article_link", "link", "alternates"}
+# the names of the columns of the compact encoding, where shorter than the fields
+COLUMN_NAMES = {"article_link": "id"}
+
+SENTENCE_END_PATTERN = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9$\\(])")
+
+
+def default_encoding() -> str:
+    """The encoding of the articles given to the models (ASKADEMIC_ENCODING, json by default)."""
+    return check_encoding(os.getenv("ASKADEMIC_ENCODING", "json"))
+
+
+def check_encoding(encoding: str) -> str:
+    if encoding not in ENCODINGS:
+        raise ValueError(
+            f"Unknown encoding: {encoding}. Use one of {', '.join(ENCODINGS)}."
+        )
+    return encoding
+
+
+def clip_sentences(text: str, max_sentences: int | None) -> str:
+    """The first max_sentences sentences of a text, all of it if None."""
+    if max_sentences is None:
+        return text
+    sentences = SENTENCE_END_PATTERN.split(text.strip())
+    if len(sentences) <= max_sentences:
+        return text
+    return " ".join(sentences[:max_sentences]) + " ..."
+
+
+def _cell(key: str, value, max_sentences: int | None) -> str:
+    if isinstance(value, list):
+        return ",".join(_cell(key, v, max_sentences) for v in value)
+    text = " ".join(str(value).split())
+    if key in LINK_FIELDS:
+        text = extract_arxiv_id(text) or text
+    elif key == "abstract":
+        text = clip_sentences(text, max_sentences)
+    return text.replace("|", "/")
+
+
+def encode_table(records: list[dict], max_sentences: int | None = None) -> str:
+    """
+    Records as a header line with their fields and a line per record,
+    the values separated by "|", links as arXiv IDs, lists separated by ",".
+    """
+    if not records:
+        return ""
+    keys = list(dict.fromkeys(k for r in records for k in r))
+    lines = ["|".join(COLUMN_NAMES.get(k, k) for k in keys)]
+    for record in records:
+        lines.append("|".join(_cell(k, record.get(k, ""), max_sentences) for k in keys))
+    return "\n".join(lines)
+
+
+def encode_articles(
+    records: list[dict],
+    encoding: str = "json",
+    max_sentences: int | None = None,
+    **fields,
+) -> str:
+    """
+    Articles (e.g. search results) for a model, with other fields (e.g. a cursor).
+    In the json encoding, {"articles": records, **fields}, or the list of records
+    if there are no fields; in the compact one, the table of the records followed
+    by a "field: value" line per field.
+    Args:
+        records: the articles, dicts with article_link, title, abstract...
+        encoding: json or compact
+        max_sentences: the most sentences of each abstract. Default is all.
+        fields: the other fields
+    """
+    check_encoding(encoding)
+    if encoding == "json":
+        if max_sentences is not None:
+            records = [
+                (
+                    {**r, "abstract": clip_sentences(r["abstract"], max_sentences)}
+                    if "abstract" in r
+                    else r
+                )
+                for r in records
+            ]
+        return json.dumps(
+            {"articles": records, **fields} if fields else records, indent=2
+        )
+
+    lines = [encode_table(records, max_sentences)] if records else []
+    lines += [
+        f"{key}: {'none' if value is None else value}" for key, value in fields.items()
+    ]
+    return "\n".join(lines)
+
+
+def encode_abstracts(abstracts: list[str], encoding: str = "json") -> str:
+    """
+    A list of abstracts for a model: a JSON list, or, compact, one abstract per line
+    with its number and without line breaks nor padding.
+    """
+    check_encoding(encoding)
+    if encoding == "json":
+        return json.dumps(abstracts)
+    return "\n".join(
+        f"[{i + 1}] {' '.join(abstract.split())}"
+        for i, abstract in enumerate(abstracts)
+    )
@@ -1,18 +1,28 @@
+import asyncio
 import logging
 from datetime import datetime
 from typing import List
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.settings import ModelSettings
 
+from askademic.encoding import check_encoding, default_encoding
+from askademic.llm_cache import cached_model
+from askademic.progress import report_progress
 from askademic.prompts.general import SYSTEM_PROMPT_GENERAL
+from askademic.tokens import TokenBudget, turn_budget
 from askademic.tools import (
+    find_categories,
     get_article,
     get_categories,
+    next_page,
     search_articles_by_abs,
     search_articles_by_title,
+    search_articles_federated,
+    search_similar_articles,
 )
+from askademic.utils import extract_arxiv_id
 
 today = datetime.now().strftime("%Y-%m-%d")
 logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
@@ -34,16 +44,50 @@ class GeneralResponse(BaseModel):
     )
 
 
+class Context(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    # what the tool outputs of the run can still take
+    budget: TokenBudget = Field(default_factory=TokenBudget)
+    # how search results are written
+    encoding: str = "json"
+    max_sentences: int | None = None
+
+
 general_agent_base = Agent(
     system_prompt=SYSTEM_PROMPT_GENERAL,
     output_type=GeneralResponse,
+    deps_type=Context,
     retries=20,
     end_strategy="early",
 )
 
 
-class Context(BaseModel):
-    pass
+@general_agent_base.tool
+async def search_papers(
+    ctx: RunContext[Context], query: str, max_results: int = 10
+) -> str:
+    """
+    Search for papers by abstract and by title at once, plus the local store of papers,
+    returning a single ranked list. Prefer this to calling the topic and
+    title searches one after the other.
+    Args:
+        ctx: the context
+        query: The research topic, keywords or title to search for
+        max_results: Maximum number of results to return
+    """
+    logger.info(f"{datetime.now()}: General agent federated search for: {query}")
+    report_progress(f"Searching arXiv for: {query}")
+    budget = ctx.deps.budget
+    result = await asyncio.to_thread(
+        search_articles_federated,
+        query=query,
+        max_results=max_results,
+        max_tokens=budget.allowance(),
+        encoding=ctx.deps.encoding,
+        max_sentences=ctx.deps.max_sentences,
+    )
+    return budget.spend(result)
 
 
 @general_agent_base.tool
@@ -58,8 +102,16 @@ async def search_papers_by_topic(
         max_results: Maximum number of results to return
     """
     logger.info(f"{datetime.now()}: General agent searching for topic: {topic}")
-    result = search_articles_by_abs(query=topic, max_results=max_results)
-    return result
+    report_progress(f"Searching arXiv for: {topic}")
+    budget = ctx.deps.budget
+    result = search_articles_by_abs(
+        query=topic,
+        max_results=max_results,
+        max_tokens=budget.allowance(),
+        encoding=ctx.deps.encoding,
+        max_sentences=ctx.deps.max_sentences,
+    )
+    return budget.spend(result)
 
 
 @general_agent_base.tool
@@ -76,8 +128,54 @@ async def search_papers_by_title_keyword(
     logger.info(
         f"{datetime.now()}: General agent searching titles for: {title_keywords}"
     )
-    result = search_articles_by_title(query=title_keywords, max_results=max_results)
-    return result
+    report_progress(f"Searching arXiv for the title: {title_keywords}")
+    budget = ctx.deps.budget
+    result = search_articles_by_title(
+        query=title_keywords,
+        max_results=max_results,
+        max_tokens=budget.allowance(),
+        encoding=ctx.deps.encoding,
+        max_sentences=ctx.deps.max_sentences,
+    )
+    return budget.spend(result)
+
+
+@general_agent_base.tool
+async def next_search_page(ctx: RunContext[Context], cursor: str) -> str:
+    """
+    Get the next results of a topic or title search, from its next_page_cursor.
+    Args:
+        ctx: the context
+        cursor: The next_page_cursor returned by the previous search or page
+    """
+    logger.info(f"{datetime.now()}: General agent getting the next page of a search")
+    budget = ctx.deps.budget
+    result = next_page(
+        cursor,
+        max_tokens=budget.allowance(),
+        encoding=ctx.deps.encoding,
+        max_sentences=ctx.deps.max_sentences,
+    )
+    return budget.spend(result)
+
+
+@general_agent_base.tool
+async def find_similar_papers(
+    ctx: RunContext[Context], text: str, max_results: int = 10
+) -> str:
+    """
+    Find papers similar to a text (e.g. an abstract) in the local index of
+    previously seen papers, without searching arXiv.
+    Args:
+        ctx: the context
+        text: The text to find similar papers for
+        max_results: Maximum number of results to return
+    """
+    logger.info(
+        f"{datetime.now()}: General agent finding papers similar to: {text[:100]}"
+    )
+    result = search_similar_articles(text=text, max_results=max_results)
+    return ctx.deps.budget.spend(result)
 
 
 @general_agent_base.tool
@@ -86,11 +184,28 @@ async def get_paper_content(ctx: RunContext[Context], paper_url: str) -> str:
     Retrieve the full content of a specific paper.
     Args:
         ctx: the context
-        paper_url: The arXiv PDF URL of the paper
+        paper_url: The arXiv PDF URL or arXiv ID of the paper
     """
+    # search results may give arXiv IDs rather than links
+    if "arxiv.org" not in paper_url and extract_arxiv_id(paper_url):
+        paper_url = f"https://arxiv.org/pdf/{extract_arxiv_id(paper_url)}.pdf"
     logger.info(f"{datetime.now()}: General agent retrieving paper: {paper_url}")
-    result = get_article(url=paper_url)
-    return result
+    report_progress(f"Fetching the PDF of {paper_url}")
+    budget = ctx.deps.budget
+    result = get_article(url=paper_url, max_tokens=budget.allowance())
+    return budget.spend(result)
+
+
+@general_agent_base.tool
+async def find_research_categories(ctx: RunContext[Context], query: str) -> dict:
+    """
+    Find the arXiv research categories matching a topic, ID or archive.
+    Args:
+        ctx: the context
+        query: the topic (e.g. "computer vision"), category ID or archive (e.g. "hep")
+    """
+    logger.info(f"{datetime.now()}: General agent finding categories: {query}")
+    return find_categories(query)
 
 
 @general_agent_base.tool
@@ -105,11 +220,23 @@ async def list_research_categories(ctx: RunContext[Context]) -> dict:
 
 
 class GeneralAgent:
-    def __init__(self, model: str, model_settings: ModelSettings = None):
+    def __init__(
+        self,
+        model: str,
+        model_settings: ModelSettings = None,
+        use_llm_cache: bool = True,
+        encoding: str | None = None,
+        max_sentences: int | None = None,
+    ):
+        # the agent is shared, the model is given to each run
         self.agent = general_agent_base
-        self.agent.model = model
-        if model_settings:
-            self.agent.model_settings = model_settings
+        self._model = cached_model(model, use_llm_cache)
+        self._model_settings = model_settings
+        # the tokens of tool outputs per run
+        self._turn_tokens = turn_budget(self._model)
+        # how search results are written, json or compact (default ASKADEMIC_ENCODING)
+        self._encoding = check_encoding(encoding or default_encoding())
+        self._max_sentences = max_sentences
 
     async def __call__(self, request: str) -> GeneralResponse:
         """
@@ -121,5 +248,14 @@ class GeneralAgent:
             f"{datetime.now()}: General agent handling request: {request[:100]}..."
         )
 
-        result = await self.agent.run(request)
+        result = await self.agent.run(
+            request,
+            model=self._model,
+            model_settings=self._model_settings,
+            deps=Context(
+                budget=TokenBudget(self._turn_tokens),
+                encoding=self._encoding,
+                max_sentences=self._max_sentences,
+            ),
+        )
         return result.output
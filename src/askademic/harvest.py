@@ -0,0 +1,191 @@
+import logging
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from askademic.constants import ARXIV_OAI_URL
+from askademic.http_client import HttpClient, get_http_client
+from askademic.store import MetadataStore, get_store
+from askademic.vector_index import VectorIndex, index_articles
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+OAI_NS = "{http://www.openarchives.org/OAI/2.0/}"
+ARXIV_NS = "{http://arxiv.org/OAI/arXiv/}"
+
+
+class HarvestError(Exception):
+    """The OAI-PMH endpoint returned an error."""
+
+
+@dataclass
+class HarvestStats:
+    set_spec: str
+    from_date: str | None = None
+    upserted: int = 0
+    deleted: int = 0
+    skipped: int = 0
+    requests: int = 0
+
+
+def _text(element: ET.Element, tag: str) -> str:
+    child = element.find(f"{ARXIV_NS}{tag}")
+    return " ".join(child.text.split()) if child is not None and child.text else ""
+
+
+def deleted_record_id(record: ET.Element) -> str | None:
+    """The arXiv ID of an OAI-PMH record marked as deleted, None if it is not."""
+    header = record.find(f"{OAI_NS}header")
+    if header is None or header.get("status") != "deleted":
+        return None
+    identifier = header.findtext(f"{OAI_NS}identifier", "").strip()
+    return identifier.removeprefix("oai:arXiv.org:") or None
+
+
+def parse_oai_record(record: ET.Element) -> dict | None:
+    """
+    Convert an OAI-PMH record in arXiv format into a paper for the metadata store.
+    Returns None for deleted records and records without metadata.
+    """
+    header = record.find(f"{OAI_NS}header")
+    if header is not None and header.get("status") == "deleted":
+        return None
+
+    metadata = record.find(f"{OAI_NS}metadata/{ARXIV_NS}arXiv")
+    if metadata is None:
+        return None
+
+    authors = []
+    for author in metadata.iter(f"{ARXIV_NS}author"):
+        name = f"{_text(author, 'forenames')} {_text(author, 'keyname')}".strip()
+        authors.append(name)
+
+    return {
+        "id": _text(metadata, "id"),
+        "title": _text(metadata, "title"),
+        "abstract": _text(metadata, "abstract"),
+        "authors": ", ".join(authors),
+        "categories": _text(metadata, "categories"),
+        "published": _text(metadata, "created") or None,
+        "updated": _text(metadata, "updated") or _text(metadata, "created") or None,
+    }
+
+
+def _watermark_key(set_spec: str) -> str:
+    return f"harvest:{set_spec}"
+
+
+def harvest(
+    set_spec: str = "cs",
+    from_date: str | None = None,
+    store: MetadataStore | None = None,
+    index: VectorIndex | None = None,
+    client: HttpClient | None = None,
+    base_url: str = ARXIV_OAI_URL,
+    batch_size: int = 1000,
+    with_index: bool = True,
+) -> HarvestStats:
+    """
+    Incrementally harvest the records of an arXiv set via OAI-PMH and upsert them
+    into the metadata store (and the vector index).
+
+    Records marked as deleted (withdrawn papers) are removed from the store.
+    Only the records changed since the last harvest of the set (its watermark) are
+    requested, using date-based selective harvesting, and the result pages are
+    followed with resumption tokens. The watermark moves to the date of the first
+    response only once the whole list has been harvested, so a failed harvest
+    is simply redone from the previous watermark.
+    Args:
+        set_spec: the OAI set, e.g. "cs", "math" or "physics:hep-th"
+        from_date: harvest records changed since this day (YYYY-MM-DD).
+            Default is the watermark of the set, or everything if there is none.
+        store: the metadata store. Default is the local one.
+        index: the vector index. Default is the local one.
+        client: the HTTP client. Default is the shared one.
+        base_url: the OAI-PMH endpoint
+        batch_size: the number of records per upsert
+        with_index: whether to add the abstracts to the vector index too
+    """
+    if store is None:
+        store = get_store()
+    if client is None:
+        client = get_http_client()
+
+    from_date = from_date or store.get_state(_watermark_key(set_spec))
+    stats = HarvestStats(set_spec=set_spec, from_date=from_date)
+    logger.info(f"{datetime.now()}: Harvesting set {set_spec} from {from_date}")
+
+    params = {"verb": "ListRecords", "metadataPrefix": "arXiv", "set": set_spec}
+    if from_date:
+        params["from"] = from_date
+
+    # the papers and deletions of the next batch, by ID: the last record of an ID wins
+    batch: dict[str, dict] = {}
+    deleted: set[str] = set()
+    response_date = None
+
+    def flush():
+        papers = list(batch.values())
+        store.upsert_papers(papers, deleted=sorted(deleted))
+        if with_index:
+            index_articles(papers, index=index)
+        stats.upserted += len(papers)
+        stats.deleted += len(deleted)
+        batch.clear()
+        deleted.clear()
+
+    while True:
+        res = client.get(base_url, params=params)
+        stats.requests += 1
+        if not res.ok:
+            raise HarvestError(f"OAI-PMH request failed: {res.status_code}")
+
+        root = ET.fromstring(res.content)
+        if response_date is None:
+            response_date = root.findtext(f"{OAI_NS}responseDate")
+
+        error = root.find(f"{OAI_NS}error")
+        if error is not None:
+            if error.get("code") == "noRecordsMatch":
+                break
+            raise HarvestError(f"{error.get('code')}: {error.text}")
+
+        for record in root.iter(f"{OAI_NS}record"):
+            deleted_id = deleted_record_id(record)
+            if deleted_id:
+                batch.pop(deleted_id, None)
+                deleted.add(deleted_id)
+                continue
+            paper = parse_oai_record(record)
+            if paper is None:
+                stats.skipped += 1
+                continue
+            deleted.discard(paper["id"])
+            batch[paper["id"]] = paper
+            if len(batch) + len(deleted) >= batch_size:
+                flush()
+
+        token = root.find(f"{OAI_NS}ListRecords/{OAI_NS}resumptionToken")
+        if token is None or not (token.text or "").strip():
+            break
+        params = {"verb": "ListRecords", "resumptionToken": token.text.strip()}
+
+    if batch or deleted:
+        flush()
+
+    # the next harvest starts from the day this one started (from is inclusive)
+    watermark = (
+        response_date[:10]
+        if response_date
+        else datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    )
+    store.set_state(_watermark_key(set_spec), watermark)
+
+    logger.info(
+        f"{datetime.now()}: Harvested set {set_spec}: {stats.upserted} records "
+        + f"upserted, {stats.deleted} deleted, {stats.skipped} skipped, "
+        + f"in {stats.requests} requests"
+    )
+    return stats
@@ -0,0 +1,83 @@
+import logging
+import random
+import threading
+import time
+from datetime import datetime
+
+import requests
+
+from askademic.constants import USER_AGENTS
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Let at most one request through every min_interval seconds, across threads."""
+
+    def __init__(self, min_interval: float):
+        self._min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            self._next_time = max(now, self._next_time) + self._min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HttpClient:
+    """
+    HTTP client shared by everything calling arXiv: one connection pool, one rate limit.
+    Retries on connection errors and on 503 (arXiv's "slow down"), honouring Retry-After.
+    """
+
+    def __init__(
+        self, min_interval: float = 3.0, max_retries: int = 5, retry_delay: float = 10
+    ):
+        self._session = requests.Session()
+        self._rate_limiter = RateLimiter(min_interval)
+        self._max_retries = max_retries
+        self._retry_delay = retry_delay
+
+    def get(
+        self, url: str, params: dict | None = None, timeout: int = 360
+    ) -> requests.Response:
+        for attempt in range(self._max_retries + 1):
+            self._rate_limiter.wait()
+            try:
+                res = self._session.get(
+                    url,
+                    params=params,
+                    headers={"User-Agent": random.choice(USER_AGENTS)},
+                    timeout=timeout,
+                )
+            except requests.exceptions.ConnectionError:
+                if attempt == self._max_retries:
+                    raise
+                delay = self._retry_delay
+            else:
+                if res.status_code != 503 or attempt == self._max_retries:
+                    return res
+                retry_after = res.headers.get("Retry-After", "")
+                delay = int(retry_after) if retry_after.isdigit() else self._retry_delay
+
+            logger.info(f"{datetime.now()}: Retrying {url} in {delay} seconds")
+            time.sleep(delay)
+
+
+_http_client: HttpClient | None = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide HTTP client."""
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient()
+    return _http_client
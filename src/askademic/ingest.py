@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+import numpy as np
+
+from askademic.store import MetadataStore, get_store
+from askademic.vector_index import Embedder, VectorIndex, get_vector_index
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class IngestStats:
+    rows: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    resumed_from: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def _state_key(path: Path) -> str:
+    return f"ingest:{path.resolve()}"
+
+
+def parse_snapshot_record(line: bytes) -> dict | None:
+    """
+    Convert one line of the arXiv metadata snapshot (JSON lines, as published
+    on Kaggle) into a paper for the metadata store. Returns None if the line is not valid.
+    """
+    try:
+        raw = json.loads(line)
+        versions = raw.get("versions") or []
+        published = None
+        if versions:
+            published = parsedate_to_datetime(versions[0]["created"]).strftime(
+                "%Y-%m-%d"
+            )
+        return {
+            "id": raw["id"],
+            "title": " ".join(raw["title"].split()),
+            "abstract": " ".join(raw["abstract"].split()),
+            "authors": " ".join(raw.get("authors", "").split()),
+            "categories": raw.get("categories", ""),
+            "published": published,
+            "updated": raw.get("update_date"),
+        }
+    except (json.JSONDecodeError, KeyError, TypeError, ValueError):
+        return None
+
+
+# embedder of the worker processes, set once per process by the pool initializer
+_worker_embedder: Embedder | None = None
+
+
+def _init_worker(embedder: Embedder | None) -> None:
+    global _worker_embedder
+    _worker_embedder = embedder
+
+
+def _process_batch(lines: list[bytes]) -> tuple[list[dict], np.ndarray | None, int]:
+    """Parse a batch of lines and embed (tokenize + hash) the abstracts."""
+    papers = [p for p in map(parse_snapshot_record, lines) if p]
+    vectors = None
+    if _worker_embedder is not None and papers:
+        vectors = _worker_embedder([f"{p['title']}\n{p['abstract']}" for p in papers])
+    return papers, vectors, len(lines) - len(papers)
+
+
+def _read_batches(
+    path: Path, offset: int, batch_size: int
+) -> Iterator[tuple[list[bytes], int]]:
+    """Stream the file from offset, yielding batches of lines with their end offset."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        batch = []
+        for line in f:
+            offset += len(line)
+            if line.strip():
+                batch.append(line)
+            if len(batch) == batch_size:
+                yield batch, offset
+                batch = []
+        if batch:
+            yield batch, offset
+
+
+def ingest_snapshot(
+    path: str | Path,
+    store: MetadataStore | None = None,
+    index: VectorIndex | None = None,
+    batch_size: int = 5000,
+    workers: int | None = None,
+    with_index: bool = True,
+    progress: Callable[[IngestStats], None] | None = None,
+) -> IngestStats:
+    """
+    Stream an arXiv metadata snapshot into the metadata store and the vector index.
+
+    The file is read in batches of lines, never loaded in full. Parsing and
+    tokenization run in worker processes, a few batches ahead of the inserts.
+    After each batch, the byte offset reached is saved with the papers in the same
+    transaction, so an interrupted ingestion resumes where it stopped.
+    Args:
+        path: the snapshot file (JSON lines)
+        store: the metadata store. Default is the local one.
+        index: the vector index. Default is the local one.
+        batch_size: the number of lines per batch
+        workers: the number of worker processes. Default is the number of cores;
+            1 processes everything in the current process.
+        with_index: whether to add the abstracts to the vector index too
+        progress: called with the running stats after each batch
+    """
+    path = Path(path)
+    if store is None:
+        store = get_store()
+    if with_index and index is None:
+        index = get_vector_index()
+    workers = workers or os.cpu_count() or 1
+    embedder = index.embedder if with_index else None
+
+    state_key = _state_key(path)
+    offset = int(store.get_state(state_key, "0"))
+    stats = IngestStats(resumed_from=offset)
+    if offset:
+        logger.info(f"{datetime.now()}: Resuming ingestion of {path} at byte {offset}")
+
+    def save(papers: list[dict], vectors: np.ndarray | None, end_offset: int):
+        if vectors is not None:
+            new, seen = [], set()
+            for i, paper in enumerate(papers):
+                if paper["id"] not in index and paper["id"] not in seen:
+                    seen.add(paper["id"])
+                    new.append(i)
+            if new:
+                index.add_vectors([papers[i]["id"] for i in new], vectors[new])
+        store.upsert_papers(papers, state={state_key: end_offset})
+
+    start = time.perf_counter()
+
+    def update(n_papers: int, n_skipped: int):
+        stats.rows += n_papers
+        stats.skipped += n_skipped
+        stats.seconds = time.perf_counter() - start
+        if progress:
+            progress(stats)
+
+    if workers == 1:
+        _init_worker(embedder)
+        for lines, end_offset in _read_batches(path, offset, batch_size):
+            papers, vectors, n_skipped = _process_batch(lines)
+            save(papers, vectors, end_offset)
+            update(len(papers), n_skipped)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(embedder,)
+        ) as executor:
+            # keep a bounded number of batches in flight, and save them in file order
+            in_flight = deque()
+            for lines, end_offset in _read_batches(path, offset, batch_size):
+                in_flight.append((executor.submit(_process_batch, lines), end_offset))
+                if len(in_flight) >= 2 * workers:
+                    future, done_offset = in_flight.popleft()
+                    papers, vectors, n_skipped = future.result()
+                    save(papers, vectors, done_offset)
+                    update(len(papers), n_skipped)
+            while in_flight:
+                future, done_offset = in_flight.popleft()
+                papers, vectors, n_skipped = future.result()
+                save(papers, vectors, done_offset)
+                update(len(papers), n_skipped)
+
+    stats.seconds = time.perf_counter() - start
+    logger.info(
+        f"{datetime.now()}: Ingested {stats.rows} rows from {path} "
+        + f"in {stats.seconds:.1f}s ({stats.rows_per_second:.0f} rows/s)"
+    )
+    return stats
@@ -0,0 +1,318 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+from askademic.constants import ARXIV_BASE_URL
+from askademic.http_client import HttpClient, get_http_client
+from askademic.utils import (
+    extract_arxiv_id,
+    last_announcement,
+    organise_api_response_as_dataframe,
+)
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    category TEXT NOT NULL,
+    day TEXT NOT NULL,
+    articles TEXT NOT NULL,
+    closed INTEGER NOT NULL,
+    fetched_at TEXT NOT NULL,
+    PRIMARY KEY (category, day)
+);
+"""
+
+# the most results the arXiv API returns per request
+PAGE_SIZE = 2000
+
+
+def get_listings_path() -> Path:
+    """Create and return the path of the local listing database"""
+    store_dir = Path(os.path.expanduser("~/.askademic"))
+    store_dir.mkdir(parents=True, exist_ok=True)
+    return store_dir / "listings.db"
+
+
+def days_between(start_day: str, end_day: str) -> list[str]:
+    """The days from start_day to end_day included, as YYYY-MM-DD."""
+    start, end = date.fromisoformat(start_day), date.fromisoformat(end_day)
+    return [
+        (start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)
+    ]
+
+
+class ListingStore:
+    """
+    The articles submitted to a category on a day, keyed by (category, day), in SQLite.
+
+    The listing of a day is closed once a later day has been announced in the category:
+    it never changes again and is kept forever. The listing of the latest day can
+    still grow, so it is only valid until the next announcement.
+    """
+
+    def __init__(self, path: Path | None = None):
+        self._path = Path(path) if path else get_listings_path()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def put(self, category: str, day: str, articles: list[dict], closed: bool) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO listings (category, day, articles, closed, fetched_at) "
+                + "VALUES (?, ?, ?, ?, ?) ON CONFLICT(category, day) DO UPDATE SET "
+                + "articles = excluded.articles, closed = excluded.closed, "
+                + "fetched_at = excluded.fetched_at",
+                (
+                    category,
+                    day,
+                    json.dumps(articles),
+                    int(closed),
+                    datetime.now(timezone.utc).isoformat(),
+                ),
+            )
+
+    def get_range(
+        self,
+        category: str,
+        start_day: str,
+        end_day: str,
+        now: datetime | None = None,
+    ) -> dict[str, list[dict]]:
+        """
+        The valid listings of a category between two days (included), by day.
+        Days not stored, or open and fetched before the latest announcement, are missing.
+        """
+        rows = self._connection.execute(
+            "SELECT day, articles, closed, fetched_at FROM listings "
+            + "WHERE category = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (category, start_day, end_day),
+        ).fetchall()
+        announcement = last_announcement(now)
+        return {
+            day: json.loads(articles)
+            for day, articles, closed, fetched_at in rows
+            if closed or datetime.fromisoformat(fetched_at) >= announcement
+        }
+
+    def get(
+        self, category: str, day: str, now: datetime | None = None
+    ) -> list[dict] | None:
+        return self.get_range(category, day, day, now).get(day)
+
+
+_listing_store: ListingStore | None = None
+_listing_store_lock = threading.Lock()
+
+
+def get_listing_store() -> ListingStore:
+    """Return the process-wide listing store, opening it on first use."""
+    global _listing_store
+    with _listing_store_lock:
+        if _listing_store is None:
+            _listing_store = ListingStore()
+    return _listing_store
+
+
+class ListingFetchError(Exception):
+    """A request for listings to the arXiv API failed."""
+
+
+def iter_listing_pages(
+    category: str,
+    start_day: str,
+    end_day: str,
+    page_size: int = PAGE_SIZE,
+    client: HttpClient | None = None,
+) -> Iterator[list[dict]]:
+    """
+    Fetch from the arXiv API the articles submitted to a category between two days
+    (included), with one query on the submission date, yielding the articles
+    of each result page as soon as it arrives, the most recent first.
+    Raises ListingFetchError if a request fails.
+    Args:
+        category: the category ID
+        start_day: the first day (YYYY-MM-DD)
+        end_day: the last day (YYYY-MM-DD)
+        page_size: the number of results per request, at most PAGE_SIZE
+        client: the HTTP client. Default is the shared one.
+    """
+    if client is None:
+        client = get_http_client()
+
+    start_stamp = start_day.replace("-", "") + "0000"
+    end_stamp = end_day.replace("-", "") + "2359"
+    search_query = f"cat:{category} AND submittedDate:[{start_stamp} TO {end_stamp}]"
+
+    start = 0
+    while True:
+        params = {
+            "search_query": search_query,
+            "start": start,
+            "max_results": page_size,
+            "sortBy": "submittedDate",
+            "sortOrder": "descending",
+        }
+        logger.info(
+            f"{datetime.now()}: Fetching listings of {category} "
+            + f"from {start_day} to {end_day}, from result {start}"
+        )
+        response = client.get(ARXIV_BASE_URL, params=params)
+        if not response.ok:
+            logger.error(
+                f"{datetime.now()}: Error fetching listings: {response.status_code}"
+            )
+            raise ListingFetchError(
+                f"Error fetching listings of {category}: {response.status_code}"
+            )
+
+        df_articles = organise_api_response_as_dataframe(response)
+        page = []
+        for _, row in df_articles.iterrows():
+            day = row["published"].split("T")[0]
+            if start_day <= day <= end_day:
+                page.append(
+                    {
+                        "id": extract_arxiv_id(row["id"]) or row["id"],
+                        "link": row["id"],
+                        "title": " ".join(row["title"].split()),
+                        "abstract": row["abstract"],
+                        "published": day,
+                        "updated": row["updated"],
+                    }
+                )
+        yield page
+
+        if len(df_articles) < page_size:
+            return
+        start += page_size
+
+
+def fetch_listings(
+    category: str,
+    start_day: str,
+    end_day: str,
+    client: HttpClient | None = None,
+) -> dict[str, list[dict]] | None:
+    """
+    Fetch from the arXiv API the articles submitted to a category between two days
+    (included), with one query on the submission date, following the result pages.
+    Returns the articles by day, or None if a request failed.
+    Args:
+        category: the category ID
+        start_day: the first day (YYYY-MM-DD)
+        end_day: the last day (YYYY-MM-DD)
+        client: the HTTP client. Default is the shared one.
+    """
+    listings = {day: [] for day in days_between(start_day, end_day)}
+    try:
+        for page in iter_listing_pages(category, start_day, end_day, client=client):
+            for article in page:
+                listings[article["published"]].append(article)
+    except ListingFetchError:
+        return None
+    return listings
+
+
+def stream_listing(
+    category: str,
+    day: str,
+    latest_day: str | None = None,
+    page_size: int = 100,
+    store: ListingStore | None = None,
+    client: HttpClient | None = None,
+) -> Iterator[list[dict]]:
+    """
+    Load the articles submitted to a category on a day, page by page as they are
+    fetched, so that each page can be processed while the next is on its way.
+
+    A listing in the listing store is yielded as a single page. A fetched one is
+    stored once complete, as load_listings does; if a request fails, the pages
+    fetched so far are all that is yielded, and nothing is stored.
+    Args:
+        category: the category ID
+        day: the day (YYYY-MM-DD)
+        latest_day: the latest day announced in the category. Default is day.
+        page_size: the number of articles per page fetched
+        store: the listing store. Default is the local one.
+        client: the HTTP client. Default is the shared one.
+    """
+    if store is None:
+        store = get_listing_store()
+    latest_day = latest_day or day
+
+    stored = store.get(category, day)
+    if stored is not None:
+        yield stored
+        return
+
+    articles = []
+    try:
+        for page in iter_listing_pages(
+            category, day, day, page_size=page_size, client=client
+        ):
+            articles.extend(page)
+            yield page
+    except ListingFetchError:
+        return
+
+    if day <= latest_day:
+        store.put(category, day, articles, closed=day < latest_day)
+
+
+def load_listings(
+    category: str,
+    start_day: str,
+    end_day: str,
+    latest_day: str | None = None,
+    store: ListingStore | None = None,
+    client: HttpClient | None = None,
+) -> dict[str, list[dict]]:
+    """
+    Load the articles submitted to a category between two days (included), by day.
+
+    The days already in the listing store are read from it; the missing ones are
+    fetched from the arXiv API in a single range query and stored. Days before the
+    latest day are stored as closed, the latest day until the next announcement.
+    Days that could not be fetched are missing from the result.
+    Args:
+        category: the category ID
+        start_day: the first day (YYYY-MM-DD)
+        end_day: the last day (YYYY-MM-DD)
+        latest_day: the latest day announced in the category. Default is end_day,
+            so that no day is closed by mistake.
+        store: the listing store. Default is the local one.
+        client: the HTTP client. Default is the shared one.
+    """
+    if store is None:
+        store = get_listing_store()
+    latest_day = latest_day or end_day
+
+    listings = store.get_range(category, start_day, end_day)
+    missing = [day for day in days_between(start_day, end_day) if day not in listings]
+    if not missing:
+        return listings
+
+    fetched = fetch_listings(category, missing[0], missing[-1], client=client)
+    if fetched is None:
+        return listings
+
+    for day in missing:
+        if day > latest_day:
+            # not announced yet
+            continue
+        store.put(category, day, fetched[day], closed=day < latest_day)
+        listings[day] = fetched[day]
+    return dict(sorted(listings.items()))
@@ -0,0 +1,343 @@
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import TypeAdapter
+from pydantic_ai import RunContext
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelMessagesTypeAdapter,
+    ModelResponse,
+    ModelResponseStreamEvent,
+)
+from pydantic_ai.models import (
+    KnownModelName,
+    Model,
+    ModelRequestParameters,
+    StreamedResponse,
+    infer_model,
+)
+from pydantic_ai.models.wrapper import WrapperModel
+from pydantic_ai.settings import ModelSettings
+from pydantic_ai.usage import RequestUsage
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+"""
+
+# fields of messages and parts that differ between two runs of the same conversation
+VOLATILE_FIELDS = {
+    "timestamp",
+    "run_id",
+    "usage",
+    "provider_response_id",
+    "provider_details",
+    "provider_url",
+    "metadata",
+    "tool_call_id",
+    "id",
+}
+
+_request_parameters_adapter = TypeAdapter(ModelRequestParameters)
+
+
+def get_llm_cache_path() -> Path:
+    """Create and return the path of the LLM response cache"""
+    cache_dir = Path(os.path.expanduser("~/.askademic/cache"))
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return cache_dir / "llm_responses.db"
+
+
+def _stable_messages(messages: list[ModelMessage]) -> list[dict]:
+    """The messages as JSON, without the fields that change from run to run."""
+    stable = []
+    for message in ModelMessagesTypeAdapter.dump_python(messages, mode="json"):
+        message = {k: v for k, v in message.items() if k not in VOLATILE_FIELDS}
+        message["parts"] = [
+            {k: v for k, v in part.items() if k not in VOLATILE_FIELDS}
+            for part in message["parts"]
+        ]
+        stable.append(message)
+    return stable
+
+
+def cache_key(
+    model: str,
+    messages: list[ModelMessage],
+    model_settings: ModelSettings | None,
+    model_request_parameters: ModelRequestParameters,
+) -> str:
+    """
+    The key of a model request: model ID, settings, messages (system prompt
+    included) and a hash of the tool and output schemas.
+    """
+    tools = json.dumps(
+        _request_parameters_adapter.dump_python(model_request_parameters, mode="json"),
+        sort_keys=True,
+    )
+    payload = {
+        "model": model,
+        "settings": model_settings or {},
+        "messages": _stable_messages(messages),
+        "tools": hashlib.sha256(tools.encode()).hexdigest(),
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class LLMCache:
+    """
+    Persistent cache of model responses, in SQLite.
+    Entries expire after ttl seconds; when the cache grows beyond max_bytes,
+    the least recently used entries are dropped.
+    """
+
+    def __init__(
+        self,
+        path: Path | None = None,
+        ttl: float = 7 * 24 * 3600,
+        max_bytes: int = 200 * 1024 * 1024,
+    ):
+        self._path = Path(path) if path else get_llm_cache_path()
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> ModelResponse | None:
+        now = time.time()
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] > self._ttl:
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+            )
+            self.hits += 1
+        return ModelMessagesTypeAdapter.validate_json(row[0])[0]
+
+    def put(self, key: str, model: str, response: ModelResponse) -> None:
+        encoded = ModelMessagesTypeAdapter.dump_json([response]).decode()
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO responses (key, model, response, size, created_at, last_used) "
+                + "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                + "response = excluded.response, size = excluded.size, "
+                + "created_at = excluded.created_at, last_used = excluded.last_used",
+                (key, model, encoded, len(encoded), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        self._connection.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self._ttl,)
+        )
+        total = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        # drop the least recently used entries down to 90% of the limit
+        excess = total - int(0.9 * self._max_bytes)
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ).fetchall():
+            if excess <= 0:
+                break
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+            excess -= size
+
+
+_llm_cache: LLMCache | None = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Return the process-wide LLM response cache, opening it on first use."""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMCache()
+    return _llm_cache
+
+
+@dataclasses.dataclass
+class CachedStreamedResponse(StreamedResponse):
+    """A response from the cache, streamed back a whole part at a time."""
+
+    response: ModelResponse
+
+    def __post_init__(self):
+        self.provider_response_id = self.response.provider_response_id
+        self.provider_details = self.response.provider_details
+        self.finish_reason = self.response.finish_reason
+
+    async def _get_event_iterator(self) -> AsyncIterator[ModelResponseStreamEvent]:
+        for part in self.response.parts:
+            yield self._parts_manager.handle_part(vendor_part_id=None, part=part)
+
+    @property
+    def model_name(self) -> str:
+        return self.response.model_name or ""
+
+    @property
+    def provider_name(self) -> str | None:
+        return self.response.provider_name
+
+    @property
+    def provider_url(self) -> str | None:
+        return self.response.provider_url
+
+    @property
+    def timestamp(self) -> datetime:
+        return self.response.timestamp
+
+
+class CachedModel(WrapperModel):
+    """
+    A model answering from the LLM response cache when it has seen the exact same
+    request before. Only deterministic requests are cached: the ones with
+    temperature explicitly set to 0 in their model settings. Without a temperature,
+    the provider's default applies, which is not 0, so those are not cached.
+    Streamed requests are cached too, once the whole response has been streamed,
+    and a cached response is streamed back in one go.
+    The wrapped model is resolved on first use, so that wrapping a model name
+    does not need the provider credentials yet.
+    """
+
+    def __init__(self, wrapped: Model | KnownModelName, cache: LLMCache | None = None):
+        Model.__init__(self)
+        self._wrapped = wrapped
+        self._cache = cache
+
+    @property
+    def wrapped(self) -> Model:
+        if not isinstance(self._wrapped, Model):
+            self._wrapped = infer_model(self._wrapped)
+        return self._wrapped
+
+    @property
+    def cache(self) -> LLMCache:
+        return self._cache if self._cache is not None else get_llm_cache()
+
+    @property
+    def _model_id(self) -> str:
+        return f"{self.system}:{self.model_name}"
+
+    def _key(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> str | None:
+        """The cache key of the request, None if it is not to be cached."""
+        if (model_settings or {}).get("temperature") != 0:
+            return None
+        return cache_key(
+            self._model_id, messages, model_settings, model_request_parameters
+        )
+
+    def _cached(self, key: str) -> ModelResponse | None:
+        response = self.cache.get(key)
+        if response is None:
+            return None
+        logger.info(f"{datetime.now()}: LLM cache hit for {self._model_id}")
+        # nothing was spent on this response
+        return dataclasses.replace(response, usage=RequestUsage())
+
+    async def request(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+    ) -> ModelResponse:
+        key = self._key(messages, model_settings, model_request_parameters)
+        if key is None:
+            return await self.wrapped.request(
+                messages, model_settings, model_request_parameters
+            )
+
+        response = self._cached(key)
+        if response is not None:
+            return response
+
+        response = await self.wrapped.request(
+            messages, model_settings, model_request_parameters
+        )
+        self.cache.put(key, self._model_id, response)
+        return response
+
+    @asynccontextmanager
+    async def request_stream(
+        self,
+        messages: list[ModelMessage],
+        model_settings: ModelSettings | None,
+        model_request_parameters: ModelRequestParameters,
+        run_context: RunContext | None = None,
+    ) -> AsyncIterator[StreamedResponse]:
+        key = self._key(messages, model_settings, model_request_parameters)
+        response = self._cached(key) if key is not None else None
+        if response is not None:
+            yield CachedStreamedResponse(model_request_parameters, response)
+            return
+
+        async with self.wrapped.request_stream(
+            messages, model_settings, model_request_parameters, run_context
+        ) as stream:
+            yield stream
+        # only a response streamed to the end gets here, an interrupted one raises
+        if key is not None:
+            self.cache.put(key, self._model_id, stream.get())
+
+
+def cached_model(
+    model: Model | KnownModelName, enabled: bool = True
+) -> Model | KnownModelName:
+    """
+    The model, answering from the LLM response cache if enabled. Disabling
+    unwraps an already cached model, so an agent can opt out of the cache
+    even when it is given the model of another agent.
+    The cache can be turned off everywhere with ASKADEMIC_LLM_CACHE=0.
+    """
+    enabled = enabled and os.getenv("ASKADEMIC_LLM_CACHE", "1") != "0"
+    if isinstance(model, CachedModel):
+        return model if enabled else model._wrapped
+    return CachedModel(model) if enabled else model
@@ -1,3 +1,4 @@
+import argparse
 import asyncio
 import logging
 import os
@@ -13,14 +14,27 @@ from dotenv import load_dotenv
 from prompt_toolkit import PromptSession
 from prompt_toolkit.formatted_text import ANSI
 from prompt_toolkit.history import FileHistory
-from pydantic_ai.usage import UsageLimits
+from pydantic_ai.usage import RunUsage, UsageLimits
 from rich.console import Console
 
-from askademic.allower import allower_agent_base
+from askademic.allower import AllowResponse, allower_agent_base
+from askademic.allower_classifier import AllowerClassifier
 from askademic.constants import INSTRUCTIONS
+from askademic.digest import DigestScheduler
+from askademic.harvest import harvest
+from askademic.ingest import ingest_snapshot
 from askademic.memory import Memory
-from askademic.orchestrator import orchestrator_agent_base
+from askademic.orchestrator import Context, orchestrator_agent_base
+from askademic.progress import progress_reporter
 from askademic.prompts.general import USER_PROMPT_ALLOWER_TEMPLATE
+from askademic.registry import get_agent_registry
+from askademic.router import article_exchange, route_to_article
+from askademic.speculation import (
+    SpeculationStats,
+    allow_then_orchestrate,
+    speculation_enabled,
+)
+from askademic.streaming import StreamRenderer, streaming_enabled
 from askademic.utils import choose_model
 
 console = Console()
@@ -118,6 +132,10 @@ async def ask_me():
     )
 
     memory = Memory(max_request_tokens=1e5)
+    speculative = speculation_enabled()
+    speculation_stats = SpeculationStats()
+    allower_classifier = AllowerClassifier()
+    streaming = streaming_enabled()
 
     # ask user to choose the model family (gemini by default)
     while user_model not in (
@@ -170,7 +188,8 @@ async def ask_me():
             break
 
         attempts, max_attempts = 0, 10
-        console.print("[bold cyan]Working for you ...[/bold cyan]")
+        if not streaming:
+            console.print("[bold cyan]Working for you ...[/bold cyan]")
         while attempts < max_attempts:
             try:
 
@@ -179,29 +198,76 @@ async def ask_me():
                     logfire.configure(token=logfire_token, console=False)
                     logfire.instrument_pydantic_ai()
 
-                allower_agent = allower_agent_base
+                # the model is given per run, the agents are shared
                 model, model_settings = choose_model(user_model)
-                allower_agent.model = model
-                allower_agent.model_settings = model_settings
-                allower_result = await allower_agent.run(
-                    USER_PROMPT_ALLOWER_TEMPLATE.format(question=user_question),
-                    usage_limits=UsageLimits(request_limit=20),  # limit to 20 requests
-                    message_history=memory.get_messages()[
-                        -2:
-                    ],  # only the last 2 messages to keep the context, with 1 it may lose it
-                )
-                logger.info(f"{datetime.now()}: Allower run")
-
-                if allower_result.output.is_scientific:
-                    orchestrator_agent = orchestrator_agent_base
-                    model, model_settings = choose_model(user_model)
-                    orchestrator_agent.model = model
-                    orchestrator_agent.model_settings = model_settings
-                    orchestrator_result = await orchestrator_agent.run(
+                model = get_agent_registry().model(model)
+                messages = memory.get_messages()
+
+                async def allow() -> AllowResponse:
+                    # clearly scientific requests do not need the LLM
+                    allowed = allower_classifier.classify(user_question)
+                    if allowed is not None:
+                        return allowed
+                    allower_result = await allower_agent_base.run(
+                        USER_PROMPT_ALLOWER_TEMPLATE.format(question=user_question),
+                        model=model,
+                        model_settings=model_settings,
+                        usage_limits=UsageLimits(
+                            request_limit=20
+                        ),  # limit to 20 requests
+                        message_history=messages[
+                            -2:
+                        ],  # only the last 2 messages to keep the context, with 1 it may lose it
+                    )
+                    return allower_result.output
+
+                def orchestrate(usage: RunUsage):
+                    return orchestrator_agent_base.run(
                         user_question,
+                        model=model,
+                        model_settings=model_settings,
+                        deps=Context(model=model, model_settings=model_settings),
                         usage_limits=UsageLimits(request_limit=20),  # limit requests
-                        message_history=memory.get_messages(),
+                        usage=usage,
+                        message_history=messages,
+                        event_stream_handler=renderer.handle if streaming else None,
+                    )
+
+                # in streaming mode the steps and the answer show as they come
+                renderer = StreamRenderer(console, enabled=streaming)
+                with progress_reporter(renderer.progress):
+                    try:
+                        # a request about one arXiv article goes straight
+                        # to the article agent
+                        article_result = await route_to_article(
+                            user_question, model, model_settings, renderer.show
+                        )
+                        if article_result is None:
+                            # in speculative mode the orchestrator starts
+                            # along with the allower
+                            allowed, orchestrator_result = await allow_then_orchestrate(
+                                allow,
+                                orchestrate,
+                                speculative,
+                                speculation_stats,
+                                on_allowed=renderer.show,
+                            )
+                            logger.info(f"{datetime.now()}: Allower run")
+                    finally:
+                        renderer.close()
+
+                if article_result is not None:
+                    for k in article_result.output.__dict__:
+                        console.print(f"{k}: {getattr(article_result.output, k)}")
+                    # rough size of the exchange, about 4 characters per token
+                    exchange_tokens = (
+                        len(user_question) + len(article_result.output.response)
+                    ) // 4
+                    memory.add_message(
+                        memory.get_total_tokens() + exchange_tokens,
+                        article_exchange(user_question, article_result.output),
                     )
+                elif orchestrator_result is not None:
                     for k in orchestrator_result.output.response.__dict__:
                         console.print(
                             f"{k}: {getattr(orchestrator_result.output.response, k)}"
@@ -212,7 +278,7 @@ async def ask_me():
                         orchestrator_result.new_messages(),
                     )
                 else:
-                    pun = allower_result.output.pun
+                    pun = allowed.pun
                     console.print(
                         f"""{pun} - Ask me something scientific please! :smiley:
                     """
@@ -225,11 +291,160 @@ async def ask_me():
                 attempts += 1
 
 
+def ingest(args: argparse.Namespace):
+    """Load an arXiv metadata snapshot into the local store, reporting progress."""
+    if not os.path.exists(args.path):
+        console.print(f"[bold red]File not found: {args.path}[/bold red]")
+        sys.exit(1)
+
+    console.print(f"[bold cyan]Ingesting {args.path} ...[/bold cyan]")
+    stats = ingest_snapshot(
+        args.path,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        with_index=not args.no_index,
+        progress=lambda s: console.print(
+            f"{s.rows} rows ({s.rows_per_second:.0f} rows/s)", highlight=False
+        ),
+    )
+    if stats.resumed_from:
+        console.print(f"[bold cyan]Resumed at byte {stats.resumed_from}[/bold cyan]")
+    console.print(
+        f"[bold green]Ingested {stats.rows} rows in {stats.seconds:.1f}s "
+        + f"({stats.rows_per_second:.0f} rows/s), skipped {stats.skipped}[/bold green]"
+    )
+
+
+def harvest_sets(args: argparse.Namespace):
+    """Bring the local store up to date with the arXiv OAI-PMH interface."""
+    for set_spec in args.set:
+        console.print(f"[bold cyan]Harvesting set {set_spec} ...[/bold cyan]")
+        stats = harvest(
+            set_spec, from_date=args.from_date, with_index=not args.no_index
+        )
+        console.print(
+            f"[bold green]{stats.upserted} records upserted, {stats.deleted} deleted "
+            + f"(since {stats.from_date or 'the beginning'})[/bold green]"
+        )
+
+
+def digest(args: argparse.Namespace):
+    """Precompute the summaries of the latest articles of the subscribed categories."""
+    load_dotenv()
+    user_model = os.getenv("LLM_FAMILY", "gemini")
+    asyncio.run(check_environment_variables(user_model))
+    model, model_settings = choose_model(user_model)
+
+    categories = args.categories or os.getenv(
+        "ASKADEMIC_DIGEST_CATEGORIES", "cs.AI"
+    ).split(",")
+    try:
+        scheduler = DigestScheduler(
+            [c.strip() for c in categories if c.strip()], model, model_settings
+        )
+    except ValueError as e:
+        console.print(f"[bold red]{e}[/bold red]")
+        sys.exit(1)
+
+    if args.once:
+        computed = asyncio.run(scheduler.run_once())
+        for response in computed:
+            console.print(
+                f"[bold green]Digest of {response.category.category_id} "
+                + f"for {response.latest_published_day} ready[/bold green]"
+            )
+        console.print(f"[bold cyan]{len(computed)} digests computed[/bold cyan]")
+    else:
+        console.print(
+            "[bold cyan]Computing digests after every arXiv announcement "
+            + "(CTRL+C to stop) ...[/bold cyan]"
+        )
+        try:
+            asyncio.run(scheduler.run_forever())
+        except KeyboardInterrupt:
+            console.print("[bold cyan]Goodbye![/bold cyan] :wave:")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="askademic", description="Ask questions about arXiv papers"
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    ingest_parser = subparsers.add_parser(
+        "ingest",
+        help="Load an arXiv metadata snapshot (JSON lines) into the local store",
+    )
+    ingest_parser.add_argument("path", help="Path to the snapshot file")
+    ingest_parser.add_argument(
+        "--batch-size", type=int, default=5000, help="Lines per batch"
+    )
+    ingest_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for parsing and tokenization (default: all cores)",
+    )
+    ingest_parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Do not add abstracts to the vector index",
+    )
+
+    harvest_parser = subparsers.add_parser(
+        "harvest",
+        help="Fetch the records changed since the last harvest from arXiv OAI-PMH",
+    )
+    harvest_parser.add_argument(
+        "--set",
+        nargs="+",
+        default=["cs"],
+        help="OAI sets to harvest, e.g. cs math physics:hep-th (default: cs)",
+    )
+    harvest_parser.add_argument(
+        "--from",
+        dest="from_date",
+        default=None,
+        help="Harvest from this day (YYYY-MM-DD) instead of the last harvest",
+    )
+    harvest_parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Do not add abstracts to the vector index",
+    )
+
+    digest_parser = subparsers.add_parser(
+        "digest",
+        help="Precompute the summaries of the latest articles after each announcement",
+    )
+    digest_parser.add_argument(
+        "--categories",
+        nargs="+",
+        default=None,
+        help="Category IDs, e.g. cs.AI cs.CL "
+        + "(default: $ASKADEMIC_DIGEST_CATEGORIES, comma separated, or cs.AI)",
+    )
+    digest_parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Compute the missing digests and exit instead of running as a scheduler",
+    )
+    return parser.parse_args()
+
+
 # TODO: we have to wrap because main can't be async
 # this fix is temporary. We should monitor pydantic-ai issues and see when they solve it
 # The workaround is described here: https://github.com/pydantic/pydantic-ai/issues/748
 def main():
-    asyncio.run(ask_me())
+    args = parse_args()
+    if args.command == "ingest":
+        ingest(args)
+    elif args.command == "harvest":
+        harvest_sets(args)
+    elif args.command == "digest":
+        digest(args)
+    else:
+        asyncio.run(ask_me())
 
 
 if __name__ == "__main__":
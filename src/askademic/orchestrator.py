@@ -1,14 +1,22 @@
 import logging
 from datetime import datetime
 
-from pydantic import BaseModel, Field
-from pydantic_ai import Agent, RunContext
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_ai import Agent, ModelRetry, RunContext
+from pydantic_ai.models import Model
 
 from askademic.article import ArticleAgent, ArticleResponse
+from askademic.digest import get_digest_store
 from askademic.general import GeneralAgent, GeneralResponse
 from askademic.prompts.general import SYSTEM_PROMPT_ORCHESTRATOR
 from askademic.question import QuestionAgent, QuestionAnswerResponse
-from askademic.summary import SummaryAgent, SummaryResponse
+from askademic.registry import get_agent_registry
+from askademic.summary import (
+    MultiSummaryResponse,
+    RangeSummaryResponse,
+    SummaryAgent,
+    SummaryResponse,
+)
 
 today = datetime.now().strftime("%Y-%m-%d")
 logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
@@ -16,7 +24,21 @@ logger = logging.getLogger(__name__)
 
 
 class Context(BaseModel):
-    pass
+    """
+    The model of a run, passed on to the sub-agents.
+    Without it, the sub-agents use the model the orchestrator runs with.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    model: Model | str | None = None
+    model_settings: dict | None = None
+
+
+def sub_agent_model(ctx: RunContext[Context]) -> tuple[Model | str, dict | None]:
+    """The model and settings the sub-agents of a run use."""
+    deps = ctx.deps or Context()
+    return deps.model or ctx.model, deps.model_settings
 
 
 class OrchestratorResponse(BaseModel):
@@ -26,17 +48,28 @@ class OrchestratorResponse(BaseModel):
     """
 
     type: str = Field(
-        description="The type of the response. Can be 'summary', 'question_answer', 'article', or 'general'."
+        description="The type of the response. Can be 'summary', 'multi_summary', 'range_summary', "
+        + "'question_answer', 'article', or 'general'."
     )
     response: (
-        SummaryResponse | QuestionAnswerResponse | ArticleResponse | GeneralResponse
+        SummaryResponse
+        | MultiSummaryResponse
+        | RangeSummaryResponse
+        | QuestionAnswerResponse
+        | ArticleResponse
+        | GeneralResponse
     ) = Field(
         description="The response to the request. It can be a summary of the latest articles, "
+        + "summaries of the latest articles in several categories, "
+        + "a summary of the articles over a range of days, "
         + "an answer to a question, an article response, or a general academic response."
     )
 
 
+# no model here: each run is given its own, so that runs with different models
+# can go on concurrently
 orchestrator_agent_base = Agent(
+    deps_type=Context,
     system_prompt=SYSTEM_PROMPT_ORCHESTRATOR,
     output_type=OrchestratorResponse,
     retries=20,
@@ -50,17 +83,70 @@ async def summarise_latest_articles(
 ) -> list[str]:
     """
     Make a request to an agent about the most recent paper in a specific field.
+    Precomputed digests are served straight away.
     Args:
         ctx: the context
         request: the request
     """
     logger.info(f"{datetime.now()}: Calling Summary Agent with request: {request}")
-    summary_agent = SummaryAgent(orchestrator_agent_base.model)
+    model, model_settings = sub_agent_model(ctx)
+    summary_agent = get_agent_registry().get(
+        SummaryAgent, model, model_settings, digests=get_digest_store()
+    )
     r = await summary_agent(request=request)
 
     return r
 
 
+@orchestrator_agent_base.tool
+async def summarise_latest_articles_in_categories(
+    ctx: RunContext[Context], requests: list[str]
+) -> MultiSummaryResponse:
+    """
+    Make a request to an agent about the most recent papers in several fields at once.
+    The fields are summarised concurrently, then synthesised together.
+    Args:
+        ctx: the context
+        requests: one request per field, e.g. ["cs.LG", "stat.ML", "NLP"]
+    """
+    logger.info(f"{datetime.now()}: Calling Summary Agent with requests: {requests}")
+    model, model_settings = sub_agent_model(ctx)
+    summary_agent = get_agent_registry().get(
+        SummaryAgent, model, model_settings, digests=get_digest_store()
+    )
+    return await summary_agent.summarise_many(requests)
+
+
+@orchestrator_agent_base.system_prompt
+def add_today() -> str:
+    return f"Today is {datetime.now().strftime('%A %Y-%m-%d')}."
+
+
+@orchestrator_agent_base.tool
+async def summarise_articles_in_range(
+    ctx: RunContext[Context], request: str, start_day: str, end_day: str
+) -> RangeSummaryResponse:
+    """
+    Make a request to an agent about the papers in a specific field over a range of days,
+    e.g. "this week in cs.CL". It returns a summary of each day and of the whole range.
+    Args:
+        ctx: the context
+        request: the request
+        start_day: the first day of the range (YYYY-MM-DD)
+        end_day: the last day of the range (YYYY-MM-DD)
+    """
+    logger.info(
+        f"{datetime.now()}: Calling Summary Agent with request: {request} "
+        + f"from {start_day} to {end_day}"
+    )
+    model, model_settings = sub_agent_model(ctx)
+    summary_agent = get_agent_registry().get(SummaryAgent, model, model_settings)
+    try:
+        return await summary_agent.summarise_range(request, start_day, end_day)
+    except ValueError as e:
+        raise ModelRetry(str(e))
+
+
 @orchestrator_agent_base.tool
 async def answer_question(ctx: RunContext[Context], question: str) -> list[str]:
     """
@@ -70,9 +156,11 @@ async def answer_question(ctx: RunContext[Context], question: str) -> list[str]:
         question: the question
     """
     logger.info(f"{datetime.now()}: Calling QA Agent with question: {question}")
-    question_agent = QuestionAgent(
-        orchestrator_agent_base.model,
-        orchestrator_agent_base.model_settings,
+    model, model_settings = sub_agent_model(ctx)
+    question_agent = get_agent_registry().get(
+        QuestionAgent,
+        model,
+        model_settings,
     )
     r = await question_agent(question=question)
     return r
@@ -93,9 +181,11 @@ async def answer_article(ctx: RunContext[Context], question: str) -> list[str]:
     """
     logger.info(f"{datetime.now()}: Calling Article Agent with question {question};)")
 
-    article_agent = ArticleAgent(
-        orchestrator_agent_base.model,
-        orchestrator_agent_base.model_settings,
+    model, model_settings = sub_agent_model(ctx)
+    article_agent = get_agent_registry().get(
+        ArticleAgent,
+        model,
+        model_settings,
         use_cache=True,  # Enable caching by default
     )
     r = await article_agent.run(request=question)
@@ -118,10 +208,8 @@ async def general_academic(ctx: RunContext[Context], request: str) -> list[str]:
         f"{datetime.now()}: Calling General Academic Agent with request: {request[:100]}..."
     )
 
-    general_agent = GeneralAgent(
-        orchestrator_agent_base.model,
-        orchestrator_agent_base.model_settings,
-    )
+    model, model_settings = sub_agent_model(ctx)
+    general_agent = get_agent_registry().get(GeneralAgent, model, model_settings)
     r = await general_agent(request=request)
     return r
 
@@ -132,10 +220,12 @@ if __name__ == "__main__":
     from askademic.utils import choose_model
 
     model, model_settings = choose_model("claude-aws-bedrock")
-    orchestrator_agent_base.model = model
-    orchestrator_agent_base.model_settings = model_settings
 
     response = asyncio.run(
-        orchestrator_agent_base.run("Can you summarize the latest papers on AI?")
+        orchestrator_agent_base.run(
+            "Can you summarize the latest papers on AI?",
+            model=model,
+            model_settings=model_settings,
+        )
     )
     print(response)
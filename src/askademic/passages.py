@@ -0,0 +1,216 @@
+import json
+import logging
+import math
+import re
+from collections import Counter, OrderedDict
+from datetime import datetime
+
+from askademic.tokens import count_tokens, fit_records
+from askademic.tools import (
+    ARTICLE_CACHE_TTL,
+    get_article,
+    get_cache_key,
+    get_cache_path,
+)
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+ARTICLE_TAGS_PATTERN = re.compile(r"^<article url=\"[^\"]*\">\n|\n</article>$")
+
+# how many passage indexes to keep in memory
+MAX_INDEXES_IN_MEMORY = 32
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def chunk_text(
+    text: str, passage_size: int = 1500, overlap: int = 300
+) -> list[tuple[int, str]]:
+    """
+    Split a text into overlapping passages of about passage_size characters.
+    Passages end on whitespace where possible, so words are not cut in half.
+    Returns a list of (character offset, passage).
+    """
+    passages = []
+    start = 0
+    while start < len(text):
+        end = min(start + passage_size, len(text))
+        if end < len(text):
+            # move the end back to the last whitespace, unless that's too far back
+            cut = text.rfind(" ", start + passage_size // 2, end)
+            if cut != -1:
+                end = cut
+        passages.append((start, text[start:end]))
+        if end == len(text):
+            break
+        start = max(end - overlap, start + 1)
+        # do not start in the middle of a word
+        space = text.find(" ", start, end)
+        if space != -1:
+            start = space + 1
+    return passages
+
+
+class BM25Index:
+    """Okapi BM25 index over the passages of an article."""
+
+    def __init__(
+        self,
+        offsets: list[int],
+        passages: list[str],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        self.offsets = offsets
+        self.passages = passages
+        self._k1 = k1
+        self._b = b
+
+        self._term_frequencies = [Counter(tokenize(p)) for p in passages]
+        self._lengths = [sum(tf.values()) for tf in self._term_frequencies]
+        self._avg_length = (
+            sum(self._lengths) / len(self._lengths) if passages else 0
+        ) or 1
+
+        document_frequency = Counter()
+        for tf in self._term_frequencies:
+            document_frequency.update(tf.keys())
+        n = len(passages)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    @classmethod
+    def from_text(cls, text: str, **kwargs) -> "BM25Index":
+        chunks = chunk_text(text)
+        return cls([o for o, _ in chunks], [p for _, p in chunks], **kwargs)
+
+    def to_dict(self) -> dict:
+        return {"offsets": self.offsets, "passages": self.passages}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BM25Index":
+        return cls(data["offsets"], data["passages"])
+
+    def search(self, query: str, top_k: int = 5) -> list[tuple[int, str, float]]:
+        """
+        Score all passages against the query.
+        Returns the top_k (offset, passage, score), best first, skipping zero scores.
+        """
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        scores = []
+        for i, tf in enumerate(self._term_frequencies):
+            norm = self._k1 * (
+                1 - self._b + self._b * self._lengths[i] / self._avg_length
+            )
+            score = sum(
+                self._idf[t] * tf[t] * (self._k1 + 1) / (tf[t] + norm)
+                for t in terms
+                if t in tf
+            )
+            if score > 0:
+                scores.append((score, i))
+
+        scores.sort(reverse=True)
+        return [(self.offsets[i], self.passages[i], s) for s, i in scores[:top_k]]
+
+
+_indexes: OrderedDict[str, BM25Index] = OrderedDict()
+
+
+def get_passage_index(url: str, use_cache: bool = True) -> BM25Index:
+    """
+    Return the passage index of an article, building it at most once per article.
+    Indexes are kept in memory (LRU) and saved next to the cached article, and
+    expire with it, so that repeated questions about the same article never re-parse
+    or re-index it. Articles that could not be fetched are not indexed for good.
+    """
+    if use_cache and url in _indexes:
+        _indexes.move_to_end(url)
+        return _indexes[url]
+
+    index_path = get_cache_path() / f"{get_cache_key(url)}.passages.json"
+    index = None
+    if use_cache and index_path.exists():
+        try:
+            with open(index_path, "r") as f:
+                data = json.load(f)
+            timestamp = datetime.fromisoformat(data["timestamp"])
+            if datetime.now() - timestamp <= ARTICLE_CACHE_TTL:
+                index = BM25Index.from_dict(data)
+                logger.info(f"{datetime.now()}: Passage index cache hit for {url}")
+        except (json.JSONDecodeError, KeyError, ValueError):
+            index = None
+
+    if index is None:
+        # the whole article, however long: only the best passages are returned
+        text = ARTICLE_TAGS_PATTERN.sub(
+            "", get_article(url, use_cache=use_cache, max_tokens=None)
+        )
+        index = BM25Index.from_text(text)
+        logger.info(
+            f"{datetime.now()}: Built passage index for {url}: {len(index.passages)} passages"
+        )
+        # do not keep an index of a failed download around
+        if text.strip() in ("", "Article Not Found"):
+            return index
+        if use_cache:
+            try:
+                with open(index_path, "w") as f:
+                    json.dump(
+                        {"timestamp": datetime.now().isoformat(), **index.to_dict()},
+                        f,
+                    )
+            except Exception as e:
+                logger.error(f"{datetime.now()}: Failed to save passage index: {e}")
+
+    _indexes[url] = index
+    if len(_indexes) > MAX_INDEXES_IN_MEMORY:
+        _indexes.popitem(last=False)
+    return index
+
+
+def search_article_passages(
+    url: str,
+    query: str,
+    top_k: int = 5,
+    use_cache: bool = True,
+    max_tokens: int | None = None,
+) -> str:
+    """
+    Find the passages of an article that best match a query.
+    Return a JSON list with the following values, best match first:
+    - offset: the character offset of the passage in the article
+    - score: the BM25 score of the passage
+    - passage: the text of the passage
+    If no passage matches, return "No passages found".
+    If the passages are more than max_tokens tokens, the best ones that fit are
+    returned, the first one clipped if it does not fit on its own.
+    Args:
+        url: the article arXiv URL (PDF version)
+        query: the query used to score passages
+        top_k: the number of passages to return. Default is 5.
+        use_cache: whether to use the cached article and index. Default is True.
+        max_tokens: the most tokens of the output. Default is no limit.
+    """
+    results = get_passage_index(url, use_cache=use_cache).search(query, top_k=top_k)
+
+    if not results:
+        return "No passages found"
+
+    records = [
+        {"offset": offset, "score": round(score, 2), "passage": passage}
+        for offset, passage, score in results
+    ]
+    if max_tokens is not None:
+        # drop the worst passages rather than clipping them all
+        while len(records) > 1 and count_tokens(json.dumps(records)) > max_tokens:
+            records.pop()
+        records = fit_records(records, max_tokens, key="passage")
+    return json.dumps(records)
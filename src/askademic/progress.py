@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+# where the steps of the current request are reported, if anywhere
+_reporter: ContextVar[Callable[[str], None] | None] = ContextVar(
+    "progress_reporter", default=None
+)
+
+
+def report_progress(message: str) -> None:
+    """Report a step of the current request, e.g. "Fetching the PDF of 1706.03762"."""
+    reporter = _reporter.get()
+    if reporter is not None:
+        reporter(message)
+
+
+@contextmanager
+def progress_reporter(reporter: Callable[[str], None]) -> Iterator[None]:
+    """
+    Send the steps reported within the block to the reporter.
+    The reporter is inherited by the tasks and threads started within the block,
+    so the sub-agents of a run report to it too.
+    """
+    token = _reporter.set(reporter)
+    try:
+        yield
+    finally:
+        _reporter.reset(token)
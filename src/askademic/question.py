@@ -2,13 +2,18 @@ import logging
 import re
 from datetime import datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_ai import Agent, RunContext
 from pydantic_ai.settings import ModelSettings
 from pydantic_ai.usage import UsageLimits
 
+from askademic.encoding import check_encoding, default_encoding
+from askademic.llm_cache import cached_model
+from askademic.passages import search_article_passages
+from askademic.progress import report_progress
 from askademic.prompts.general import SYSTEM_PROMPT_QUESTION_AGENT
-from askademic.tools import get_article, search_articles_by_abs
+from askademic.tokens import TokenBudget, turn_budget
+from askademic.tools import get_article, next_page, search_articles_by_abs
 
 today = datetime.now().strftime("%Y-%m-%d")
 logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
@@ -27,7 +32,14 @@ class QuestionAnswerResponse(BaseModel):
 class QuestionAgentDeps(BaseModel):
     """Dependencies for the question agent."""
 
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     use_cache: bool = True
+    # what the tool outputs of the run can still take
+    budget: TokenBudget = Field(default_factory=TokenBudget)
+    # how search results are written
+    encoding: str = "json"
+    max_sentences: int | None = None
 
 
 class QuestionAgent:
@@ -36,6 +48,9 @@ class QuestionAgent:
         model: str,
         model_settings: ModelSettings = None,
         use_cache: bool = True,
+        use_llm_cache: bool = True,
+        encoding: str | None = None,
+        max_sentences: int | None = None,
     ):
         """
         Initialize the QuestionAgent.
@@ -44,8 +59,18 @@ class QuestionAgent:
             model: The model to use for the agent.
             model_settings: Optional model settings.
             use_cache: Whether to use cached articles. Default is True.
+            use_llm_cache: Whether to answer from the LLM response cache. Default is True.
+            encoding: How search results are written, json or compact.
+                Default is ASKADEMIC_ENCODING, json if not set.
+            max_sentences: The most sentences of each abstract in search results.
+                Default is all.
         """
         self.use_cache = use_cache
+        self._encoding = check_encoding(encoding or default_encoding())
+        self._max_sentences = max_sentences
+        model = cached_model(model, use_llm_cache)
+        # the tokens of tool outputs per run
+        self._turn_tokens = turn_budget(model)
 
         self._agent = Agent(
             model=model,
@@ -59,17 +84,43 @@ class QuestionAgent:
         def search_articles(ctx: RunContext[QuestionAgentDeps], query: str) -> str:
             """
             Search arXiv for articles by searching in their abstracts.
-            Returns a JSON string with article links and abstracts.
 
             Args:
                 query: The search query to find relevant articles.
             Returns:
-                A JSON string containing a list of articles with their links and abstracts.
+                The articles found, with their arXiv IDs (or links), titles and abstracts,
+                and the cursor of the next results.
             """
             logger.info(f"{datetime.now()}: Searching articles with query: {query}")
-            result = search_articles_by_abs(query)
+            report_progress(f"Searching arXiv for: {query}")
+            budget = ctx.deps.budget
+            result = search_articles_by_abs(
+                query,
+                max_tokens=budget.allowance(),
+                encoding=ctx.deps.encoding,
+                max_sentences=ctx.deps.max_sentences,
+            )
             logger.info(f"{datetime.now()}: Search results: {result[:200]}...")
-            return result
+            return budget.spend(result)
+
+        @self._agent.tool
+        def next_search_page(ctx: RunContext[QuestionAgentDeps], cursor: str) -> str:
+            """
+            Get the next results of a search, from its next_page_cursor.
+            Returns the articles, as the search does, and the next cursor.
+
+            Args:
+                cursor: The next_page_cursor returned by the previous search or page.
+            """
+            logger.info(f"{datetime.now()}: Getting the next page of a search")
+            budget = ctx.deps.budget
+            result = next_page(
+                cursor,
+                max_tokens=budget.allowance(),
+                encoding=ctx.deps.encoding,
+                max_sentences=ctx.deps.max_sentences,
+            )
+            return budget.spend(result)
 
         @self._agent.tool
         def fetch_article(ctx: RunContext[QuestionAgentDeps], link: str) -> str:
@@ -84,9 +135,45 @@ class QuestionAgent:
             """
             normalized_link = self._normalize_arxiv_link(link)
             logger.info(f"{datetime.now()}: Fetching article: {normalized_link}")
-            result = get_article(normalized_link, use_cache=ctx.deps.use_cache)
+            report_progress(f"Fetching the PDF of {normalized_link}")
+            budget = ctx.deps.budget
+            result = get_article(
+                normalized_link,
+                use_cache=ctx.deps.use_cache,
+                max_tokens=budget.allowance(),
+            )
             logger.info(f"{datetime.now()}: Article fetched, length: {len(result)}")
-            return result
+            return budget.spend(result)
+
+        @self._agent.tool
+        def search_article(
+            ctx: RunContext[QuestionAgentDeps], link: str, query: str
+        ) -> str:
+            """
+            Find the passages of an article that are most relevant to a query,
+            instead of fetching its full content.
+
+            Args:
+                link: The arXiv link or ID (e.g., "https://arxiv.org/abs/1706.03762"
+                      or "1706.03762" or "https://arxiv.org/pdf/1706.03762.pdf").
+                query: What to look for in the article.
+            Returns:
+                A JSON string with the best matching passages and their character offsets.
+            """
+            normalized_link = self._normalize_arxiv_link(link)
+            logger.info(
+                f"{datetime.now()}: Searching article {normalized_link} for: {query}"
+            )
+            report_progress(f"Reading {normalized_link}")
+            budget = ctx.deps.budget
+            result = search_article_passages(
+                normalized_link,
+                query,
+                use_cache=ctx.deps.use_cache,
+                max_tokens=budget.allowance(),
+            )
+            logger.info(f"{datetime.now()}: Passages found, length: {len(result)}")
+            return budget.spend(result)
 
     def _normalize_arxiv_link(self, link: str) -> str:
         """
@@ -129,10 +216,21 @@ class QuestionAgent:
         """
         logger.info(f"{datetime.now()}: QuestionAgent received question: {question}")
 
-        deps = QuestionAgentDeps(use_cache=self.use_cache)
+        deps = QuestionAgentDeps(
+            use_cache=self.use_cache,
+            budget=TokenBudget(self._turn_tokens),
+            encoding=self._encoding,
+            max_sentences=self._max_sentences,
+        )
         usage_limits = UsageLimits(tool_calls_limit=20)
         result = await self._agent.run(question, deps=deps, usage_limits=usage_limits)
 
+        # search results may give arXiv IDs rather than links
+        if result.output and result.output.article_list:
+            result.output.article_list = [
+                self._normalize_arxiv_link(link) for link in result.output.article_list
+            ]
+
         logger.info(f"{datetime.now()}: QuestionAgent completed question")
         return result
 
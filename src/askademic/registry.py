@@ -0,0 +1,93 @@
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import TypeVar
+
+from pydantic_ai.models import KnownModelName, Model, infer_model
+from pydantic_ai.settings import ModelSettings
+
+from askademic.llm_cache import cached_model
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+A = TypeVar("A")
+
+
+class AgentRegistry:
+    """
+    Sub-agents built once per (agent class, model, settings, options) and reused
+    across turns and sessions.
+
+    Models given by name are resolved once and shared by all the agents using them,
+    so that they share the provider client and its open connections too.
+    The agents are stateless between calls, so one instance can serve concurrent runs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models: dict[str, Model] = {}
+        self._agents: dict[tuple, object] = {}
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def model(self, model: Model | KnownModelName) -> Model:
+        """The shared instance of a model, answering from the LLM response cache."""
+        if isinstance(model, Model):
+            return model
+        with self._lock:
+            if model not in self._models:
+                shared = cached_model(model)
+                self._models[model] = (
+                    shared if isinstance(shared, Model) else infer_model(shared)
+                )
+            return self._models[model]
+
+    def get(
+        self,
+        agent_class: type[A],
+        model: Model | KnownModelName,
+        model_settings: ModelSettings | None = None,
+        **kwargs,
+    ) -> A:
+        """
+        The agent of a class for a model and settings, built on first use.
+        Args:
+            agent_class: the class of the agent, e.g. SummaryAgent
+            model: the model, or its name
+            model_settings: the model settings
+            kwargs: the other arguments of the agent class, which must be hashable
+        """
+        model = self.model(model)
+        key = (
+            agent_class,
+            id(model),
+            json.dumps(model_settings or {}, sort_keys=True, default=str),
+            tuple(sorted(kwargs.items())),
+        )
+        with self._lock:
+            if key not in self._agents:
+                logger.info(f"{datetime.now()}: Building {agent_class.__name__}")
+                self._agents[key] = agent_class(model, model_settings, **kwargs)
+            return self._agents[key]
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._agents.clear()
+
+
+_agent_registry: AgentRegistry | None = None
+_agent_registry_lock = threading.Lock()
+
+
+def get_agent_registry() -> AgentRegistry:
+    """Return the process-wide agent registry."""
+    global _agent_registry
+    with _agent_registry_lock:
+        if _agent_registry is None:
+            _agent_registry = AgentRegistry()
+    return _agent_registry
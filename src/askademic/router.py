@@ -0,0 +1,69 @@
+import logging
+from datetime import datetime
+from typing import Callable
+
+from pydantic_ai.messages import (
+    ModelMessage,
+    ModelRequest,
+    ModelResponse,
+    TextPart,
+    UserPromptPart,
+)
+from pydantic_ai.models import Model
+from pydantic_ai.settings import ModelSettings
+
+from askademic.article import (
+    ArticleAgent,
+    ArticleResponse,
+    article_to_read,
+    prefetch_article,
+)
+from askademic.registry import get_agent_registry
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+
+async def route_to_article(
+    request: str,
+    model: Model | str,
+    model_settings: ModelSettings | None = None,
+    on_routed: Callable[[], None] | None = None,
+):
+    """
+    Send a request about a single arXiv article, given by ID or link, straight to the
+    article agent, without asking the allower and the orchestrator.
+    The PDF fetch starts before anything else.
+    Returns the result of the article agent, or None if the request is not just about
+    reading one article (see article_to_read) and must go through the usual path.
+    Args:
+        request: the user request
+        model: the model of the run
+        model_settings: the model settings of the run
+        on_routed: called if the request is routed, e.g. to start rendering progress
+    """
+    arxiv_id = article_to_read(request)
+    if arxiv_id is None:
+        return None
+
+    logger.info(f"{datetime.now()}: Routing request to article {arxiv_id}")
+    if on_routed is not None:
+        on_routed()
+    fetch = prefetch_article(arxiv_id)
+    article_agent = get_agent_registry().get(
+        ArticleAgent, model, model_settings, use_cache=True
+    )
+    return await article_agent.read(request, arxiv_id, fetch)
+
+
+def article_exchange(request: str, response: ArticleResponse) -> list[ModelMessage]:
+    """
+    The request and the response of a routed article request, as messages for the
+    conversation memory, so that follow-up questions know which article it was about.
+    The text of the article is left out.
+    """
+    return [
+        ModelRequest(parts=[UserPromptPart(request)]),
+        ModelResponse(parts=[TextPart(response.model_dump_json())]),
+    ]
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from pydantic_ai.usage import RunUsage
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+
+def speculation_enabled() -> bool:
+    """Whether the orchestrator starts along with the allower (ASKADEMIC_SPECULATIVE=1)."""
+    return os.getenv("ASKADEMIC_SPECULATIVE", "0") == "1"
+
+
+@dataclass
+class SpeculationStats:
+    """How much of the speculative work was thrown away."""
+
+    started: int = 0
+    discarded: int = 0
+    tokens: int = 0
+    wasted_tokens: int = 0
+
+    @property
+    def waste_ratio(self) -> float:
+        """The share of speculative runs discarded because the allower rejected the question."""
+        return self.discarded / self.started if self.started else 0.0
+
+    @property
+    def wasted_token_ratio(self) -> float:
+        """The share of the tokens of speculative runs spent on discarded ones."""
+        return self.wasted_tokens / self.tokens if self.tokens else 0.0
+
+
+async def allow_then_orchestrate(
+    allow: Callable[[], Awaitable[Any]],
+    orchestrate: Callable[[RunUsage], Awaitable[Any]],
+    speculative: bool = False,
+    stats: SpeculationStats | None = None,
+    on_allowed: Callable[[], None] | None = None,
+) -> tuple[Any, Any | None]:
+    """
+    Run the allower and, if it accepts the question, the orchestrator.
+    Returns the allower response and the orchestrator result, None if rejected.
+
+    In speculative mode the orchestrator starts at the same time as the allower,
+    saving the latency of the allower call on accepted questions. If the allower
+    rejects the question, the orchestrator run is cancelled and its result discarded:
+    nothing of it reaches the caller or the conversation memory. What it may have put
+    in the local caches (articles, listings, model responses) is left there.
+    Args:
+        allow: runs the allower, returning its response (AllowResponse)
+        orchestrate: runs the orchestrator, counting its usage in the given RunUsage
+        speculative: whether to start the orchestrator along with the allower
+        stats: the speculation statistics to update
+        on_allowed: called once the question is accepted, before waiting for the
+            orchestrator, e.g. to start rendering its progress
+    """
+    if not speculative:
+        allowed = await allow()
+        if not allowed.is_scientific:
+            return allowed, None
+        if on_allowed is not None:
+            on_allowed()
+        return allowed, await orchestrate(RunUsage())
+
+    if stats is None:
+        stats = SpeculationStats()
+    usage = RunUsage()
+    orchestration = asyncio.create_task(orchestrate(usage))
+    stats.started += 1
+
+    try:
+        allowed = await allow()
+        is_scientific = allowed.is_scientific
+    except BaseException:
+        await _discard(orchestration)
+        raise
+
+    if is_scientific:
+        if on_allowed is not None:
+            on_allowed()
+        try:
+            return allowed, await orchestration
+        finally:
+            stats.tokens += usage.total_tokens
+
+    # the usage counts what the run spent until it was cancelled
+    await _discard(orchestration)
+    stats.discarded += 1
+    stats.tokens += usage.total_tokens
+    stats.wasted_tokens += usage.total_tokens
+    logger.info(
+        f"{datetime.now()}: Discarded speculative run ({usage.total_tokens} tokens), "
+        + f"waste ratio {stats.waste_ratio:.2f}, "
+        + f"wasted token ratio {stats.wasted_token_ratio:.2f}"
+    )
+    return allowed, None
+
+
+async def _discard(task: asyncio.Task):
+    """Cancel a task and wait for it to stop, ignoring how it ends."""
+    task.cancel()
+    try:
+        await task
+    except (asyncio.CancelledError, Exception):
+        # cancelled, or failed before it could be
+        pass
@@ -0,0 +1,167 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+PAPER_FIELDS = [
+    "id",
+    "title",
+    "abstract",
+    "authors",
+    "categories",
+    "published",
+    "updated",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    abstract TEXT NOT NULL,
+    authors TEXT,
+    categories TEXT,
+    published TEXT,
+    updated TEXT
+);
+CREATE INDEX IF NOT EXISTS papers_published ON papers (published);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, abstract, content='papers', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts (rowid, title, abstract)
+    VALUES (new.rowid, new.title, new.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstract)
+    VALUES ('delete', old.rowid, old.title, old.abstract);
+    INSERT INTO papers_fts (rowid, title, abstract)
+    VALUES (new.rowid, new.title, new.abstract);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstract)
+    VALUES ('delete', old.rowid, old.title, old.abstract);
+END;
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def get_store_path() -> Path:
+    """Create and return the path of the local metadata database"""
+    store_dir = Path(os.path.expanduser("~/.askademic"))
+    store_dir.mkdir(parents=True, exist_ok=True)
+    return store_dir / "metadata.db"
+
+
+class MetadataStore:
+    """
+    Local store of arXiv paper metadata, in SQLite, with a full-text index
+    (FTS5) over titles and abstracts and a small key-value table for bookkeeping
+    (ingestion offsets, harvest watermarks).
+    """
+
+    def __init__(self, path: Path | None = None):
+        self._path = Path(path) if path else get_store_path()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self._path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def upsert_papers(
+        self,
+        papers: list[dict],
+        state: dict | None = None,
+        deleted: list[str] | None = None,
+    ) -> None:
+        """
+        Insert or update papers (dicts with the PAPER_FIELDS keys) in one transaction.
+        State entries, if given, are saved in the same transaction, so that
+        a bookkeeping value never gets ahead of the papers it refers to,
+        and so are the deletions of the papers with the IDs in deleted, if given
+        (e.g. withdrawn ones), from the papers and the full-text index.
+        """
+        columns = ", ".join(PAPER_FIELDS)
+        placeholders = ", ".join(f":{f}" for f in PAPER_FIELDS)
+        updates = ", ".join(f"{f} = excluded.{f}" for f in PAPER_FIELDS[1:])
+        with self._lock, self._connection:
+            self._connection.executemany(
+                f"INSERT INTO papers ({columns}) VALUES ({placeholders}) "
+                + f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                [{f: p.get(f) for f in PAPER_FIELDS} for p in papers],
+            )
+            self._connection.executemany(
+                "DELETE FROM papers WHERE id = ?",
+                [(arxiv_id,) for arxiv_id in deleted or []],
+            )
+            for key, value in (state or {}).items():
+                self._set_state(key, value)
+
+    def get_paper(self, arxiv_id: str) -> dict | None:
+        row = self._connection.execute(
+            "SELECT * FROM papers WHERE id = ?", (arxiv_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def search(self, query: str, limit: int = 20, match_all: bool = True) -> list[dict]:
+        """
+        Full-text search over titles and abstracts, best match (BM25) first.
+        If match_all is True, all the words of the query have to appear in a paper
+        for it to match, otherwise any of them does.
+        """
+        terms = re.findall(r"\w+", query.lower())
+        if not terms:
+            return []
+        match = (" " if match_all else " OR ").join(f'"{t}"' for t in terms)
+        rows = self._connection.execute(
+            "SELECT papers.* FROM papers_fts JOIN papers ON papers.rowid = papers_fts.rowid "
+            + "WHERE papers_fts MATCH ? ORDER BY bm25(papers_fts) LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def get_state(self, key: str, default: str | None = None) -> str | None:
+        row = self._connection.execute(
+            "SELECT value FROM state WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else default
+
+    def set_state(self, key: str, value: str) -> None:
+        with self._lock, self._connection:
+            self._set_state(key, value)
+
+    def _set_state(self, key: str, value: str) -> None:
+        self._connection.execute(
+            "INSERT INTO state (key, value) VALUES (?, ?) "
+            + "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, str(value)),
+        )
+
+
+_store: MetadataStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> MetadataStore:
+    """Return the process-wide metadata store, opening it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = MetadataStore()
+    return _store
@@ -0,0 +1,145 @@
+import json
+import os
+import threading
+from typing import AsyncIterable
+
+from pydantic_ai import RunContext
+from pydantic_ai.messages import (
+    AgentStreamEvent,
+    FunctionToolCallEvent,
+    PartDeltaEvent,
+    PartStartEvent,
+    ToolCallPart,
+    ToolCallPartDelta,
+)
+from pydantic_core import from_json
+from rich.console import Console, Group
+from rich.live import Live
+from rich.spinner import Spinner
+from rich.text import Text
+
+# what the user is told while a tool of the orchestrator runs
+TOOL_PROGRESS = {
+    "summarise_latest_articles": "Summarising the latest articles",
+    "summarise_latest_articles_in_categories": "Summarising the latest articles "
+    + "of several categories",
+    "summarise_articles_in_range": "Summarising the articles over a range of days",
+    "answer_question": "Searching arXiv and reading articles",
+    "answer_article": "Finding and reading the article",
+    "general_academic": "Looking into it",
+}
+
+# the prefix of the names of the tools through which agents give their output
+OUTPUT_TOOL_PREFIX = "final_result"
+
+
+def streaming_enabled() -> bool:
+    """Whether answers are rendered as they stream (ASKADEMIC_STREAM=0 turns it off)."""
+    return os.getenv("ASKADEMIC_STREAM", "1") != "0"
+
+
+class StreamRenderer:
+    """
+    Render a run to the terminal as it streams: the step it is at and the fields
+    of its structured output as they are being written.
+
+    handle is the event stream handler of the run. Steps reported by the sub-agents
+    come in through progress, possibly from other threads.
+    Nothing is shown before show is called, so that a run can be rendered only once
+    it is known to be wanted, nor ever if not enabled.
+    """
+
+    def __init__(
+        self,
+        console: Console,
+        status: str = "Working for you ...",
+        enabled: bool = True,
+    ):
+        self._console = console
+        self._enabled = enabled
+        self._status = status
+        self._output: dict = {}
+        self._output_args: dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._live: Live | None = None
+
+    @property
+    def output(self) -> dict:
+        """The output written so far, possibly partial."""
+        return self._output
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    def show(self):
+        with self._lock:
+            if self._enabled and self._live is None:
+                self._live = Live(
+                    self._renderable(),
+                    console=self._console,
+                    refresh_per_second=8,
+                    transient=True,
+                )
+                self._live.start()
+
+    def close(self):
+        """Stop rendering; the final output is printed by the caller."""
+        with self._lock:
+            if self._live is not None:
+                self._live.stop()
+                self._live = None
+
+    def progress(self, message: str):
+        self._status = message
+        self._refresh()
+
+    async def handle(
+        self, ctx: RunContext, events: AsyncIterable[AgentStreamEvent]
+    ) -> None:
+        async for event in events:
+            self.on_event(event)
+
+    def on_event(self, event: AgentStreamEvent):
+        if isinstance(event, FunctionToolCallEvent):
+            name = event.part.tool_name
+            self._status = TOOL_PROGRESS.get(name, f"Calling {name}")
+        elif isinstance(event, PartStartEvent):
+            self._output_args.pop(event.index, None)
+            if isinstance(event.part, ToolCallPart) and event.part.tool_name.startswith(
+                OUTPUT_TOOL_PREFIX
+            ):
+                self._add_output_args(event.index, event.part.args)
+        elif isinstance(event, PartDeltaEvent) and isinstance(
+            event.delta, ToolCallPartDelta
+        ):
+            if event.index in self._output_args and event.delta.args_delta:
+                self._add_output_args(event.index, event.delta.args_delta)
+        self._refresh()
+
+    def _add_output_args(self, index: int, args: str | dict | None):
+        if isinstance(args, dict):
+            self._output_args[index] = json.dumps(args)
+        else:
+            self._output_args[index] = self._output_args.get(index, "") + (args or "")
+        try:
+            output = from_json(
+                self._output_args[index], allow_partial="trailing-strings"
+            )
+        except ValueError:
+            return
+        if isinstance(output, dict):
+            self._output = output
+
+    def _renderable(self):
+        lines = [Spinner("dots", text=Text(self._status, style="bold cyan"))]
+        response = self._output.get("response", self._output)
+        if isinstance(response, dict):
+            for k, v in response.items():
+                lines.append(Text(f"{k}: {v}"))
+        return Group(*lines)
+
+    def _refresh(self):
+        with self._lock:
+            if self._live is not None:
+                self._live.update(self._renderable())
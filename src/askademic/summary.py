@@ -1,22 +1,39 @@
+import asyncio
 import logging
+import os
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from pydantic import BaseModel, Field
 from pydantic_ai import Agent, Tool
 from pydantic_ai.settings import ModelSettings
 
+from askademic.category_classifier import CategoryClassifier
+from askademic.clustering import cluster_abstracts, clustering_enabled
+from askademic.encoding import check_encoding, default_encoding, encode_abstracts
+from askademic.listings import days_between, load_listings, stream_listing
+from askademic.llm_cache import cached_model
+from askademic.progress import report_progress
 from askademic.prompts.general import (
     SYSTEM_PROMPT_CATEGORY,
     SYSTEM_PROMPT_SUMMARY,
     USER_PROMPT_CATEGORY_TEMPLATE,
+    USER_PROMPT_CLUSTERED_SUMMARY_TEMPLATE,
+    USER_PROMPT_COMBINE_SUMMARIES_TEMPLATE,
     USER_PROMPT_SUMMARY_TEMPLATE,
+    USER_PROMPT_SYNTHESIS_TEMPLATE,
 )
+from askademic.tokens import estimate_tokens
 from askademic.tools import (
+    find_categories,
     get_categories,
     identify_latest_day,
     retrieve_recent_articles,
 )
 
+if TYPE_CHECKING:
+    from askademic.digest import DigestStore
+
 today = datetime.now().strftime("%Y-%m-%d")
 logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
 logger = logging.getLogger(__name__)
@@ -37,6 +54,25 @@ class Summary(BaseModel):
     )
 
 
+class ClusteredSummary(BaseModel):
+    """The summary of the articles requested, grouped by topic."""
+
+    summary: str = Field(
+        description="Global summary of all abstracts, identifying topics."
+    )
+    labels: list[str] = Field(
+        description="A short label for each group of articles, in the order given."
+    )
+
+
+class Topic(BaseModel):
+    """A topic of the articles, found by grouping their abstracts."""
+
+    label: str = Field(description="A short label of the topic.")
+    n_articles: int = Field(description="The number of articles about the topic.")
+    keywords: list[str] = Field(description="The keywords of the topic.")
+
+
 class SummaryResponse(BaseModel):
     """The response of the summary agent."""
 
@@ -50,17 +86,106 @@ class SummaryResponse(BaseModel):
     recent_papers_url: str = Field(
         description="arXiv URL to the most recent papers in the chosen category"
     )
+    topics: list[Topic] = Field(
+        default_factory=list,
+        description="The topics of the articles, if they were grouped by topic.",
+    )
+
+
+class DaySummary(BaseModel):
+    """The summary of the articles of one day."""
+
+    day: str = Field(description="The day of publication.")
+    n_articles: int = Field(description="The number of articles published that day.")
+    summary: str = Field(description="Summary of the abstracts of the day.")
+
+
+class RangeSummaryResponse(BaseModel):
+    """The response of the summary agent for a range of days."""
+
+    category: Category = Field(description="The category of the articles.")
+    start_day: str = Field(description="The first day of the range.")
+    end_day: str = Field(description="The last day of the range.")
+    daily_summaries: list[DaySummary] = Field(
+        description="The summary of each day with articles."
+    )
+    summary: str = Field(
+        description="Global summary of all the days, identifying topics."
+    )
+    recent_papers_url: str = Field(
+        description="arXiv URL to the most recent papers in the chosen category"
+    )
+
+
+class MultiSummaryResponse(BaseModel):
+    """The response of the summary agent for several categories."""
+
+    summaries: list[SummaryResponse] = Field(
+        description="The summary of the latest articles of each category."
+    )
+    summary: str = Field(
+        description="Synthesis of the summaries across categories, "
+        + "identifying common and distinct topics."
+    )
+
+
+# the longest range of days summarised in one go
+MAX_RANGE_DAYS = 31
+
+
+def pipelining_enabled() -> bool:
+    """Whether listings are summarised as their pages arrive (ASKADEMIC_PIPELINE=1)."""
+    return os.getenv("ASKADEMIC_PIPELINE", "0") == "1"
+
+
+def batch_by_tokens(texts: list[str], max_tokens: int) -> list[list[str]]:
+    """
+    Split texts, in order, into batches of at most max_tokens (estimated) each.
+    A text longer than max_tokens makes a batch on its own.
+    """
+    batches, batch, size = [], [], 0
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and size + tokens > max_tokens:
+            batches.append(batch)
+            batch, size = [], 0
+        batch.append(text)
+        size += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def model_key(model) -> str:
+    """A string identifying a model, for keying what it produced."""
+    # the same model, whether its responses are cached or not
+    model = cached_model(model, enabled=False)
+    if isinstance(model, str):
+        return model
+    return f"{model.system}:{model.model_name}"
 
 
 class SummaryAgent:
-    def __init__(self, model: str, model_settings: ModelSettings = None):
+    def __init__(
+        self,
+        model: str,
+        model_settings: ModelSettings = None,
+        digests: "DigestStore | None" = None,
+        max_concurrency: int = 4,
+        max_batch_tokens: int = 20_000,
+        cluster: bool | None = None,
+        pipelined: bool | None = None,
+        encoding: str | None = None,
+        use_llm_cache: bool = True,
+    ):
+        model = cached_model(model, use_llm_cache)
 
         self._category_agent = Agent(
             model=model,
             model_settings=model_settings,
             system_prompt=SYSTEM_PROMPT_CATEGORY,
             output_type=Category,
-            tools=[Tool(get_categories)],
+            tools=[Tool(find_categories), Tool(get_categories)],
         )
 
         self._summary_agent = Agent(
@@ -70,10 +195,42 @@ class SummaryAgent:
             output_type=Summary,
         )
 
+        self._clustered_summary_agent = Agent(
+            model=model,
+            model_settings=model_settings,
+            system_prompt=SYSTEM_PROMPT_SUMMARY,
+            output_type=ClusteredSummary,
+        )
+
+        self._category_classifier = CategoryClassifier()
+
+        # precomputed summaries, served instead of summarising again if given
+        self._digests = digests
+        self._model_key = model_key(model)
+
         self._max_results = 300
+        # the number of days or categories fetched, and of summaries made, at once
+        self._max_concurrency = max_concurrency
+        # the most tokens of abstracts (or summaries) summarised in one LLM call:
+        # bigger listings are summarised in batches, concurrently, then combined
+        self._max_batch_tokens = max_batch_tokens
+        # whether big listings are grouped by topic, and only the most representative
+        # abstracts of each topic summarised. Default is ASKADEMIC_CLUSTER.
+        self._cluster = clustering_enabled() if cluster is None else cluster
+        self._min_cluster_articles = 30
+        self._n_representatives = 3
+        # whether the listing of a day is summarised page by page as it is fetched,
+        # unless grouped by topic, which needs it whole. Default is ASKADEMIC_PIPELINE.
+        self._pipelined = pipelining_enabled() if pipelined is None else pipelined
+        self._page_size = 100
+        # how abstracts are written in the prompts, json or compact
+        # (one numbered line each). Default is ASKADEMIC_ENCODING.
+        self._encoding = check_encoding(encoding or default_encoding())
 
         self._identify_latest_day = identify_latest_day
         self._retrieve_recent_articles = retrieve_recent_articles
+        self._load_listings = load_listings
+        self._stream_listing = stream_listing
 
     async def __call__(self, request: str) -> SummaryResponse:
         """
@@ -83,36 +240,413 @@ class SummaryAgent:
         Returns:
             summary: the summary of the latest articles in a specific category
         """
-        # Get the category
-        category = await self._category_agent.run(
-            USER_PROMPT_CATEGORY_TEMPLATE.format(request=request)
-        )
+        # Get the category, locally if the request is clear enough, else from the LLM
+        category = await self._get_category(request)
 
         logger.info(
-            f"Category selected: {category.output.category_id} - {category.output.category_name}"
+            f"Category selected: {category.category_id} - {category.category_name}"
+        )
+        return await self._summarise_latest(category)
+
+    async def summarise_many(self, requests: list[str]) -> MultiSummaryResponse:
+        """
+        Get the summary of the latest articles in several categories.
+        The category of each request is found, and each category summarised,
+        concurrently (at most max_concurrency at a time); the summaries are then
+        synthesised into a global one.
+        Args:
+            requests: the requests, one per category (e.g. ["cs.LG", "stat.ML", "NLP"])
+        Returns:
+            summary: the summary of each category and their synthesis
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def get_category(request: str) -> Category:
+            async with semaphore:
+                return await self._get_category(request)
+
+        async def summarise(category: Category) -> SummaryResponse:
+            async with semaphore:
+                return await self._summarise_latest(category)
+
+        categories = {}
+        for category in await asyncio.gather(*[get_category(r) for r in requests]):
+            categories.setdefault(category.category_id, category)
+        logger.info(f"Categories selected: {', '.join(categories)}")
+
+        summaries = await asyncio.gather(
+            *[summarise(category) for category in categories.values()]
         )
+        if len(summaries) == 1:
+            summary = summaries[0].summary
+        else:
+            text = "\n".join(
+                f'<summary category="{s.category.category_name} ({s.category.category_id})" '
+                + f'day="{s.latest_published_day}">\n{s.summary}\n</summary>'
+                for s in summaries
+            )
+            synthesis = await self._summary_agent.run(
+                USER_PROMPT_SYNTHESIS_TEMPLATE.format(summaries=text)
+            )
+            summary = synthesis.output.summary
+
+        return MultiSummaryResponse(summaries=summaries, summary=summary)
 
+    async def _summarise_latest(self, category: Category) -> SummaryResponse:
+        """Summarise the latest day of a category, serving its digest if current."""
+        if self._digests is not None:
+            digest = self._digests.get_current(category.category_id, self._model_key)
+            if digest is not None:
+                logger.info(f"Serving digest of {digest.latest_published_day}")
+                return digest
+
+        return await self.summarise(category)
+
+    async def summarise(
+        self, category: Category, latest_day: str | None = None
+    ) -> SummaryResponse:
+        """
+        Summarise the articles of a category published on a day.
+        Args:
+            category: the category
+            latest_day: the day. Default is the latest day available on the API.
+        Returns:
+            summary: the summary of the articles
+        """
         # Get the latest published day
-        latest_day = self._identify_latest_day(category.output.category_id)
+        if latest_day is None:
+            latest_day = await asyncio.to_thread(
+                self._identify_latest_day, category.category_id
+            )
+
+        if self._digests is not None:
+            digest = self._digests.get(
+                category.category_id, latest_day, self._model_key
+            )
+            if digest is not None:
+                logger.info(f"Serving digest of {latest_day}")
+                return digest
 
         # Get the articles
-        articles = self._retrieve_recent_articles(
-            category=category.output.category_id,
-            latest_day=latest_day,
-            max_results=self._max_results,
+        report_progress(
+            f"Fetching the articles of {latest_day} in {category.category_id}"
         )
+        topics = []
+        if self._pipelined and not self._cluster and latest_day != "Not Found":
+            # the pages of the listing are summarised while the next ones are fetched
+            summary, n_articles = await self._summarise_pipelined(
+                category.category_id, latest_day
+            )
+        else:
+            articles = await asyncio.to_thread(
+                self._retrieve_recent_articles,
+                category=category.category_id,
+                latest_day=latest_day,
+                max_results=self._max_results,
+            )
+            n_articles = len(articles) if isinstance(articles, list) else 0
 
-        logger.info(f"Latest published day: {latest_day} - Articles #: {len(articles)}")
-        # logger.info(f"Articles: {articles}")
+            logger.info(
+                f"Latest published day: {latest_day} - Articles #: {n_articles}"
+            )
+            # logger.info(f"Articles: {articles}")
 
-        # Create the summary
-        summary = await self._summary_agent.run(
-            USER_PROMPT_SUMMARY_TEMPLATE.format(articles=articles)
-        )
+            # Create the summary, by topic or in batches if the articles are too many
+            # for one call
+            report_progress(f"Summarising the articles in {category.category_id}")
+            if self._cluster and n_articles >= self._min_cluster_articles:
+                summary, topics = await self._summarise_clusters(articles)
+            else:
+                summary = await self._summarise_abstracts(
+                    articles if isinstance(articles, list) else [articles],
+                    asyncio.Semaphore(self._max_concurrency),
+                )
 
-        return SummaryResponse(
-            category=category.output,
+        response = SummaryResponse(
+            category=category,
             latest_published_day=latest_day,
-            summary=summary.output.summary,
-            recent_papers_url=f"https://arxiv.org/list/{category.output.category_id}/new",
+            summary=summary,
+            recent_papers_url=f"https://arxiv.org/list/{category.category_id}/new",
+            topics=topics,
+        )
+        if self._digests is not None and n_articles:
+            self._digests.put(response, self._model_key)
+        return response
+
+    async def summarise_range(
+        self, request: str, start_day: str, end_day: str
+    ) -> RangeSummaryResponse:
+        """
+        Get the summary of the articles in a specific category over a range of days.
+        Args:
+            request: the request to be evaluated
+            start_day: the first day (YYYY-MM-DD)
+            end_day: the last day (YYYY-MM-DD)
+        Returns:
+            summary: the summary of each day and of the whole range
+        """
+        category = await self._get_category(request)
+
+        logger.info(
+            f"Category selected: {category.category_id} - {category.category_name}"
+        )
+        return await self.summarise_category_range(category, start_day, end_day)
+
+    async def summarise_category_range(
+        self,
+        category: Category,
+        start_day: str,
+        end_day: str,
+        latest_day: str | None = None,
+    ) -> RangeSummaryResponse:
+        """
+        Summarise the articles of a category over a range of days.
+
+        The listings of the days are loaded concurrently (the arXiv calls go through
+        the shared rate limiter) and each day is summarised as soon as its listing
+        arrives. The summaries of the days are then combined into a global one,
+        so that the abstracts of the whole range never have to fit in one call.
+        Args:
+            category: the category
+            start_day: the first day (YYYY-MM-DD)
+            end_day: the last day (YYYY-MM-DD), capped to the latest day
+            latest_day: the latest day available on the API. Default is to look it up.
+        Returns:
+            summary: the summary of each day and of the whole range
+        """
+        if latest_day is None:
+            latest_day = await asyncio.to_thread(
+                self._identify_latest_day, category.category_id
+            )
+        if latest_day != "Not Found":
+            end_day = min(end_day, latest_day)
+
+        days = days_between(start_day, end_day)
+        if not days:
+            raise ValueError(f"No days between {start_day} and {end_day}.")
+        if len(days) > MAX_RANGE_DAYS:
+            raise ValueError(
+                f"The range is too long: at most {MAX_RANGE_DAYS} days can be summarised."
+            )
+
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def fetch(day: str) -> tuple[str, list[str]]:
+            async with semaphore:
+                listings = await asyncio.to_thread(
+                    self._load_listings,
+                    category.category_id,
+                    day,
+                    day,
+                    latest_day=latest_day if latest_day != "Not Found" else None,
+                )
+            articles = listings.get(day, [])[: self._max_results]
+            return day, [article["abstract"] for article in articles]
+
+        async def summarise_day(day: str, abstracts: list[str]) -> DaySummary:
+            summary = await self._summarise_abstracts(abstracts, semaphore)
+            return DaySummary(day=day, n_articles=len(abstracts), summary=summary)
+
+        # summarise each day as soon as its listing is loaded
+        tasks = []
+        for fetched in asyncio.as_completed([fetch(day) for day in days]):
+            day, abstracts = await fetched
+            logger.info(f"Day {day} - Articles #: {len(abstracts)}")
+            report_progress(f"Summarising {len(abstracts)} articles of {day}")
+            if abstracts:
+                tasks.append(asyncio.create_task(summarise_day(day, abstracts)))
+
+        daily_summaries = sorted(await asyncio.gather(*tasks), key=lambda d: d.day)
+        if not daily_summaries:
+            summary = "No articles found."
+        elif len(daily_summaries) == 1:
+            summary = daily_summaries[0].summary
+        else:
+            summary = await self._combine_summaries(
+                [(d.day, d.summary) for d in daily_summaries], semaphore
+            )
+
+        return RangeSummaryResponse(
+            category=category,
+            start_day=days[0],
+            end_day=days[-1],
+            daily_summaries=daily_summaries,
+            summary=summary,
+            recent_papers_url=f"https://arxiv.org/list/{category.category_id}/new",
+        )
+
+    async def _summarise_abstracts(
+        self, abstracts: list[str], semaphore: asyncio.Semaphore
+    ) -> str:
+        """
+        Summarise abstracts in one call, or, if they are over the token budget
+        of a call, in batches summarised concurrently and then combined (map-reduce),
+        so that the latency is bounded by the size of a batch and not of the listing.
+        """
+        batches = batch_by_tokens(abstracts, self._max_batch_tokens) or [[]]
+        logger.info(f"Summarising {len(abstracts)} abstracts in {len(batches)} batches")
+
+        summaries = await asyncio.gather(
+            *[self._summarise_batch(b, semaphore) for b in batches]
+        )
+        if len(summaries) == 1:
+            return summaries[0]
+        return await self._combine_summaries(
+            [(f"part {i + 1}", s) for i, s in enumerate(summaries)], semaphore
+        )
+
+    async def _summarise_batch(
+        self, abstracts: list[str], semaphore: asyncio.Semaphore
+    ) -> str:
+        async with semaphore:
+            summary = await self._summary_agent.run(
+                USER_PROMPT_SUMMARY_TEMPLATE.format(
+                    articles=encode_abstracts(abstracts, self._encoding)
+                )
+            )
+        return summary.output.summary
+
+    async def _summarise_pipelined(self, category_id: str, day: str) -> tuple[str, int]:
+        """
+        Summarise the articles of a day while its listing is being fetched:
+        the abstracts of each page (in batches within the token budget) are summarised
+        as soon as the page arrives, while the next one is fetched, and the summaries
+        are combined at the end. Returns the summary and the number of articles.
+        """
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        pages = self._stream_listing(
+            category_id, day, latest_day=day, page_size=self._page_size
+        )
+
+        n_articles, tasks = 0, []
+        try:
+            # the whole listing is fetched, so that it is stored, but only the first
+            # max_results articles are summarised
+            while (page := await asyncio.to_thread(next, pages, None)) is not None:
+                abstracts = [a["abstract"] for a in page][
+                    : self._max_results - n_articles
+                ]
+                if not abstracts:
+                    continue
+                n_articles += len(abstracts)
+                logger.info(f"Day {day} - Articles # so far: {n_articles}")
+                report_progress(f"Summarising the first {n_articles} articles of {day}")
+                for batch in batch_by_tokens(abstracts, self._max_batch_tokens):
+                    tasks.append(
+                        asyncio.create_task(self._summarise_batch(batch, semaphore))
+                    )
+            summaries = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        if not summaries:
+            return "No articles found.", 0
+        if len(summaries) == 1:
+            return summaries[0], n_articles
+        report_progress(f"Combining the summaries of the articles of {day}")
+        summary = await self._combine_summaries(
+            [(f"part {i + 1}", s) for i, s in enumerate(summaries)], semaphore
+        )
+        return summary, n_articles
+
+    async def _summarise_clusters(
+        self, abstracts: list[str]
+    ) -> tuple[str, list[Topic]]:
+        """
+        Group abstracts by topic and summarise them in one call from the size,
+        keywords and most representative abstracts of each group.
+        Representatives are taken in turn from each group, the most central first,
+        while they fit in the token budget of a call; each group has one at least.
+        """
+        clusters = await asyncio.to_thread(cluster_abstracts, abstracts)
+
+        representatives = [[] for _ in clusters]
+        budget = self._max_batch_tokens
+        for rank in range(self._n_representatives):
+            for cluster, chosen in zip(clusters, representatives):
+                if rank >= cluster.size:
+                    continue
+                abstract = abstracts[cluster.members[rank]]
+                tokens = estimate_tokens(abstract)
+                if chosen and tokens > budget:
+                    continue
+                chosen.append(abstract)
+                budget -= tokens
+
+        text = "\n".join(
+            f'<group id="{i + 1}" articles="{cluster.size}" '
+            + f'keywords="{", ".join(cluster.keywords)}">\n'
+            + "\n".join(f"<abstract>\n{a}\n</abstract>" for a in chosen)
+            + "\n</group>"
+            for i, (cluster, chosen) in enumerate(zip(clusters, representatives))
+        )
+        logger.info(
+            f"Summarising {sum(map(len, representatives))} representatives "
+            + f"of {len(abstracts)} abstracts in {len(clusters)} groups"
+        )
+        summary = await self._clustered_summary_agent.run(
+            USER_PROMPT_CLUSTERED_SUMMARY_TEMPLATE.format(clusters=text)
+        )
+
+        labels = summary.output.labels
+        topics = [
+            Topic(
+                # the keywords stand for a label the model did not give
+                label=labels[i] if i < len(labels) else ", ".join(cluster.keywords),
+                n_articles=cluster.size,
+                keywords=cluster.keywords,
+            )
+            for i, cluster in enumerate(clusters)
+        ]
+        return summary.output.summary, topics
+
+    async def _combine_summaries(
+        self, summaries: list[tuple[str, str]], semaphore: asyncio.Semaphore
+    ) -> str:
+        """
+        Combine labelled summaries (e.g. by day) into a global one.
+        If they are over the token budget of a call, they are combined in groups
+        first, concurrently, and the combinations are combined in turn.
+        """
+        parts = [
+            f'<summary part="{label}">\n{summary}\n</summary>'
+            for label, summary in summaries
+        ]
+        groups = batch_by_tokens(parts, self._max_batch_tokens)
+
+        async def combine(group: list[str]) -> str:
+            async with semaphore:
+                combined = await self._summary_agent.run(
+                    USER_PROMPT_COMBINE_SUMMARIES_TEMPLATE.format(
+                        summaries="\n".join(group)
+                    )
+                )
+            return combined.output.summary
+
+        # combine them all at once if grouping would not make them fewer
+        if len(groups) in (1, len(parts)):
+            return await combine(parts)
+        combined = await asyncio.gather(*[combine(g) for g in groups])
+        return await self._combine_summaries(
+            [(f"parts {i + 1}", s) for i, s in enumerate(combined)], semaphore
+        )
+
+    async def _get_category(self, request: str) -> Category:
+        """
+        Classify the request with the local classifier and fall back to the
+        category agent when it is not confident. The decisions of the agent
+        are learned, so the same topic is classified locally next time.
+        """
+        match = self._category_classifier.classify(request)
+        if match is not None:
+            return Category(
+                category_id=match.category_id, category_name=match.category_name
+            )
+
+        category = await self._category_agent.run(
+            USER_PROMPT_CATEGORY_TEMPLATE.format(request=request)
         )
+        self._category_classifier.learn(request, category.output.category_id)
+        return category.output
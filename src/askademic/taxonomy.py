@@ -0,0 +1,384 @@
+import difflib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping
+
+# these are from page "https://arxiv.org/category_taxonomy"
+# alternative would be to scrape the page but it's not a good idea as you risk getting banned
+# unfortunately there isn't an API endpoint for these
+CATEGORIES = (
+    ("cs.AI", "Artificial Intelligence"),
+    ("cs.AR", "Hardware Architecture"),
+    ("cs.CC", "Computational Complexity"),
+    ("cs.CE", "Computational Engineering, Finance, and Science"),
+    ("cs.CG", "Computational Geometry"),
+    ("cs.CL", "Computation and Language"),
+    ("cs.CR", "Cryptography and Security"),
+    ("cs.CV", "Computer Vision and Pattern Recognition"),
+    ("cs.CY", "Computers and Society"),
+    ("cs.DB", "Databases"),
+    ("cs.DC", "Distributed, Parallel, and Cluster Computing"),
+    ("cs.DL", "Digital Libraries"),
+    ("cs.DM", "Discrete Mathematics"),
+    ("cs.DS", "Data Structures and Algorithms"),
+    ("cs.ET", "Emerging Technologies"),
+    ("cs.FL", "Formal Languages and Automata Theory"),
+    ("cs.GL", "General Literature"),
+    ("cs.GR", "Graphics"),
+    ("cs.GT", "Computer Science and Game Theory"),
+    ("cs.HC", "Human-Computer Interaction"),
+    ("cs.IR", "Information Retrieval"),
+    ("math.IT", "Information Theory"),
+    ("cs.LG", "Machine Learning"),
+    ("stat.ML", "Machine Learning"),
+    ("cs.LO", "Logic in Computer Science"),
+    ("cs.MA", "Multiagent Systems"),
+    ("cs.MM", "Multimedia"),
+    ("cs.MS", "Mathematical Software"),
+    ("math.NA", "Numerical Analysis"),
+    ("cs.NE", "Neural and Evolutionary Computing"),
+    ("cs.NI", "Networking and Internet Architecture"),
+    ("cs.OH", "Other Computer Science"),
+    ("cs.OS", "Operating Systems"),
+    ("cs.PF", "Performance"),
+    ("cs.PL", "Programming Languages"),
+    ("cs.RO", "Robotics"),
+    ("cs.SC", "Symbolic Computation"),
+    ("cs.SD", "Sound"),
+    ("cs.SE", "Software Engineering"),
+    ("cs.SI", "Social and Information Networks"),
+    ("eess.SY", "Systems and Control"),
+    ("econ.EM", "Econometrics"),
+    ("econ.GN", "General Economics"),
+    ("econ.TH", "Theoretical Economics"),
+    ("eess.AS", "Audio and Speech Processing"),
+    ("eess.IV", "Image and Video Processing"),
+    ("eess.SP", "Signal Processing"),
+    ("math.AC", "Commutative Algebra"),
+    ("math.AG", "Algebraic Geometry"),
+    ("math.AP", "Analysis of PDEs"),
+    ("math.AT", "Algebraic Topology"),
+    ("math.CA", "Classical Analysis and ODEs"),
+    ("math.CO", "Combinatorics"),
+    ("math.CT", "Category Theory"),
+    ("math.CV", "Complex Variables"),
+    ("math.DG", "Differential Geometry"),
+    ("math.DS", "Dynamical Systems"),
+    ("math.FA", "Functional Analysis"),
+    ("math.GM", "General Mathematics"),
+    ("math.GN", "General Topology"),
+    ("math.GR", "Group Theory"),
+    ("math.GT", "Geometric Topology"),
+    ("math.HO", "History and Overview"),
+    ("math.KT", "K-Theory and Homology"),
+    ("math.LO", "Logic"),
+    ("math.MG", "Metric Geometry"),
+    ("math-ph", "Mathematical Physics"),
+    ("math.NT", "Number Theory"),
+    ("math.OA", "Operator Algebras"),
+    ("math.OC", "Optimization and Control"),
+    ("math.PR", "Probability"),
+    ("math.QA", "Quantum Algebra"),
+    ("math.RA", "Rings and Algebras"),
+    ("math.RT", "Representation Theory"),
+    ("math.SG", "Symplectic Geometry"),
+    ("math.SP", "Spectral Theory"),
+    ("stat.TH", "Statistics Theory"),
+    ("astro-ph.CO", "Cosmology and Nongalactic Astrophysics"),
+    ("astro-ph.EP", "Earth and Planetary Astrophysics"),
+    ("astro-ph.GA", "Astrophysics of Galaxies"),
+    ("astro-ph.HE", "High Energy Astrophysical Phenomena"),
+    ("astro-ph.IM", "Instrumentation and Methods for Astrophysics"),
+    ("astro-ph.SR", "Solar and Stellar Astrophysics"),
+    ("cond-mat.dis-nn", "Disordered Systems and Neural Networks"),
+    ("cond-mat.mes-hall", "Mesoscale and Nanoscale Physics"),
+    ("cond-mat.mtrl-sci", "Materials Science"),
+    ("cond-mat.other", "Other Condensed Matter"),
+    ("cond-mat.quant-gas", "Quantum Gases"),
+    ("cond-mat.soft", "Soft Condensed Matter"),
+    ("cond-mat.stat-mech", "Statistical Mechanics"),
+    ("cond-mat.str-el", "Strongly Correlated Electrons"),
+    ("cond-mat.supr-con", "Superconductivity"),
+    ("gr-qc", "General Relativity and Quantum Cosmology"),
+    ("hep-ex", "High Energy Physics - Experiment"),
+    ("hep-lat", "High Energy Physics - Lattice"),
+    ("hep-ph", "High Energy Physics - Phenomenology"),
+    ("hep-th", "High Energy Physics - Theory"),
+    ("nlin.AO", "Adaptation and Self-Organizing Systems"),
+    ("nlin.CD", "Chaotic Dynamics"),
+    ("nlin.CG", "Cellular Automata and Lattice Gases"),
+    ("nlin.PS", "Pattern Formation and Solitons"),
+    ("nlin.SI", "Exactly Solvable and Integrable Systems"),
+    ("nucl-ex", "Nuclear Experiment"),
+    ("nucl-th", "Nuclear Theory"),
+    ("physics.acc-ph", "Accelerator Physics"),
+    ("physics.ao-ph", "Atmospheric and Oceanic Physics"),
+    ("physics.app-ph", "Applied Physics"),
+    ("physics.atm-clus", "Atomic and Molecular Clusters"),
+    ("physics.atom-ph", "Atomic Physics"),
+    ("physics.bio-ph", "Biological Physics"),
+    ("physics.chem-ph", "Chemical Physics"),
+    ("physics.class-ph", "Classical Physics"),
+    ("physics.comp-ph", "Computational Physics"),
+    ("physics.data-an", "Data Analysis, Statistics and Probability"),
+    ("physics.ed-ph", "Physics Education"),
+    ("physics.flu-dyn", "Fluid Dynamics"),
+    ("physics.gen-ph", "General Physics"),
+    ("physics.geo-ph", "Geophysics"),
+    ("physics.hist-ph", "History and Philosophy of Physics"),
+    ("physics.ins-det", "Instrumentation and Detectors"),
+    ("physics.med-ph", "Medical Physics"),
+    ("physics.optics", "Optics"),
+    ("physics.plasm-ph", "Plasma Physics"),
+    ("physics.pop-ph", "Popular Physics"),
+    ("physics.soc-ph", "Physics and Society"),
+    ("physics.space-ph", "Space Physics"),
+    ("quant-ph", "Quantum Physics"),
+    ("q-bio.BM", "Biomolecules"),
+    ("q-bio.CB", "Cell Behavior"),
+    ("q-bio.GN", "Genomics"),
+    ("q-bio.MN", "Molecular Networks"),
+    ("q-bio.NC", "Neurons and Cognition"),
+    ("q-bio.OT", "Other Quantitative Biology"),
+    ("q-bio.PE", "Populations and Evolution"),
+    ("q-bio.QM", "Quantitative Methods"),
+    ("q-bio.SC", "Subcellular Processes"),
+    ("q-bio.TO", "Tissues and Organs"),
+    ("q-fin.CP", "Computational Finance"),
+    ("q-fin.EC", "Economics"),
+    ("q-fin.GN", "General Finance"),
+    ("q-fin.MF", "Mathematical Finance"),
+    ("q-fin.PM", "Portfolio Management"),
+    ("q-fin.PR", "Pricing of Securities"),
+    ("q-fin.RM", "Risk Management"),
+    ("q-fin.ST", "Statistical Finance"),
+    ("q-fin.TR", "Trading and Market Microstructure"),
+    ("stat.AP", "Applications"),
+    ("stat.CO", "Computation"),
+    ("stat.ME", "Methodology"),
+    ("stat.OT", "Other Statistics"),
+)
+
+# archive ID to (archive name, group name)
+ARCHIVES = {
+    "cs": ("Computer Science", "Computer Science"),
+    "econ": ("Economics", "Economics"),
+    "eess": (
+        "Electrical Engineering and Systems Science",
+        "Electrical Engineering and Systems Science",
+    ),
+    "math": ("Mathematics", "Mathematics"),
+    "astro-ph": ("Astrophysics", "Physics"),
+    "cond-mat": ("Condensed Matter", "Physics"),
+    "gr-qc": ("General Relativity and Quantum Cosmology", "Physics"),
+    "hep-ex": ("High Energy Physics - Experiment", "Physics"),
+    "hep-lat": ("High Energy Physics - Lattice", "Physics"),
+    "hep-ph": ("High Energy Physics - Phenomenology", "Physics"),
+    "hep-th": ("High Energy Physics - Theory", "Physics"),
+    "math-ph": ("Mathematical Physics", "Physics"),
+    "nlin": ("Nonlinear Sciences", "Physics"),
+    "nucl-ex": ("Nuclear Experiment", "Physics"),
+    "nucl-th": ("Nuclear Theory", "Physics"),
+    "physics": ("Physics", "Physics"),
+    "quant-ph": ("Quantum Physics", "Physics"),
+    "q-bio": ("Quantitative Biology", "Quantitative Biology"),
+    "q-fin": ("Quantitative Finance", "Quantitative Finance"),
+    "stat": ("Statistics", "Statistics"),
+}
+
+# categories arXiv has merged into another one, which it lists under both IDs
+ID_ALIASES = {
+    "cs.IT": "math.IT",
+    "cs.NA": "math.NA",
+    "cs.SY": "eess.SY",
+    "math.ST": "stat.TH",
+    "math.MP": "math-ph",
+    "q-fin.EC": "econ.GN",
+}
+
+# common ways of naming a category that are not its official name
+NAME_ALIASES = {
+    "ai": "cs.AI",
+    "ml": "cs.LG",
+    "deep learning": "cs.LG",
+    "nlp": "cs.CL",
+    "natural language processing": "cs.CL",
+    "computational linguistics": "cs.CL",
+    "llms": "cs.CL",
+    "large language models": "cs.CL",
+    "computer vision": "cs.CV",
+    "cryptography": "cs.CR",
+    "security": "cs.CR",
+    "hci": "cs.HC",
+    "quantum computing": "quant-ph",
+    "quantum information": "quant-ph",
+    "quantum field theory": "hep-th",
+    "string theory": "hep-th",
+    "particle physics": "hep-ph",
+    "cosmology": "astro-ph.CO",
+    "general relativity": "gr-qc",
+    "exoplanets": "astro-ph.EP",
+    "condensed matter": "cond-mat.str-el",
+    "neuroscience": "q-bio.NC",
+    "game theory": "cs.GT",
+}
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+(?:[.\-][a-z0-9]+)*")
+
+
+@dataclass(frozen=True)
+class Category:
+    id: str
+    name: str
+    archive: str
+    archive_name: str
+    group: str
+
+
+class _Trie:
+    """Prefix tree from strings to the IDs of the categories they name."""
+
+    def __init__(self):
+        self._root = {}
+
+    def insert(self, key: str, category_id: str):
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        node.setdefault("", set()).add(category_id)
+
+    def search(self, prefix: str) -> set[str]:
+        node = self._root
+        for char in prefix:
+            if char not in node:
+                return set()
+            node = node[char]
+        found, stack = set(), [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char:
+                    stack.append(child)
+                else:
+                    found |= child
+        return found
+
+
+class Taxonomy:
+    """
+    The arXiv category taxonomy, indexed once: by ID, by name and alias,
+    by archive (e.g. "cs", "astro-ph") and group (e.g. "Physics"), plus a trie
+    over every word of the names and aliases for prefix lookups.
+    All the indexes are read-only.
+    """
+
+    def __init__(self):
+        categories = {}
+        for category_id, name in CATEGORIES:
+            archive = category_id.split(".")[0]
+            archive_name, group = ARCHIVES[archive]
+            categories[category_id] = Category(
+                category_id, name, archive, archive_name, group
+            )
+        self.categories: Mapping[str, Category] = MappingProxyType(categories)
+
+        # IDs and names are matched case-insensitively; with duplicate names
+        # (e.g. "Machine Learning") the first category listed wins
+        ids = {category_id.lower(): category_id for category_id in categories}
+        ids.update({alias.lower(): target for alias, target in ID_ALIASES.items()})
+        self._ids = MappingProxyType(ids)
+
+        names = {}
+        for category in categories.values():
+            names.setdefault(category.name.lower(), category.id)
+        self.names: Mapping[str, str] = MappingProxyType(names)
+        self.aliases: Mapping[str, str] = MappingProxyType(dict(NAME_ALIASES))
+        self.phrases: Mapping[str, str] = MappingProxyType({**names, **NAME_ALIASES})
+
+        archives = {}
+        for category in categories.values():
+            archives.setdefault(category.archive, []).append(category.id)
+        self.archives: Mapping[str, tuple[str, ...]] = MappingProxyType(
+            {archive: tuple(ids) for archive, ids in archives.items()}
+        )
+        groups = {}
+        for archive, (_, group) in ARCHIVES.items():
+            groups.setdefault(group, []).append(archive)
+        self.groups: Mapping[str, tuple[str, ...]] = MappingProxyType(
+            {group: tuple(archives) for group, archives in groups.items()}
+        )
+
+        self._trie = _Trie()
+        phrases = [(c.name.lower(), c.id) for c in categories.values()]
+        phrases += list(NAME_ALIASES.items())
+        for phrase, category_id in phrases:
+            words = phrase.split()
+            for i in range(len(words)):
+                self._trie.insert(" ".join(words[i:]), category_id)
+        for key, category_id in self._ids.items():
+            self._trie.insert(key, category_id)
+
+        # name to ID, as returned by list_categories
+        listing = {}
+        for category in categories.values():
+            key = category.name
+            if key in listing:
+                key = f"{category.name} ({category.id})"
+            listing[key] = category.id
+        self.listing: Mapping[str, str] = MappingProxyType(listing)
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+    def __contains__(self, category_id: str) -> bool:
+        return category_id.lower() in self._ids
+
+    def canonical_id(self, category_id: str) -> str | None:
+        """The ID of a category, with the right case, following ID aliases."""
+        return self._ids.get(category_id.lower())
+
+    def get(self, key: str) -> Category | None:
+        """Look a category up by ID, name or alias."""
+        key = key.strip().lower()
+        category_id = self._ids.get(key) or self.phrases.get(key)
+        return self.categories[category_id] if category_id else None
+
+    def children(self, archive: str) -> list[Category]:
+        """The categories of an archive, e.g. "cs" or "astro-ph"."""
+        return [self.categories[i] for i in self.archives.get(archive.lower(), ())]
+
+    def find(self, query: str, limit: int = 10) -> list[Category]:
+        """
+        The categories matching a query: exact matches of an ID, name or alias
+        first, then names or aliases with a word starting with the query
+        (or the whole archive, if the query is an archive ID), then fuzzy matches.
+        """
+        query = " ".join(WORD_PATTERN.findall(query.lower()))
+        if not query:
+            return []
+
+        found = []
+
+        def add(category_ids):
+            for category_id in sorted(category_ids):
+                if category_id not in found:
+                    found.append(category_id)
+
+        exact = self.get(query)
+        if exact:
+            add([exact.id])
+        add(self.archives.get(query, ()))
+        add(self._trie.search(query))
+        if len(found) < limit:
+            close = difflib.get_close_matches(query, self.phrases, n=limit, cutoff=0.75)
+            add(self.phrases[p] for p in close)
+
+        return [self.categories[i] for i in found[:limit]]
+
+
+@lru_cache(maxsize=None)
+def get_taxonomy() -> Taxonomy:
+    """Return the taxonomy, built on first use."""
+    return Taxonomy()
@@ -0,0 +1,182 @@
+import json
+import logging
+import math
+import threading
+from datetime import datetime
+from typing import Callable
+
+from askademic.llm_cache import cached_model
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+# the rough number of characters of English text per token
+CHARS_PER_TOKEN = 4
+
+# the context windows of the model families, in tokens
+CONTEXT_WINDOWS = {
+    "gemini": 1_048_576,
+    "claude": 200_000,
+}
+DEFAULT_CONTEXT_WINDOW = 128_000
+
+# the share of the context window the tool outputs of a turn can fill,
+# the rest being left to the prompts, the conversation and the answer
+CONTEXT_SHARE = 0.5
+# the most tokens of tool outputs in a turn, whatever the context window:
+# beyond that the model is paid to read what it does not use
+MAX_TURN_TOKENS = 100_000
+
+# the most tokens of an article outside of a turn budget,
+# about the 70,000 characters articles used to be cut at
+ARTICLE_MAX_TOKENS = 17_500
+
+TRUNCATION_MARK = "\n[...]"
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """The tiktoken encoding, None if tiktoken is not installed (or cannot load it)."""
+    global _encoding, _encoding_loaded
+    with _encoding_lock:
+        if not _encoding_loaded:
+            _encoding_loaded = True
+            try:
+                import tiktoken
+
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.info(
+                    f"{datetime.now()}: Estimating tokens without tiktoken: {e}"
+                )
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    """A fast estimate of the number of tokens of a text, from its length."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def count_tokens(text: str) -> int:
+    """
+    The number of tokens of a text, with the tiktoken tokenizer if installed,
+    else estimated. Models tokenize differently, so it is an estimate either way,
+    but a close one for English text.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def clip_to_tokens(text: str, max_tokens: int) -> str:
+    """The beginning of a text, of at most max_tokens tokens."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[: max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def fit_records(
+    records: list[dict],
+    max_tokens: int,
+    key: str = "abstract",
+    dump: Callable[[list[dict]], str] = json.dumps,
+) -> list[dict]:
+    """
+    Fit records (e.g. search results) in a number of tokens: if they are too many
+    tokens, the same share of the key field (e.g. the abstract) of each is kept,
+    and if even without it they are too many, the last records are dropped.
+    Args:
+        records: the records
+        max_tokens: the most tokens of the output
+        key: the field to clip
+        dump: how the records are output, e.g. with the rest of a JSON object
+    """
+    if count_tokens(dump(records)) <= max_tokens:
+        return records
+
+    bare = [{**r, key: ""} if key in r else r for r in records]
+    while bare and count_tokens(dump(bare)) > max_tokens:
+        bare.pop()
+    if not bare:
+        return []
+
+    per_record = (max_tokens - count_tokens(dump(bare))) // len(bare)
+    fitted = []
+    for record in records[: len(bare)]:
+        if key in record and count_tokens(record[key]) > per_record:
+            clipped = clip_to_tokens(record[key], per_record - 1)
+            record = {**record, key: clipped + "..." if clipped else ""}
+        fitted.append(record)
+    return fitted
+
+
+def context_window(model) -> int:
+    """The context window of a model (or model name), in tokens."""
+    model = cached_model(model, enabled=False)
+    name = model if isinstance(model, str) else f"{model.system}:{model.model_name}"
+    for family, window in CONTEXT_WINDOWS.items():
+        if family in name.lower():
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+
+def turn_budget(model) -> int:
+    """The tokens the tool outputs of a turn with a model can take."""
+    return min(MAX_TURN_TOKENS, int(context_window(model) * CONTEXT_SHARE))
+
+
+class TokenBudget:
+    """
+    The tokens the tool outputs of a turn (an agent run) can still take.
+
+    Each output is sized to at most max_share of what remains, so that the first
+    article read cannot take the room of the next ones, and at least min_tokens,
+    so that a tool never has to return nothing. Tools may run concurrently.
+    """
+
+    def __init__(
+        self,
+        total: int = MAX_TURN_TOKENS,
+        max_share: float = 0.5,
+        min_tokens: int = 500,
+    ):
+        self._total = total
+        self._remaining = total
+        self._max_share = max_share
+        self._min_tokens = min_tokens
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    @property
+    def spent(self) -> int:
+        return self._total - self._remaining
+
+    def allowance(self) -> int:
+        """The most tokens the next tool output should take."""
+        with self._lock:
+            return max(self._min_tokens, int(self._remaining * self._max_share))
+
+    def spend(self, output: str) -> str:
+        """Count a tool output against the budget, and return it."""
+        tokens = count_tokens(output)
+        with self._lock:
+            self._remaining = max(0, self._remaining - tokens)
+        logger.info(
+            f"{datetime.now()}: Tool output of {tokens} tokens, "
+            + f"{self._remaining} tokens left in the turn"
+        )
+        return output
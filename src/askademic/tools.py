@@ -4,7 +4,9 @@ import logging
 import os
 import random
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from io import BytesIO
 from pathlib import Path
 
@@ -13,7 +15,27 @@ import pymupdf
 import requests
 
 from askademic.constants import ARXIV_BASE_URL, USER_AGENTS
-from askademic.utils import list_categories, organise_api_response_as_dataframe
+from askademic.cursors import get_cursor_store
+from askademic.dedup import collapse_near_duplicates
+from askademic.encoding import encode_articles
+from askademic.http_client import get_http_client
+from askademic.listings import load_listings
+from askademic.store import get_store
+from askademic.taxonomy import get_taxonomy
+from askademic.tokens import (
+    ARTICLE_MAX_TOKENS,
+    TRUNCATION_MARK,
+    clip_to_tokens,
+    count_tokens,
+    fit_records,
+)
+from askademic.utils import (
+    extract_arxiv_id,
+    list_categories,
+    organise_api_response_as_dataframe,
+    reciprocal_rank_fusion,
+)
+from askademic.vector_index import get_vector_index, index_articles
 
 today = datetime.now().strftime("%Y-%m-%d")
 
@@ -26,11 +48,20 @@ def get_categories() -> dict:
     Get all categories available on arXiv with their IDs.
     Returns a dictionary with category names as keys and their IDs as values.
     """
+    return dict(list_categories())
 
-    # these are from page "https://arxiv.org/category_taxonomy"
-    # alternative would be to scrape the page but it's not a good idea as you risk getting banned
-    # unfortunately there isn't an API endpoint for these
-    return list_categories()
+
+def find_categories(query: str) -> dict:
+    """
+    Find the arXiv categories matching a query, by ID, name, word prefix
+    or approximate spelling. Much shorter than the full list of categories.
+    Returns a dictionary with category IDs as keys and their names as values,
+    empty if nothing matches.
+    Args:
+        query: a category ID (e.g. "cs.CL"), archive (e.g. "astro-ph"),
+            name or topic (e.g. "computer vision")
+    """
+    return {c.id: c.name for c in get_taxonomy().find(query)}
 
 
 def identify_latest_day(category: str = "cs.AI") -> str:
@@ -61,6 +92,22 @@ def identify_latest_day(category: str = "cs.AI") -> str:
     return latest_day
 
 
+# a single worker, so that indexing runs one batch at a time behind the searches
+_indexing_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="indexing")
+
+
+def _index_articles_logged(records: list[dict]) -> None:
+    try:
+        index_articles(records)
+    except Exception as e:
+        logger.error(f"{datetime.now()}: Failed to index articles: {e}")
+
+
+def _index_in_background(records: list[dict]) -> Future:
+    """Add search results to the vector index without making the search wait."""
+    return _indexing_executor.submit(_index_articles_logged, records)
+
+
 def search_articles(
     query: str = "lyapunov exponents",
     sortby: str = "submittedDate",
@@ -96,93 +143,358 @@ def search_articles(
         max_results: the total number of articles to retrieve. The default value is 20.
     """
 
-    time.sleep(0.5)
-
     search_query = f"{prefix}:{query.lower()}"
     url = f"{ARXIV_BASE_URL}search_query={search_query}&start={start}&max_results={max_results}"
     url += f"&sortBy={sortby}&sortOrder=descending"
     logger.info(f"{datetime.now()}: API URL to search articles: {url}")
 
-    response = requests.get(url, timeout=360)
+    # through the shared client, so that searches keep to arXiv's rate limit
+    response = get_http_client().get(url, timeout=360)
     df_articles = organise_api_response_as_dataframe(response)
 
     if df_articles.empty:
         return None
 
+    # grow the local vector index with every abstract we see, off the request path
+    _index_in_background(
+        [
+            {
+                "id": extract_arxiv_id(row["id"]),
+                "title": row["title"],
+                "abstract": row["abstract"],
+            }
+            for _, row in df_articles.iterrows()
+        ]
+    )
+
     return df_articles
 
 
+def _search_records(query: str, prefix: str, start: int, max_results: int) -> list:
+    """One page of an arXiv search, as records with article_link, title and abstract."""
+    df = search_articles(
+        query=query,
+        sortby="relevance",
+        prefix=prefix,
+        start=start,
+        max_results=max_results,
+    )
+    if df is None:
+        return []
+
+    df.rename(columns={"id": "article_link"}, inplace=True)
+    return df[["article_link", "title", "abstract"]].to_dict(orient="records")
+
+
+def _encode_page(
+    records: list[dict],
+    cursor: str | None,
+    max_tokens: int | None = None,
+    encoding: str = "json",
+    max_sentences: int | None = None,
+) -> str:
+    """A page of search results, its abstracts clipped to fit max_tokens."""
+    dump = partial(
+        encode_articles,
+        encoding=encoding,
+        max_sentences=max_sentences,
+        next_page_cursor=cursor,
+    )
+    records = collapse_near_duplicates(records)
+    if max_tokens is not None:
+        records = fit_records(records, max_tokens, dump=dump)
+    return dump(records)
+
+
+def _search_with_cursor(
+    query: str,
+    prefix: str,
+    start: int,
+    max_results: int,
+    max_tokens: int | None = None,
+    encoding: str = "json",
+    max_sentences: int | None = None,
+) -> str:
+    """
+    Search a page of results and keep the result set behind a cursor,
+    for next_page to page through.
+    """
+    records = _search_records(query, prefix, start, max_results)
+    if not records:
+        return json.dumps({"id": "None", "artilce_link": "No articles found"})
+
+    cursor = get_cursor_store().open(
+        partial(_search_records, query, prefix, max_results=max_results),
+        records,
+        start=start,
+        page_size=max_results,
+    )
+    return _encode_page(records, cursor, max_tokens, encoding, max_sentences)
+
+
 def search_articles_by_abs(
     query: str = "lyapunov exponents",
     start: int = 0,
     max_results: int = 20,
+    max_tokens: int | None = None,
+    encoding: str = "json",
+    max_sentences: int | None = None,
 ):
     """
     Search articles on arXiv according to the query value in the text content
     of the article abstracts.
-    Return a markdown table with max_results articles and the following values:
-    - pdf: the url to the article pdf
-    - updated: the last time the article was updated
-    - published: the date when the article was published
-    - title: the article title
-    - summary: a summary of the article's content
+    Return a JSON object (or, compact, a table followed by the cursor) with:
+    - articles: max_results articles with their article_link, title and abstract
+    - next_page_cursor: the cursor to pass to next_page for the next results,
+      null if there are no more
+    Near-duplicates (other versions of the same work) are collapsed into one entry,
+    with their links listed under "alternates".
     If no articles are found, return "No articles found".
     Args:
         query: the query used for the search
-        start: the index of the ranking where the table starts, add +20 to get the next table chunk
+        start: the index of the ranking where the results start.
+            To get the next results, prefer next_page with the next_page_cursor.
         max_results: the total number of articles to retrieve. The default value is 20.
+        max_tokens: the most tokens of the output, the abstracts being clipped to fit.
+            Default is no limit.
+        encoding: json, or compact for a table with arXiv IDs instead of links
+        max_sentences: the most sentences of each abstract. Default is all.
     """
-
-    df = search_articles(
-        query=query,
-        sortby="relevance",
-        prefix="abs",
-        start=start,
-        max_results=max_results,
+    return _search_with_cursor(
+        query, "abs", start, max_results, max_tokens, encoding, max_sentences
     )
-    # rename id column
-
-    if df is None:
-        return json.dumps({"id": "None", "artilce_link": "No articles found"})
-
-    df.rename(columns={"id": "article_link"}, inplace=True)
-    return df[["article_link", "title", "abstract"]].to_json(orient="records", indent=2)
 
 
 def search_articles_by_title(
     query: str = "lyapunov exponents",
     start: int = 0,
     max_results: int = 20,
+    max_tokens: int | None = None,
+    encoding: str = "json",
+    max_sentences: int | None = None,
 ):
     """
     Search articles on arXiv by title.
-    Return a markdown table with max_results articles and the following values:
-    - pdf: the url to the article pdf
-    - updated: the last time the article was updated
-    - published: the date when the article was published
-    - title: the article title
-    - summary: a summary of the article's content
+    Return a JSON object (or, compact, a table followed by the cursor) with:
+    - articles: max_results articles with their article_link, title and abstract
+    - next_page_cursor: the cursor to pass to next_page for the next results,
+      null if there are no more
+    Near-duplicates (other versions of the same work) are collapsed into one entry,
+    with their links listed under "alternates".
     If no articles are found, return "No articles found".
     Args:
         query: the query used for the search
-        start: the index of the ranking where the table starts, add +20 to get the next table chunk
+        start: the index of the ranking where the results start.
+            To get the next results, prefer next_page with the next_page_cursor.
         max_results: the total number of articles to retrieve. The default value is 20.
+        max_tokens: the most tokens of the output, the abstracts being clipped to fit.
+            Default is no limit.
+        encoding: json, or compact for a table with arXiv IDs instead of links
+        max_sentences: the most sentences of each abstract. Default is all.
     """
+    return _search_with_cursor(
+        query, "ti", start, max_results, max_tokens, encoding, max_sentences
+    )
 
-    df_articles = search_articles(
-        query=query,
-        sortby="relevance",
-        prefix="ti",
-        start=start,
-        max_results=max_results,
+
+def next_page(
+    cursor: str,
+    max_tokens: int | None = None,
+    encoding: str = "json",
+    max_sentences: int | None = None,
+) -> str:
+    """
+    Get the next page of results of a search, from the next_page_cursor it returned.
+    From the second page asked for on, the page is usually already fetched.
+    Return a JSON object with the articles and the next_page_cursor, as the search does.
+    If the cursor is unknown or expired, return "Cursor not found", and search again.
+    Args:
+        cursor: the next_page_cursor of the previous page
+        max_tokens: the most tokens of the output, the abstracts being clipped to fit.
+            Default is no limit.
+        encoding: json, or compact for a table with arXiv IDs instead of links
+        max_sentences: the most sentences of each abstract. Default is all.
+    """
+    try:
+        records, cursor = get_cursor_store().next_page(cursor)
+    except KeyError:
+        return "Cursor not found"
+    logger.info(f"{datetime.now()}: Served {len(records)} articles from a cursor")
+    return _encode_page(records, cursor, max_tokens, encoding, max_sentences)
+
+
+def search_articles_federated(
+    query: str = "lyapunov exponents",
+    max_results: int = 10,
+    include_local: bool = True,
+    max_tokens: int | None = None,
+    encoding: str = "json",
+    max_sentences: int | None = None,
+) -> str:
+    """
+    Search articles on arXiv by abstract and by title and, optionally, at the same time,
+    in the local store of articles (full text search and similarity search).
+    The rankings are merged with reciprocal-rank fusion into one list, without duplicates.
+    The two arXiv searches go one after the other: arXiv allows one API request
+    every 3 seconds, which the shared HTTP client enforces across threads, so sending
+    them at once would only queue the second one. A federated search thus takes
+    about 3 seconds more than a single search, the local ones running meanwhile.
+    Return a JSON list (or, compact, a table) with max_results articles
+    and the following values:
+    - article_link: the url to the article pdf
+    - title: the article title
+    - abstract: the article abstract
+    - found_by: the searches that found the article (abs, title, local, similar)
+    If no articles are found, return "No articles found".
+    Args:
+        query: the query used for the search
+        max_results: the number of articles to return. The default value is 10.
+        include_local: whether to search the local store too. The default value is True.
+        max_tokens: the most tokens of the output, the abstracts being clipped to fit.
+            Default is no limit.
+        encoding: json, or compact for a table with arXiv IDs instead of links
+        max_sentences: the most sentences of each abstract. Default is all.
+    """
+
+    def search_arxiv(prefix: str) -> list[dict]:
+        df = search_articles(
+            query=query, sortby="relevance", prefix=prefix, max_results=max_results
+        )
+        if df is None:
+            return []
+        return [
+            {"article_link": r["id"], "title": r["title"], "abstract": r["abstract"]}
+            for _, r in df.iterrows()
+        ]
+
+    def search_local() -> list[dict]:
+        return [
+            {
+                "article_link": f"https://arxiv.org/pdf/{p['id']}",
+                "title": p["title"],
+                "abstract": p["abstract"],
+            }
+            for p in get_store().search(query, limit=max_results, match_all=False)
+        ]
+
+    def search_similar() -> list[dict]:
+        results = get_vector_index().search(query, k=max_results)[0]
+        return [
+            {"article_link": f"https://arxiv.org/pdf/{arxiv_id}"}
+            for arxiv_id, _ in results
+        ]
+
+    def run_search(name: str, search) -> list[dict] | None:
+        try:
+            return search()
+        except Exception as e:
+            logger.error(f"{datetime.now()}: Federated search '{name}' failed: {e}")
+            return None
+
+    arxiv_searches = {
+        "abs": lambda: search_arxiv("abs"),
+        "title": lambda: search_arxiv("ti"),
+    }
+    local_searches = (
+        {"local": search_local, "similar": search_similar} if include_local else {}
     )
 
-    if df_articles is None:
-        return json.dumps({"id": "None", "artilce_link": "No articles found"})
+    # the local lookups run while arXiv is searched; the arXiv searches run one
+    # after the other, spaced by the rate limit of the shared HTTP client: they
+    # are kept apart, rather than merged into one "abs OR ti" query, because each
+    # gives its own ranking to the fusion and tells which search found an article
+    outcomes = {}
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = {
+            name: executor.submit(run_search, name, search)
+            for name, search in local_searches.items()
+        }
+        for name, search in arxiv_searches.items():
+            outcomes[name] = run_search(name, search)
+        for name, future in futures.items():
+            outcomes[name] = future.result()
+
+    articles, rankings = {}, []
+    for name, results in outcomes.items():
+        if results is None:
+            continue
+        ranking = []
+        for record in results:
+            arxiv_id = (
+                extract_arxiv_id(record["article_link"]) or record["article_link"]
+            )
+            article = articles.setdefault(arxiv_id, {"found_by": []})
+            # the first search finding an article with its metadata provides it
+            for key, value in record.items():
+                article.setdefault(key, value)
+            if name not in article["found_by"]:
+                article["found_by"].append(name)
+            ranking.append(arxiv_id)
+        rankings.append(ranking)
+
+    merged = reciprocal_rank_fusion(rankings)[:max_results]
+    # articles only found by similarity get their metadata from the store, if there
+    for arxiv_id in merged:
+        if "title" not in articles[arxiv_id]:
+            try:
+                paper = get_store().get_paper(arxiv_id) or {}
+            except Exception as e:
+                logger.error(f"{datetime.now()}: Failed to read the store: {e}")
+                paper = {}
+            articles[arxiv_id]["title"] = paper.get("title", "")
+            articles[arxiv_id]["abstract"] = paper.get("abstract", "")
+
+    records = [
+        {
+            "article_link": articles[i]["article_link"],
+            "title": articles[i]["title"],
+            "abstract": articles[i]["abstract"],
+            "found_by": articles[i]["found_by"],
+        }
+        for i in merged
+    ]
+    logger.info(
+        f"{datetime.now()}: Federated search merged {len(records)} articles "
+        + f"from {len(rankings)} searches"
+    )
+
+    if not records:
+        return "No articles found"
 
-    df_articles.rename(columns={"id": "article_link"}, inplace=True)
-    return df_articles[["article_link", "title", "abstract"]].to_json(
-        orient="records", indent=2
+    dump = partial(encode_articles, encoding=encoding, max_sentences=max_sentences)
+    records = collapse_near_duplicates(records)
+    if max_tokens is not None:
+        records = fit_records(records, max_tokens, dump=dump)
+    return dump(records)
+
+
+def search_similar_articles(text: str, max_results: int = 10) -> str:
+    """
+    Search the local index of abstracts for the articles most similar to the given text,
+    without calling arXiv. The index only contains articles that have been seen before.
+    Return a JSON list of articles with the following values:
+    - article_link: the url to the article pdf
+    - score: the similarity to the text, between -1 and 1
+    If the index is empty, return "No articles found".
+    Args:
+        text: a piece of text (e.g. an abstract or a description of a topic)
+        max_results: the number of articles to return. The default value is 10.
+    """
+
+    results = get_vector_index().search(text, k=max_results)[0]
+    logger.info(f"{datetime.now()}: Found {len(results)} similar articles")
+
+    if not results:
+        return "No articles found"
+
+    return json.dumps(
+        [
+            {
+                "article_link": f"https://arxiv.org/pdf/{arxiv_id}",
+                "score": round(score, 3),
+            }
+            for arxiv_id, score in results
+        ]
     )
 
 
@@ -193,13 +505,9 @@ def retrieve_recent_articles(
 ):
     """
     Search articles on arXiv by category, filtering to the ones publishhed
-    on the latest available day.
-    Return a markdown table with articles and the following values:
-    - pdf: the url to the article pdf
-    - updated: the last time the article was updated
-    - published: the date when the article was published
-    - title: the article title
-    - summary: a summary of the article's content
+    on the latest available day. Listings are kept in the local listing store.
+    Return the list of the abstracts of the articles, at most max_results,
+    as plain strings; the summaries encode them for the model.
     If no articles are found, return "No articles found".
     Args:
         category: the category ID used for the search
@@ -207,26 +515,27 @@ def retrieve_recent_articles(
         max_results: the total number of articles to retrieve. Do not change this parameter.
     """
 
-    search_query = f"cat:{category}"
-    # 300 is empirical: there should never be more articles in a day for a category
-    url = (
-        f"{ARXIV_BASE_URL}search_query={search_query}&start=0&max_results={max_results}"
-    )
-    url += "&sortBy=submittedDate&sortOrder=descending"
-    logger.info(f"{datetime.now()}: API URL to retrieve recent articles: {max_results}")
-
-    response = requests.get(url, timeout=360)
-    df_articles = organise_api_response_as_dataframe(response)
-
-    if df_articles.empty:
+    # the listing of a day is fetched once, and only refreshed while the day is open
+    try:
+        listings = load_listings(
+            category, latest_day, latest_day, latest_day=latest_day
+        )
+    except ValueError:
+        logger.error(f"{datetime.now()}: Invalid day: {latest_day}")
+        return "No articles found"
+    if latest_day not in listings:
         return "No articles found"
 
-    # remove time part from published and filter DF to latest day (string)
-    df_articles["published"] = df_articles["published"].apply(lambda s: s.split("T")[0])
-    df_articles = df_articles[df_articles["published"] == latest_day]
+    logger.info(
+        f"{datetime.now()}: {len(listings[latest_day])} articles in {category} "
+        + f"on {latest_day}"
+    )
+    # 300 is empirical: there should never be more articles in a day for a category
+    return [article["abstract"] for article in listings[latest_day][:max_results]]
 
-    # return df_articles['abstract'][:3].to_markdown(index=False)
-    return list(df_articles["abstract"][:].values)
+
+# how long fetched articles, and what is derived from them, are kept
+ARTICLE_CACHE_TTL = timedelta(days=7)
 
 
 def get_cache_path() -> Path:
@@ -241,41 +550,52 @@ def get_cache_key(url: str) -> str:
     return hashlib.md5(url.encode()).hexdigest()
 
 
-def get_article_from_cache(url: str) -> tuple[bool, str]:
-    """Attempt to retrieve article from cache
-
-    Returns:
-        tuple: (hit, content) where hit is True if cache hit, False otherwise
-    """
+def _read_article_cache(url: str) -> dict | None:
+    """The cached record of an article, None if missing, expired or invalid."""
     cache_path = get_cache_path() / f"{get_cache_key(url)}.json"
 
     if not cache_path.exists():
-        return False, ""
+        return None
 
     try:
         with open(cache_path, "r") as f:
             cache_data = json.load(f)
 
-        # Check if cache is expired (7 days)
+        # Check if cache is expired
         timestamp = datetime.fromisoformat(cache_data["timestamp"])
-        if datetime.now() - timestamp > timedelta(days=7):
-            return False, ""
+        if datetime.now() - timestamp > ARTICLE_CACHE_TTL:
+            return None
 
+        if "content" not in cache_data:
+            return None
         logger.info(f"{datetime.now()}: Cache hit for {url}")
-        return True, cache_data["content"]
+        return cache_data
     except (json.JSONDecodeError, KeyError, ValueError):
         # Invalid cache file
+        return None
+
+
+def get_article_from_cache(url: str) -> tuple[bool, str]:
+    """Attempt to retrieve article from cache
+
+    Returns:
+        tuple: (hit, content) where hit is True if cache hit, False otherwise
+    """
+    cache_data = _read_article_cache(url)
+    if cache_data is None:
         return False, ""
+    return True, cache_data["content"]
 
 
-def save_article_to_cache(url: str, content: str) -> None:
-    """Save article content to cache"""
+def save_article_to_cache(url: str, content: str, tokens: int | None = None) -> None:
+    """Save article content to cache, with its number of tokens"""
     cache_path = get_cache_path() / f"{get_cache_key(url)}.json"
 
     cache_data = {
         "url": url,
         "timestamp": datetime.now().isoformat(),
         "content": content,
+        "tokens": count_tokens(content) if tokens is None else tokens,
     }
 
     try:
@@ -286,7 +606,34 @@ def save_article_to_cache(url: str, content: str) -> None:
         logger.error(f"{datetime.now()}: Failed to save to cache: {e}")
 
 
-def get_article(url: str, max_attempts: int = 10, use_cache: bool = True) -> str:
+def fit_article(content: str, max_tokens: int | None, tokens: int | None = None) -> str:
+    """
+    Clip an article to max_tokens, keeping its closing tag.
+    Args:
+        content: the article, as returned by get_article
+        max_tokens: the most tokens of the article. None is no limit.
+        tokens: the number of tokens of the article, if known
+    """
+    if max_tokens is None:
+        return content
+    if tokens is None:
+        tokens = count_tokens(content)
+    if tokens <= max_tokens:
+        return content
+
+    closing = "\n</article>" if content.endswith("\n</article>") else ""
+    text = content[: len(content) - len(closing)]
+    kept = max_tokens - count_tokens(TRUNCATION_MARK + closing)
+    logger.info(f"{datetime.now()}: Article of {tokens} tokens cut to {max_tokens}")
+    return clip_to_tokens(text, kept) + TRUNCATION_MARK + closing
+
+
+def get_article(
+    url: str,
+    max_attempts: int = 10,
+    use_cache: bool = True,
+    max_tokens: int | None = ARTICLE_MAX_TOKENS,
+) -> str:
     """
     Opens an article using its URL (PDF version) and returns its text content.
     With caching functionality to avoid repeated downloads.
@@ -295,14 +642,18 @@ def get_article(url: str, max_attempts: int = 10, use_cache: bool = True) -> str
         url: the article arXiv URL
         max_attempts: the maximum number of attempts to open the article. Default is 10.
         use_cache: whether to use cached article if available. Default is True.
+        max_tokens: the most tokens of the article returned, the rest being cut
+            (there can be books, too long). None is no limit.
+            The whole article is cached.
     """
 
     # Try to get from cache first if enabled
     if use_cache:
-        cache_hit, cached_content = get_article_from_cache(url)
-        if cache_hit:
-            return cached_content
-
+        cache_data = _read_article_cache(url)
+        if cache_data is not None:
+            return fit_article(
+                cache_data["content"], max_tokens, cache_data.get("tokens")
+            )
     logger.info(f"{datetime.now()}: API URL to retrieve article: {url}")
 
     attempts = 0
@@ -331,15 +682,14 @@ def get_article(url: str, max_attempts: int = 10, use_cache: bool = True) -> str
             time.sleep(20)
             attempts += 1
 
-    # curtail the article to 70k characters (there can be books, too long)
-    article = article[:70000]
-
     formatted_article = f"""<article url="{url}">
 {article}
 </article>"""
+    tokens = count_tokens(formatted_article)
 
-    # Save to cache if retrieval was successful and not "Article Not Found"
-    if article != "Article Not Found" and use_cache:
-        save_article_to_cache(url, formatted_article)
+    # Save to cache if retrieval was successful: not "Article Not Found", nor empty
+    # after the connection errors
+    if article not in ("", "Article Not Found") and use_cache:
+        save_article_to_cache(url, formatted_article, tokens)
 
-    return formatted_article
+    return fit_article(formatted_article, max_tokens, tokens)
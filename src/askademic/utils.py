@@ -1,6 +1,8 @@
 import logging
-from datetime import datetime
-from typing import Tuple
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Mapping, Tuple
+from zoneinfo import ZoneInfo
 
 import boto3
 import feedparser
@@ -12,11 +14,23 @@ from askademic.constants import (
     CLAUDE_HAIKU_4_5_MODEL_ID,
     GEMINI_2_FLASH_MODEL_ID,
 )
+from askademic.taxonomy import get_taxonomy
 
 today = datetime.now().strftime("%Y-%m-%d")
 logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
 logger = logging.getLogger(__name__)
 
+# arXiv announces new papers at 20:00 US Eastern time, Sunday to Thursday
+ANNOUNCEMENT_TIMEZONE = ZoneInfo("America/New_York")
+ANNOUNCEMENT_HOUR = 20
+ANNOUNCEMENT_WEEKDAYS = {6, 0, 1, 2, 3}
+
+# new-style IDs (YYMM.NNNN or YYMM.NNNNN) and old-style ones (archive/YYMMNNN),
+# both with an optional version suffix
+ARXIV_ID_PATTERN = re.compile(
+    r"(?P<id>\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?P<version>v\d+)?"
+)
+
 
 def choose_model(model_family: str = "gemini") -> Tuple[str, ModelSettings]:
     """
@@ -51,164 +65,11 @@ def choose_model(model_family: str = "gemini") -> Tuple[str, ModelSettings]:
         return model_name, model_settings
 
 
-def list_categories() -> dict:
+def list_categories() -> Mapping[str, str]:
     """
     List all categories available on arXiv with their IDs
     """
-
-    d_categories = {
-        "Artificial Intelligence": "cs.AI",
-        "Hardware Architecture": "cs.AR",
-        "Computational Complexity": "cs.CC",
-        "Computational Engineering, Finance, and Science": "cs.CE",
-        "Computational Geometry": "cs.CG",
-        "Computation and Language": "cs.CL",
-        "Cryptography and Security": "cs.CR",
-        "Computer Vision and Pattern Recognition": "cs.CV",
-        "Computers and Society": "cs.CY",
-        "Databases": "cs.DB",
-        "Distributed, Parallel, and Cluster Computing": "cs.DC",
-        "Digital Libraries": "cs.DL",
-        "Discrete Mathematics": "cs.DM",
-        "Data Structures and Algorithms": "cs.DS",
-        "Emerging Technologies": "cs.ET",
-        "Formal Languages and Automata Theory": "cs.FL",
-        "General Literature": "cs.GL",
-        "Graphics": "cs.GR",
-        "Computer Science and Game Theory": "cs.GT",
-        "Human-Computer Interaction": "cs.HC",
-        "Information Retrieval": "cs.IR",
-        "Information Theory": "math.IT",
-        "Machine Learning": "stat.ML",
-        "Logic in Computer Science": "cs.LO",
-        "Multiagent Systems": "cs.MA",
-        "Multimedia": "cs.MM",
-        "Mathematical Software": "cs.MS",
-        "Numerical Analysis": "math.NA",
-        "Neural and Evolutionary Computing": "cs.NE",
-        "Networking and Internet Architecture": "cs.NI",
-        "Other Computer Science": "cs.OH",
-        "Operating Systems": "cs.OS",
-        "Performance": "cs.PF",
-        "Programming Languages": "cs.PL",
-        "Robotics": "cs.RO",
-        "Symbolic Computation": "cs.SC",
-        "Sound": "cs.SD",
-        "Software Engineering": "cs.SE",
-        "Social and Information Networks": "cs.SI",
-        "Systems and Control": "eess.SY",
-        "Econometrics": "econ.EM",
-        "General Economics": "econ.GN",
-        "Theoretical Economics": "econ.TH",
-        "Audio and Speech Processing": "eess.AS",
-        "Image and Video Processing": "eess.IV",
-        "Signal Processing": "eess.SP",
-        "Commutative Algebra": "math.AC",
-        "Algebraic Geometry": "math.AG",
-        "Analysis of PDEs": "math.AP",
-        "Algebraic Topology": "math.AT",
-        "Classical Analysis and ODEs": "math.CA",
-        "Combinatorics": "math.CO",
-        "Category Theory": "math.CT",
-        "Complex Variables": "math.CV",
-        "Differential Geometry": "math.DG",
-        "Dynamical Systems": "math.DS",
-        "Functional Analysis": "math.FA",
-        "General Mathematics": "math.GM",
-        "General Topology": "math.GN",
-        "Group Theory": "math.GR",
-        "Geometric Topology": "math.GT",
-        "History and Overview": "math.HO",
-        "K-Theory and Homology": "math.KT",
-        "Logic": "math.LO",
-        "Metric Geometry": "math.MG",
-        "Mathematical Physics": "math-ph",
-        "Number Theory": "math.NT",
-        "Operator Algebras": "math.OA",
-        "Optimization and Control": "math.OC",
-        "Probability": "math.PR",
-        "Quantum Algebra": "math.QA",
-        "Rings and Algebras": "math.RA",
-        "Representation Theory": "math.RT",
-        "Symplectic Geometry": "math.SG",
-        "Spectral Theory": "math.SP",
-        "Statistics Theory": "stat.TH",
-        "Cosmology and Nongalactic Astrophysics": "astro-ph.CO",
-        "Earth and Planetary Astrophysics": "astro-ph.EP",
-        "Astrophysics of Galaxies": "astro-ph.GA",
-        "High Energy Astrophysical Phenomena": "astro-ph.HE",
-        "Instrumentation and Methods for Astrophysics": "astro-ph.IM",
-        "Solar and Stellar Astrophysics": "astro-ph.SR",
-        "Disordered Systems and Neural Networks": "cond-mat.dis-nn",
-        "Mesoscale and Nanoscale Physics": "cond-mat.mes-hall",
-        "Materials Science": "cond-mat.mtrl-sci",
-        "Other Condensed Matter": "cond-mat.other",
-        "Quantum Gases": "cond-mat.quant-gas",
-        "Soft Condensed Matter": "cond-mat.soft",
-        "Statistical Mechanics": "cond-mat.stat-mech",
-        "Strongly Correlated Electrons": "cond-mat.str-el",
-        "Superconductivity": "cond-mat.supr-con",
-        "General Relativity and Quantum Cosmology": "gr-qc",
-        "High Energy Physics - Experiment": "hep-ex",
-        "High Energy Physics - Lattice": "hep-lat",
-        "High Energy Physics - Phenomenology": "hep-ph",
-        "High Energy Physics - Theory": "hep-th",
-        "Adaptation and Self-Organizing Systems": "nlin.AO",
-        "Chaotic Dynamics": "nlin.CD",
-        "Cellular Automata and Lattice Gases": "nlin.CG",
-        "Pattern Formation and Solitons": "nlin.PS",
-        "Exactly Solvable and Integrable Systems": "nlin.SI",
-        "Nuclear Experiment": "nucl-ex",
-        "Nuclear Theory": "nucl-th",
-        "Accelerator Physics": "physics.acc-ph",
-        "Atmospheric and Oceanic Physics": "physics.ao-ph",
-        "Applied Physics": "physics.app-ph",
-        "Atomic and Molecular Clusters": "physics.atm-clus",
-        "Atomic Physics": "physics.atom-ph",
-        "Biological Physics": "physics.bio-ph",
-        "Chemical Physics": "physics.chem-ph",
-        "Classical Physics": "physics.class-ph",
-        "Computational Physics": "physics.comp-ph",
-        "Data Analysis, Statistics and Probability": "physics.data-an",
-        "Physics Education": "physics.ed-ph",
-        "Fluid Dynamics": "physics.flu-dyn",
-        "General Physics": "physics.gen-ph",
-        "Geophysics": "physics.geo-ph",
-        "History and Philosophy of Physics": "physics.hist-ph",
-        "Instrumentation and Detectors": "physics.ins-det",
-        "Medical Physics": "physics.med-ph",
-        "Optics": "physics.optics",
-        "Plasma Physics": "physics.plasm-ph",
-        "Popular Physics": "physics.pop-ph",
-        "Physics and Society": "physics.soc-ph",
-        "Space Physics": "physics.space-ph",
-        "Quantum Physics": "quant-ph",
-        "Biomolecules": "q-bio.BM",
-        "Cell Behavior": "q-bio.CB",
-        "Genomics": "q-bio.GN",
-        "Molecular Networks": "q-bio.MN",
-        "Neurons and Cognition": "q-bio.NC",
-        "Other Quantitative Biology": "q-bio.OT",
-        "Populations and Evolution": "q-bio.PE",
-        "Quantitative Methods": "q-bio.QM",
-        "Subcellular Processes": "q-bio.SC",
-        "Tissues and Organs": "q-bio.TO",
-        "Computational Finance": "q-fin.CP",
-        "Economics": "q-fin.EC",
-        "General Finance": "q-fin.GN",
-        "Mathematical Finance": "q-fin.MF",
-        "Portfolio Management": "q-fin.PM",
-        "Pricing of Securities": "q-fin.PR",
-        "Risk Management": "q-fin.RM",
-        "Statistical Finance": "q-fin.ST",
-        "Trading and Market Microstructure": "q-fin.TR",
-        "Applications": "stat.AP",
-        "Computation": "stat.CO",
-        "Methodology": "stat.ME",
-        "Other Statistics": "stat.OT",
-    }
-
-    return d_categories
+    return get_taxonomy().listing
 
 
 def organise_api_response_as_dataframe(response) -> pd.DataFrame:
@@ -237,3 +98,96 @@ def organise_api_response_as_dataframe(response) -> pd.DataFrame:
             )
 
     return df_articles
+
+
+def extract_arxiv_id(link: str, keep_version: bool = False) -> str | None:
+    """
+    Extract the arXiv ID from a link (abs or pdf URL) or a bare ID.
+    Returns the canonical ID (without version unless keep_version is True),
+    or None if no ID can be found.
+    """
+    link = link.strip()
+    if "arxiv.org" in link:
+        match = ARXIV_ID_PATTERN.search(link.split("arxiv.org", 1)[1])
+    else:
+        match = ARXIV_ID_PATTERN.match(link)
+
+    if not match:
+        return None
+
+    if keep_version and match.group("version"):
+        return match.group("id") + match.group("version")
+    return match.group("id")
+
+
+def is_valid_arxiv_id(arxiv_id: str) -> bool:
+    """Whether the year and month an arXiv ID starts with can be those of an ID."""
+    yymm = arxiv_id.rsplit("/", 1)[-1][:4]
+    return 1 <= int(yymm[2:]) <= 12
+
+
+def find_arxiv_ids(text: str, keep_version: bool = False) -> list[str]:
+    """
+    Find the arXiv IDs and links in a free text, e.g. a user request.
+    Returns the distinct IDs, as extract_arxiv_id does, in order of appearance,
+    leaving out numbers that only look like IDs, e.g. "2024.12345".
+    """
+    arxiv_ids = []
+    for word in text.split():
+        arxiv_id = extract_arxiv_id(word.strip("()[]<>{},;:!?.\"'"), keep_version)
+        if arxiv_id and is_valid_arxiv_id(arxiv_id) and arxiv_id not in arxiv_ids:
+            arxiv_ids.append(arxiv_id)
+    return arxiv_ids
+
+
+def find_arxiv_id(text: str, keep_version: bool = False) -> str | None:
+    """The first arXiv ID or link in a free text, None if there is none."""
+    arxiv_ids = find_arxiv_ids(text, keep_version)
+    return arxiv_ids[0] if arxiv_ids else None
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """
+    Merge several rankings of the same kind of items into one with reciprocal-rank
+    fusion: each item scores the sum of 1 / (k + rank) over the rankings it is in.
+    Returns the items sorted by score, ties broken by first appearance.
+    """
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            scores[item] = scores.get(item, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda item: -scores[item])
+
+
+def last_announcement(now: datetime | None = None) -> datetime:
+    """
+    The time of the latest arXiv announcement before now, in UTC.
+    Holidays, when arXiv skips announcements, are not accounted for.
+    """
+    now = (now or datetime.now(timezone.utc)).astimezone(ANNOUNCEMENT_TIMEZONE)
+    candidate = now.replace(hour=ANNOUNCEMENT_HOUR, minute=0, second=0, microsecond=0)
+    while candidate > now or candidate.weekday() not in ANNOUNCEMENT_WEEKDAYS:
+        candidate = (candidate - timedelta(days=1)).replace(hour=ANNOUNCEMENT_HOUR)
+    return candidate.astimezone(timezone.utc)
+
+
+def latest_announced_day(now: datetime | None = None) -> str:
+    """
+    The day of publication (submission, YYYY-MM-DD) of the newest articles of the
+    latest announcement. Submissions close at 14:00 US Eastern time and are announced
+    that evening, except Friday's, announced on Sunday.
+    """
+    announcement = last_announcement(now).astimezone(ANNOUNCEMENT_TIMEZONE)
+    day = announcement.date()
+    if announcement.weekday() == 6:
+        day -= timedelta(days=2)
+    return day.isoformat()
+
+
+def next_announcement(now: datetime | None = None) -> datetime:
+    """The time of the next arXiv announcement after now, in UTC."""
+    now = (now or datetime.now(timezone.utc)).astimezone(ANNOUNCEMENT_TIMEZONE)
+    candidate = now.replace(hour=ANNOUNCEMENT_HOUR, minute=0, second=0, microsecond=0)
+    while candidate <= now or candidate.weekday() not in ANNOUNCEMENT_WEEKDAYS:
+        candidate = (candidate + timedelta(days=1)).replace(hour=ANNOUNCEMENT_HOUR)
+    return candidate.astimezone(timezone.utc)
@@ -0,0 +1,445 @@
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+
+today = datetime.now().strftime("%Y-%m-%d")
+logging.basicConfig(level=logging.INFO, filename=f"logs/{today}_logs.txt")
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 256
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# an embedder maps a list of texts to a (len(texts), dim) float32 array
+Embedder = Callable[[list[str]], np.ndarray]
+
+# the arXiv ID of each row of vectors
+IDS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ids (
+    row INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE
+);
+"""
+# the most IDs per SQL query, below SQLite's limit of variables
+MAX_QUERY_IDS = 500
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase the text and split it into alphanumeric tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize the rows of a matrix, leaving all-zero rows untouched."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class HashingEmbedder:
+    """
+    Embed texts with the hashing trick over unigrams and bigrams.
+    Needs no fitting and no network, so it is the default embedder.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+
+    def _bucket(self, feature: str) -> tuple[int, float]:
+        # crc32 is stable across processes, unlike the builtin hash()
+        h = zlib.crc32(feature.encode())
+        return h % self.dim, 1.0 if (h >> 31) & 1 else -1.0
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                col, sign = self._bucket(feature)
+                matrix[row, col] += sign
+        # sublinear term frequency, keeping the sign of each bucket
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        return _normalize_rows(matrix)
+
+
+class TfidfSvdEmbedder:
+    """
+    Embed texts with TF-IDF followed by a truncated SVD (latent semantic analysis).
+    It has to be fitted on a sample of abstracts first, then it can be saved and loaded.
+    """
+
+    name = "tfidf-svd"
+
+    def __init__(self, dim: int = DEFAULT_DIM, max_features: int = 20000):
+        self.dim = dim
+        self._max_features = max_features
+        self._vocabulary: dict[str, int] = {}
+        self._idf: np.ndarray | None = None
+        self._components: np.ndarray | None = None
+
+    def _tfidf(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), len(self._vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                col = self._vocabulary.get(token)
+                if col is not None:
+                    matrix[row, col] += 1.0
+        matrix = np.log1p(matrix) * self._idf
+        return _normalize_rows(matrix)
+
+    def fit(self, texts: list[str]) -> "TfidfSvdEmbedder":
+        """Learn the vocabulary, IDF weights and SVD projection from texts."""
+        document_frequency: dict[str, int] = {}
+        for text in texts:
+            for token in set(tokenize(text)):
+                document_frequency[token] = document_frequency.get(token, 0) + 1
+
+        # keep the most frequent terms that appear in at least two documents
+        terms = sorted(
+            (t for t, df in document_frequency.items() if df > 1),
+            key=lambda t: -document_frequency[t],
+        )[: self._max_features]
+        self._vocabulary = {t: i for i, t in enumerate(terms)}
+        df = np.array([document_frequency[t] for t in terms], dtype=np.float32)
+        self._idf = np.log((1 + len(texts)) / (1 + df)) + 1.0
+
+        _, _, vt = np.linalg.svd(self._tfidf(texts), full_matrices=False)
+        components = vt[: self.dim].T
+        # pad if there are fewer singular vectors than dimensions
+        if components.shape[1] < self.dim:
+            components = np.pad(
+                components, ((0, 0), (0, self.dim - components.shape[1]))
+            )
+        self._components = components.astype(np.float32)
+        return self
+
+    def __call__(self, texts: list[str]) -> np.ndarray:
+        if self._components is None:
+            raise ValueError("TfidfSvdEmbedder must be fitted before use.")
+        return _normalize_rows(self._tfidf(texts) @ self._components)
+
+    def save(self, path: Path) -> None:
+        terms = sorted(self._vocabulary, key=self._vocabulary.get)
+        np.savez(
+            path, terms=np.array(terms), idf=self._idf, components=self._components
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "TfidfSvdEmbedder":
+        data = np.load(path)
+        embedder = cls(dim=data["components"].shape[1])
+        embedder._vocabulary = {str(t): i for i, t in enumerate(data["terms"])}
+        embedder._idf = data["idf"]
+        embedder._components = data["components"]
+        return embedder
+
+
+def get_index_path() -> Path:
+    """Create and return the vector index directory path"""
+    index_dir = Path(os.path.expanduser("~/.askademic/index"))
+    index_dir.mkdir(parents=True, exist_ok=True)
+    return index_dir
+
+
+class VectorIndex:
+    """
+    Append-only index of abstract embeddings.
+
+    Vectors are fixed-width float32 rows in a raw file which is memory-mapped on
+    search, so opening the index is instant and only the rows being scanned are paged in.
+    The arXiv IDs are in a SQLite table keyed by row, with a unique index on the IDs,
+    so neither counting the vectors, nor checking an ID, nor naming the rows found
+    loads them all. The IDs of an append are committed after its vectors.
+    Optionally, the vectors can be assigned to coarse partitions (k-means centroids),
+    so that a search only scans the partitions closest to the query.
+    """
+
+    def __init__(self, path: Path | None = None, embedder: Embedder | None = None):
+        self._path = Path(path) if path else get_index_path()
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._embedder = embedder or HashingEmbedder()
+        self.dim = self._embedder.dim
+
+        self._vectors_file = self._path / "vectors.f32"
+        self._ids_file = self._path / "ids.db"
+        self._partitions_file = self._path / "partitions.i32"
+        self._centroids_file = self._path / "centroids.npy"
+        self._meta_file = self._path / "meta.json"
+
+        embedder_name = getattr(self._embedder, "name", type(self._embedder).__name__)
+        if self._meta_file.exists():
+            meta = json.loads(self._meta_file.read_text())
+            if meta["dim"] != self.dim or meta["embedder"] != embedder_name:
+                raise ValueError(
+                    f"Index at {self._path} was built with {meta['embedder']} "
+                    + f"(dim {meta['dim']}), not {embedder_name} (dim {self.dim})."
+                )
+        else:
+            self._meta_file.write_text(
+                json.dumps({"dim": self.dim, "embedder": embedder_name})
+            )
+
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(self._ids_file, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(IDS_SCHEMA)
+
+        self._centroids: np.ndarray | None = None
+        if self._centroids_file.exists():
+            self._centroids = np.load(self._centroids_file)
+
+    def close(self):
+        self._connection.close()
+
+    def _n_ids(self) -> int:
+        last_row = self._connection.execute("SELECT MAX(row) FROM ids").fetchone()[0]
+        return 0 if last_row is None else last_row + 1
+
+    def __len__(self) -> int:
+        if not self._vectors_file.exists():
+            return 0
+        n_vectors = self._vectors_file.stat().st_size // (4 * self.dim)
+        # an interrupted append can leave more vectors than IDs, never fewer
+        return min(n_vectors, self._n_ids())
+
+    def __contains__(self, arxiv_id: str) -> bool:
+        return (
+            self._connection.execute(
+                "SELECT 1 FROM ids WHERE id = ?", (arxiv_id,)
+            ).fetchone()
+            is not None
+        )
+
+    def _existing(self, arxiv_ids: list[str]) -> set[str]:
+        """The IDs, among arxiv_ids, already in the index."""
+        existing = set()
+        for start in range(0, len(arxiv_ids), MAX_QUERY_IDS):
+            end = start + MAX_QUERY_IDS
+            chunk = arxiv_ids[start:end]
+            rows = self._connection.execute(
+                f"SELECT id FROM ids WHERE id IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            existing.update(r[0] for r in rows)
+        return existing
+
+    def _ids_of(self, rows: list[int]) -> dict[int, str]:
+        """The arXiv IDs of rows of vectors."""
+        ids = {}
+        for start in range(0, len(rows), MAX_QUERY_IDS):
+            end = start + MAX_QUERY_IDS
+            chunk = rows[start:end]
+            ids.update(
+                self._connection.execute(
+                    f"SELECT row, id FROM ids WHERE row IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                ).fetchall()
+            )
+        return ids
+
+    @property
+    def embedder(self) -> Embedder:
+        return self._embedder
+
+    @property
+    def is_partitioned(self) -> bool:
+        return self._centroids is not None
+
+    def _vectors(self, n_rows: int) -> np.ndarray:
+        return np.memmap(
+            self._vectors_file, dtype=np.float32, mode="r", shape=(n_rows, self.dim)
+        )
+
+    def _partitions(self, n_rows: int) -> np.ndarray:
+        return np.memmap(
+            self._partitions_file, dtype=np.int32, mode="r", shape=(n_rows,)
+        )
+
+    def add(self, arxiv_ids: list[str], texts: list[str]) -> int:
+        """
+        Embed texts and append them to the index, skipping IDs already present.
+        Returns the number of vectors added.
+        """
+        with self._lock:
+            existing = self._existing(list(arxiv_ids))
+            new = {}
+            for arxiv_id, text in zip(arxiv_ids, texts):
+                if arxiv_id not in existing and arxiv_id not in new:
+                    new[arxiv_id] = text
+            if not new:
+                return 0
+
+            vectors = self._embedder(list(new.values())).astype(np.float32)
+            self.add_vectors(list(new), vectors)
+            return len(new)
+
+    def add_vectors(self, arxiv_ids: list[str], vectors: np.ndarray) -> None:
+        """Append already embedded vectors. Callers are responsible for deduplication."""
+        if vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Expected vectors of dim {self.dim}, got {vectors.shape[1]}"
+            )
+
+        with self._lock:
+            # drop any vectors (and partitions) left over by an interrupted append
+            # before writing, so that the rows of the three files stay aligned
+            n_rows = len(self)
+            if self._vectors_file.exists():
+                os.truncate(self._vectors_file, n_rows * 4 * self.dim)
+            if self.is_partitioned and self._partitions_file.exists():
+                os.truncate(self._partitions_file, n_rows * 4)
+
+            with open(self._vectors_file, "ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+            if self.is_partitioned:
+                with open(self._partitions_file, "ab") as f:
+                    f.write(self._assign(vectors).astype(np.int32).tobytes())
+            with self._connection:
+                self._connection.execute("DELETE FROM ids WHERE row >= ?", (n_rows,))
+                self._connection.executemany(
+                    "INSERT INTO ids (row, id) VALUES (?, ?)",
+                    ((n_rows + i, arxiv_id) for i, arxiv_id in enumerate(arxiv_ids)),
+                )
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self._centroids.T, axis=1)
+
+    def build_partitions(
+        self,
+        n_partitions: int = 256,
+        sample_size: int = 100000,
+        iterations: int = 10,
+        batch_size: int = 65536,
+    ) -> None:
+        """
+        Cluster a sample of the vectors with spherical k-means and assign every vector
+        to its closest centroid. New vectors are assigned as they are added.
+        """
+        n_rows = len(self)
+        if n_rows == 0:
+            return
+        vectors = self._vectors(n_rows)
+        rng = np.random.default_rng(0)
+        sample_rows = np.sort(
+            rng.choice(n_rows, min(sample_size, n_rows), replace=False)
+        )
+        sample = np.asarray(vectors[sample_rows])
+
+        n_partitions = min(n_partitions, len(sample))
+        centroids = sample[rng.choice(len(sample), n_partitions, replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_partitions):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = _normalize_rows(centroids)
+
+        self._centroids = centroids
+        np.save(self._centroids_file, centroids)
+        with open(self._partitions_file, "wb") as f:
+            for start in range(0, n_rows, batch_size):
+                end = start + batch_size
+                chunk = np.asarray(vectors[start:end])
+                f.write(self._assign(chunk).astype(np.int32).tobytes())
+
+        logger.info(
+            f"{datetime.now()}: Built {n_partitions} partitions over {n_rows} vectors"
+        )
+
+    def search(
+        self,
+        texts: str | list[str],
+        k: int = 10,
+        n_probe: int = 8,
+        batch_size: int = 65536,
+    ) -> list[list[tuple[str, float]]]:
+        """
+        Find the k nearest abstracts (cosine similarity) for each query text.
+        The scan is a batched matrix product over the memory-mapped vectors; if the index
+        is partitioned, only the n_probe partitions closest to the queries are scanned.
+        Returns, for each query, a list of (arXiv ID, score) sorted by score.
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        n_rows = len(self)
+        if n_rows == 0:
+            return [[] for _ in texts]
+
+        queries = self._embedder(texts).astype(np.float32)
+        vectors = self._vectors(n_rows)
+
+        rows = None
+        if self.is_partitioned:
+            closest = np.argsort(-(queries @ self._centroids.T), axis=1)[:, :n_probe]
+            rows = np.flatnonzero(np.isin(self._partitions(n_rows), np.unique(closest)))
+
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+        n_candidates = n_rows if rows is None else len(rows)
+        for start in range(0, n_candidates, batch_size):
+            end = min(start + batch_size, n_candidates)
+            if rows is None:
+                chunk_rows = np.arange(start, end)
+                chunk = np.asarray(vectors[start:end])
+            else:
+                chunk_rows = rows[start:end]
+                chunk = np.asarray(vectors[chunk_rows])
+            scores = np.concatenate([best_scores, queries @ chunk.T], axis=1)
+            candidates = np.concatenate(
+                [
+                    best_rows,
+                    np.broadcast_to(chunk_rows, (len(queries), len(chunk_rows))),
+                ],
+                axis=1,
+            )
+            keep = min(k, scores.shape[1])
+            top = np.argpartition(-scores, keep - 1, axis=1)[:, :keep]
+            best_scores = np.take_along_axis(scores, top, axis=1)
+            best_rows = np.take_along_axis(candidates, top, axis=1)
+
+        ids = self._ids_of(np.unique(best_rows).tolist())
+        results = []
+        for scores, rows_ in zip(best_scores, best_rows):
+            order = np.argsort(-scores)
+            results.append([(ids[int(rows_[i])], float(scores[i])) for i in order])
+        return results
+
+
+_vector_index: VectorIndex | None = None
+_vector_index_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex:
+    """Return the process-wide vector index, opening it on first use."""
+    global _vector_index
+    with _vector_index_lock:
+        if _vector_index is None:
+            _vector_index = VectorIndex()
+    return _vector_index
+
+
+def index_articles(records: Iterable[dict], index: VectorIndex | None = None) -> int:
+    """
+    Add articles to the vector index (the local one by default). Records need an
+    arXiv ID ("id") and an abstract ("abstract"), the title is used too when present.
+    """
+    records = [r for r in records if r.get("id") and r.get("abstract")]
+    if not records:
+        return 0
+    if index is None:
+        index = get_vector_index()
+    texts = [f"{r.get('title', '')}\n{r['abstract']}" for r in records]
+    return index.add([r["id"] for r in records], texts)
@@ -0,0 +1,46 @@
+import pytest
+
+from askademic.allower_classifier import AllowerClassifier
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    return AllowerClassifier()
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        "What is the latest research on quantum computing?",
+        "Can you summarize the latest papers on AI?",
+        "What are the implications of quantum entanglement?",
+        "What is the relation between context length and accuracy for LLMs?",
+        "Explain https://arxiv.org/abs/2401.12345v2 to me",
+        "What does 2401.12345 say?",
+        "Latest papers in cs.CL",
+        "How does CRISPR technology work?",
+    ],
+)
+def test_clearly_scientific_requests_are_allowed(classifier, request_):
+    allowed = classifier.classify(request_)
+    assert allowed is not None
+    assert allowed.is_scientific
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        "Hello, how are you?",
+        "Tell me a joke about physics.",
+        "What is the meaning of life?",
+        "What is the history of football games?",
+        "Tell me about this method",
+        "Write me a research paper on love",
+        "What is the best method to study for an exam?",
+        "Is the stock market going up tomorrow, give me a statistical proof",
+        "Who won the election 2024.12345",
+        "1706.03762",
+    ],
+)
+def test_other_requests_are_left_to_the_llm(classifier, request_):
+    assert classifier.classify(request_) is None
@@ -102,3 +102,73 @@ class TestArticleAgentIntegration:
         fetch_tool = tools["fetch_article"]
         json_schema = fetch_tool.function_schema.json_schema
         assert "link" in json_schema.get("properties", {})
+
+
+class TestArticleAgentDirectRead:
+    """Tests for reading an article known by its arXiv ID, without tool calls."""
+
+    @pytest.mark.asyncio
+    async def test_read_fetches_the_pdf_and_answers_in_one_call(self):
+        from unittest.mock import AsyncMock, MagicMock, patch
+
+        agent = ArticleAgent(model="google-gla:gemini-2.0-flash")
+        mock_result = MagicMock()
+        mock_result.output = ArticleResponse(
+            response="It introduces the transformer.",
+            article_title="Attention Is All You Need",
+            article_link="",
+        )
+        agent._reader_agent.run = AsyncMock(return_value=mock_result)
+        agent._agent.run = AsyncMock()
+
+        with patch(
+            "askademic.article.get_article", return_value="Attention text"
+        ) as mock_get_article:
+            result = await agent.read("What is it about?", "1706.03762")
+
+        mock_get_article.assert_called_once_with(
+            "https://arxiv.org/pdf/1706.03762.pdf", use_cache=True
+        )
+        prompt = agent._reader_agent.run.call_args.args[0]
+        assert "Attention text" in prompt
+        assert "What is it about?" in prompt
+        assert result.output.article_link == "https://arxiv.org/pdf/1706.03762.pdf"
+        agent._agent.run.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_read_falls_back_to_the_tools_if_not_found(self):
+        from unittest.mock import AsyncMock, patch
+
+        agent = ArticleAgent(model="google-gla:gemini-2.0-flash")
+        agent._reader_agent.run = AsyncMock()
+        agent._agent.run = AsyncMock()
+
+        not_found = (
+            '<article url="https://arxiv.org/pdf/9999.99999.pdf">\n'
+            + "Article Not Found\n</article>"
+        )
+        with patch("askademic.article.get_article", return_value=not_found):
+            await agent.read("What is it about?", "9999.99999")
+
+        agent._reader_agent.run.assert_not_called()
+        agent._agent.run.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_run_reads_a_single_article_directly(self):
+        from unittest.mock import AsyncMock, MagicMock
+
+        agent = ArticleAgent(model="google-gla:gemini-2.0-flash")
+        agent.read = AsyncMock()
+        agent._agent.run = AsyncMock(return_value=MagicMock())
+
+        await agent.run("Explain https://arxiv.org/abs/1706.03762v5")
+        agent.read.assert_called_once_with(
+            "Explain https://arxiv.org/abs/1706.03762v5", "1706.03762"
+        )
+
+        await agent.run("Compare 1706.03762 and 1810.04805")
+        agent._agent.run.assert_called_once()
+
+        await agent.run("Find papers similar to 1706.03762")
+        assert agent._agent.run.call_count == 2
+        agent.read.assert_called_once()
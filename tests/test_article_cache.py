@@ -5,6 +5,7 @@ from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 
 from askademic.tools import (
     get_article,
@@ -97,4 +98,17 @@ class TestArticleCache:
                 mock_open.return_value = mock_doc
                 
                 result2 = get_article(url, use_cache=False)
-                assert mock_get.called  # Should make a network call
\ No newline at end of file
+                assert mock_get.called  # Should make a network call
+
+    def test_article_not_fetched_is_not_cached(self, temp_cache_dir):
+        url = "https://arxiv.org/pdf/2401.00002.pdf"
+
+        # the connection fails until the attempts run out
+        with patch(
+            "askademic.tools.requests.get",
+            side_effect=requests.exceptions.ConnectionError,
+        ), patch("askademic.tools.time.sleep"):
+            get_article(url, max_attempts=2, use_cache=True)
+
+        hit, _ = get_article_from_cache(url)
+        assert hit is False
@@ -0,0 +1,70 @@
+import pytest
+
+from askademic.category_classifier import CategoryClassifier
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    return CategoryClassifier(decisions_path=tmp_path / "decisions.json")
+
+
+@pytest.mark.parametrize(
+    "request_, category_id, method",
+    [
+        ("get me the latest papers in AI", "cs.AI", "name"),
+        ("Summarize the latest in computer vision", "cs.CV", "name"),
+        ("What's new in cs.CL?", "cs.CL", "id"),
+        ("latest hep-th papers", "hep-th", "id"),
+        ("latest papers on quantum field theory", "hep-th", "name"),
+        ("new papers in robotcs", "cs.RO", "fuzzy"),
+        ("latest papers on galaxy astrophysics", "astro-ph.GA", "tfidf"),
+    ],
+)
+def test_classify_confident(classifier, request_, category_id, method):
+    match = classifier.classify(request_)
+    assert match is not None
+    assert match.category_id == category_id
+    assert match.method == method
+
+
+@pytest.mark.parametrize(
+    "request_",
+    [
+        "latest in ai and robotics",
+        "latest papers on computer vision and robotics",
+        "new work in machine learning and statistics theory",
+        "performance of llms",
+        "recent work on graph neural networks for chemistry",
+        "get me the latest papers",
+    ],
+)
+def test_classify_not_confident(classifier, request_):
+    assert classifier.classify(request_) is None
+
+
+def test_learn(tmp_path, classifier):
+    assert classifier.classify("latest papers on bayesian statistics") is None
+
+    classifier.learn("latest papers on bayesian statistics", "stat.ME")
+    match = classifier.classify("Bayesian statistics: what's new?")
+    assert match.category_id == "stat.ME"
+    assert match.method == "learned"
+
+    # decisions are persisted
+    reloaded = CategoryClassifier(decisions_path=tmp_path / "decisions.json")
+    assert reloaded.classify("bayesian statistics").category_id == "stat.ME"
+
+
+def test_learn_ignores_unknown_categories(classifier):
+    classifier.learn("latest papers on bayesian statistics", "xx.YY")
+    assert classifier.classify("latest papers on bayesian statistics") is None
+
+
+def test_learn_forgets_oldest(tmp_path):
+    classifier = CategoryClassifier(
+        decisions_path=tmp_path / "decisions.json", max_decisions=1
+    )
+    classifier.learn("bayesian statistics", "stat.ME")
+    classifier.learn("protein folding", "q-bio.BM")
+    assert classifier.classify("bayesian statistics") is None
+    assert classifier.classify("protein folding").category_id == "q-bio.BM"
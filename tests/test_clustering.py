@@ -0,0 +1,51 @@
+import numpy as np
+
+from askademic.clustering import cluster_abstracts, default_n_clusters, kmeans, tfidf
+
+ASTRO = [
+    "We observe galaxy clusters with a radio telescope and measure dark matter halos.",
+    "Dark matter halos of dwarf galaxy populations observed with the telescope.",
+    "A radio telescope survey of galaxy mergers and their dark matter content.",
+    "Galaxy rotation curves constrain dark matter halos in the telescope data.",
+]
+BIO = [
+    "Protein folding dynamics of enzyme mutants measured in living cells.",
+    "Enzyme kinetics and protein folding in bacterial cells under stress.",
+    "Gene expression controls protein folding chaperones in yeast cells.",
+    "Single cells reveal enzyme and protein folding heterogeneity.",
+]
+
+
+def test_tfidf_rows_are_normalised():
+    x, vocabulary = tfidf(ASTRO + BIO)
+    assert x.shape == (8, len(vocabulary))
+    assert np.allclose(np.linalg.norm(x, axis=1), 1)
+    assert "galaxy" in vocabulary and "protein" in vocabulary
+    # stop words and words of a single abstract are left out
+    assert "we" not in vocabulary and "yeast" not in vocabulary
+
+
+def test_kmeans_is_reproducible():
+    x, _ = tfidf(ASTRO + BIO)
+    first, _ = kmeans(x, 2, seed=1)
+    second, _ = kmeans(x, 2, seed=1)
+    assert np.array_equal(first, second)
+
+
+def test_cluster_abstracts_separates_topics():
+    abstracts = [a for pair in zip(ASTRO, BIO) for a in pair]
+    clusters = cluster_abstracts(abstracts, n_clusters=2)
+
+    assert sorted(c.size for c in clusters) == [4, 4]
+    groups = [{abstracts[i] for i in c.members} for c in clusters]
+    assert set(ASTRO) in groups and set(BIO) in groups
+    keywords = {k for c in clusters for k in c.keywords}
+    assert {"galaxy", "protein"} <= keywords
+
+
+def test_cluster_abstracts_edge_cases():
+    assert cluster_abstracts([]) == []
+    clusters = cluster_abstracts(["Only one abstract."], n_clusters=5)
+    assert [c.members for c in clusters] == [[0]]
+    assert default_n_clusters(300) == 12
+    assert default_n_clusters(50) == 5
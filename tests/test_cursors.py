@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from askademic.cursors import CursorStore
+from askademic.tools import next_page, search_articles_by_abs
+
+
+def make_fetch_page(n_results: int, page_size: int, calls: list):
+    """A search with n_results results, recording the pages fetched."""
+
+    def fetch_page(start: int) -> list:
+        calls.append(start)
+        return list(range(start, min(start + page_size, n_results)))
+
+    return fetch_page
+
+
+def test_cursor_pages():
+    store = CursorStore()
+    calls = []
+    fetch_page = make_fetch_page(25, 10, calls)
+
+    cursor = store.open(fetch_page, fetch_page(0), start=0, page_size=10)
+    assert cursor is not None
+
+    records, cursor = store.next_page(cursor)
+    assert records == list(range(10, 20))
+    records, last_cursor = store.next_page(cursor)
+    assert records == list(range(20, 25))
+    assert last_cursor is None
+
+    # a cursor can be served again, from memory
+    assert store.next_page(cursor)[0] == list(range(20, 25))
+    assert calls == [0, 10, 20]
+
+
+def test_cursor_prefetches_next_page_once_paged():
+    store = CursorStore()
+    fetched = {10: threading.Event(), 20: threading.Event()}
+
+    def fetch_page(start: int) -> list:
+        fetched[start].set()
+        return list(range(start, start + 10))
+
+    cursor = store.open(fetch_page, list(range(10)), start=0, page_size=10)
+    # nothing is fetched for a search that is not paged through
+    assert not fetched[10].wait(timeout=0.1)
+
+    store.next_page(cursor)
+    # the third page is fetched without being asked for
+    assert fetched[20].wait(timeout=5)
+
+
+def test_cursor_no_next_page():
+    store = CursorStore()
+    assert store.open(lambda start: [], list(range(5)), start=0, page_size=10) is None
+
+
+def test_cursor_unknown_and_expired():
+    store = CursorStore(ttl=0.01)
+    with pytest.raises(KeyError):
+        store.next_page("unknown.1")
+
+    cursor = store.open(lambda start: [1], [0, 1], start=0, page_size=2)
+    time.sleep(0.05)
+    with pytest.raises(KeyError):
+        store.next_page(cursor)
+
+
+def test_cursor_eviction():
+    store = CursorStore(max_cursors=2)
+    cursors = [
+        store.open(lambda start: [1], [0, 1], start=0, page_size=2) for _ in range(3)
+    ]
+    with pytest.raises(KeyError):
+        store.next_page(cursors[0])
+    assert store.next_page(cursors[2])[0] == [1]
+
+
+def test_cursor_failed_prefetch_is_retried():
+    store = CursorStore()
+    attempts = []
+
+    def fetch_page(start: int) -> list:
+        attempts.append(start)
+        if len(attempts) == 1:
+            raise ConnectionError("arXiv is down")
+        return [start]
+
+    cursor = store.open(fetch_page, [0], start=0, page_size=1)
+    with pytest.raises(ConnectionError):
+        store.next_page(cursor)
+    assert store.next_page(cursor)[0] == [1]
+
+
+@patch("askademic.tools._search_records")
+def test_search_tool_and_next_page(mock_search_records):
+    def search_records(query, prefix, start, max_results):
+        return [
+            {
+                "article_link": f"http://arxiv.org/abs/2501.{i:05d}v1",
+                "title": f"Title {i}",
+                "abstract": f"Abstract {i} " + "word " * i,
+            }
+            for i in range(start, start + max_results)
+        ]
+
+    mock_search_records.side_effect = search_records
+
+    result = json.loads(search_articles_by_abs("attention", max_results=2))
+    assert [a["title"] for a in result["articles"]] == ["Title 0", "Title 1"]
+
+    result = json.loads(next_page(result["next_page_cursor"]))
+    assert [a["title"] for a in result["articles"]] == ["Title 2", "Title 3"]
+    assert result["next_page_cursor"]
+
+    assert next_page("unknown.1") == "Cursor not found"
@@ -0,0 +1,91 @@
+import time
+
+from askademic.dedup import (
+    MinHasher,
+    collapse_near_duplicates,
+    estimate_jaccard,
+    find_near_duplicates,
+    shingles,
+)
+
+ABSTRACT = (
+    "We propose a new simple network architecture, the Transformer, based solely on "
+    "attention mechanisms, dispensing with recurrence and convolutions entirely. "
+    "Experiments on two machine translation tasks show these models to be superior "
+    "in quality while being more parallelizable and requiring significantly less time "
+    "to train."
+)
+
+
+def test_shingles():
+    assert shingles("A b, C d") == {"a b c", "b c d"}
+    assert shingles("short text") == {"short text"}
+    assert shingles("") == set()
+
+
+def test_minhash_estimates_jaccard():
+    minhasher = MinHasher(num_perm=128)
+    a = minhasher.signature(shingles(ABSTRACT))
+    b = minhasher.signature(shingles(ABSTRACT + " Code is available."))
+    c = minhasher.signature(shingles("Lyapunov exponents of chaotic maps."))
+    assert estimate_jaccard(a, a) == 1.0
+    assert estimate_jaccard(a, b) > 0.7
+    assert estimate_jaccard(a, c) < 0.2
+
+
+def test_find_near_duplicates():
+    texts = [ABSTRACT, "Lyapunov exponents of chaotic maps.", ABSTRACT + " Typo fixed."]
+    assert find_near_duplicates(texts) == [[0, 2], [1]]
+
+
+def test_collapse_near_duplicates():
+    records = [
+        {
+            "article_link": "http://arxiv.org/pdf/1706.03762v7",
+            "title": "Attention Is All You Need",
+            "abstract": ABSTRACT,
+        },
+        {
+            "article_link": "http://arxiv.org/pdf/1234.56789v1",
+            "title": "Chaos",
+            "abstract": "Lyapunov exponents of chaotic maps.",
+        },
+        {
+            "article_link": "http://arxiv.org/pdf/1706.03762v1",
+            "title": "Attention Is All You Need (first version)",
+            "abstract": "A completely different first abstract.",
+        },
+        {
+            "article_link": "http://arxiv.org/pdf/1801.00001v1",
+            "title": "Attention Is All You Need",
+            "abstract": ABSTRACT + " Journal version.",
+        },
+    ]
+
+    collapsed = collapse_near_duplicates(records)
+
+    assert [r["article_link"] for r in collapsed] == [
+        "http://arxiv.org/pdf/1706.03762v7",
+        "http://arxiv.org/pdf/1234.56789v1",
+    ]
+    assert collapsed[0]["alternates"] == [
+        "http://arxiv.org/pdf/1706.03762v1",
+        "http://arxiv.org/pdf/1801.00001v1",
+    ]
+    assert "alternates" not in collapsed[1]
+    # the input records are not modified
+    assert "alternates" not in records[0]
+
+
+def test_collapse_is_fast_on_a_result_page():
+    records = [
+        {
+            "article_link": f"http://arxiv.org/pdf/2401.{i:05d}v1",
+            "title": f"Paper {i}",
+            "abstract": f"Abstract number {i} about topic {i % 7}. " + ABSTRACT[i:],
+        }
+        for i in range(100)
+    ]
+    start = time.perf_counter()
+    collapse_near_duplicates(records)
+    assert time.perf_counter() - start < 1.0
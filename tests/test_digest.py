@@ -0,0 +1,177 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic_ai.agent import AgentRunResult
+
+os.environ["GOOGLE_API_KEY"] = "mock"
+
+from askademic.digest import (  # noqa: E402
+    DigestScheduler,
+    DigestStore,
+    last_announcement,
+    latest_announced_day,
+    next_announcement,
+)
+from askademic.summary import (  # noqa: E402
+    Category,
+    Summary,
+    SummaryAgent,
+    SummaryResponse,
+)
+
+MODEL = "google-gla:gemini-2.0-flash"
+
+
+def make_response(category_id: str, day: str) -> SummaryResponse:
+    return SummaryResponse(
+        category=Category(category_id=category_id, category_name="Some name"),
+        latest_published_day=day,
+        summary=f"Summary of {category_id} on {day}.",
+        recent_papers_url=f"https://arxiv.org/list/{category_id}/new",
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DigestStore(tmp_path / "digests.db")
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        # Wednesday 2025-04-02 21:00 EDT, after that day's announcement
+        (datetime(2025, 4, 3, 1, 0, tzinfo=timezone.utc), "2025-04-03T00:00"),
+        # Wednesday 2025-04-02 19:00 EDT, before it: Tuesday's
+        (datetime(2025, 4, 2, 23, 0, tzinfo=timezone.utc), "2025-04-02T00:00"),
+        # Saturday 2025-04-05: Thursday's, no announcements on Friday and Saturday
+        (datetime(2025, 4, 5, 12, 0, tzinfo=timezone.utc), "2025-04-04T00:00"),
+    ],
+)
+def test_last_announcement(now, expected):
+    assert last_announcement(now).isoformat().startswith(expected)
+
+
+@pytest.mark.parametrize(
+    "now, expected",
+    [
+        # Wednesday 2025-04-02 21:00 EDT: the submissions of that day
+        (datetime(2025, 4, 3, 1, 0, tzinfo=timezone.utc), "2025-04-02"),
+        # Monday 2025-04-07 10:00 EDT: Sunday's announcement, of Friday's submissions
+        (datetime(2025, 4, 7, 14, 0, tzinfo=timezone.utc), "2025-04-04"),
+    ],
+)
+def test_latest_announced_day(now, expected):
+    assert latest_announced_day(now) == expected
+
+
+def test_next_announcement():
+    # Friday 2025-04-04 12:00 UTC: next is Sunday 20:00 EDT
+    now = datetime(2025, 4, 4, 12, 0, tzinfo=timezone.utc)
+    assert next_announcement(now) == datetime(2025, 4, 7, 0, 0, tzinfo=timezone.utc)
+
+
+def test_store_put_get(store):
+    response = make_response("cs.AI", "2025-04-01")
+    store.put(response, MODEL)
+    assert store.get("cs.AI", "2025-04-01", MODEL) == response
+    assert store.get("cs.AI", "2025-04-01", "another:model") is None
+    assert store.get("cs.AI", "2025-03-31", MODEL) is None
+
+
+def test_store_get_current(store):
+    store.put(make_response("cs.AI", "2025-03-31"), MODEL)
+    store.put(make_response("cs.AI", "2025-04-01"), MODEL)
+
+    # Tuesday 2025-04-01 21:00 EDT, after the announcement of that day
+    now = datetime(2025, 4, 2, 1, 0, tzinfo=timezone.utc)
+    current = store.get_current("cs.AI", MODEL, now=now)
+    assert current.latest_published_day == "2025-04-01"
+
+    # made after the announcement of the next day, but of an older day
+    next_day = datetime(2025, 4, 3, 1, 0, tzinfo=timezone.utc)
+    assert store.get_current("cs.AI", MODEL, now=next_day) is None
+
+    # stale after the next announcement
+    later = datetime.now(timezone.utc) + timedelta(days=7)
+    assert store.get_current("cs.AI", MODEL, now=later) is None
+
+
+@pytest.mark.asyncio
+async def test_scheduler_run_once(store):
+    summary_agent = MagicMock()
+    summary_agent.summarise = AsyncMock(
+        side_effect=lambda category, day: make_response(category.category_id, day)
+    )
+    scheduler = DigestScheduler(
+        ["cs.AI", "cs.CL"], MODEL, store=store, summary_agent=summary_agent
+    )
+    scheduler._identify_latest_day = MagicMock(return_value="2025-04-01")
+
+    computed = await scheduler.run_once()
+    assert [r.category.category_id for r in computed] == ["cs.AI", "cs.CL"]
+    assert store.get("cs.CL", "2025-04-01", MODEL) is not None
+    summary_agent.summarise.assert_awaited_with(
+        Category(category_id="cs.CL", category_name="Computation and Language"),
+        "2025-04-01",
+    )
+
+    # nothing new to compute
+    assert await scheduler.run_once() == []
+    assert summary_agent.summarise.await_count == 2
+
+
+def test_scheduler_stores_each_digest_once(store):
+    # the scheduler stores the digests, not its summary agent too
+    scheduler = DigestScheduler(["cs.AI"], MODEL, store=store)
+    assert scheduler._summary_agent._digests is None
+
+
+def test_scheduler_unknown_category(store):
+    with pytest.raises(ValueError):
+        DigestScheduler(["xx.YY"], MODEL, store=store, summary_agent=MagicMock())
+
+
+@pytest.mark.asyncio
+async def test_summary_agent_serves_digest(store, tmp_path):
+    day = latest_announced_day()
+    store.put(make_response("cs.AI", day), MODEL)
+
+    summary_agent = SummaryAgent(MODEL, digests=store)
+    summary_agent._category_classifier = MagicMock()
+    summary_agent._category_classifier.classify.return_value = MagicMock(
+        category_id="cs.AI", category_name="Artificial Intelligence"
+    )
+    summary_agent._summary_agent = MagicMock()
+    summary_agent._identify_latest_day = MagicMock()
+
+    response = await summary_agent("get me the latest papers in AI")
+    assert response == make_response("cs.AI", day)
+    assert not summary_agent._identify_latest_day.called
+    assert not summary_agent._summary_agent.run.called
+
+
+@pytest.mark.asyncio
+async def test_summary_agent_stores_digest(store):
+    summary_agent = SummaryAgent(MODEL, digests=store)
+    summary_agent._summary_agent = MagicMock()
+    summary_future = asyncio.Future()
+    summary_future.set_result(
+        AgentRunResult(
+            output=Summary(summary="Summary of cs.CL articles."),
+            _output_tool_name=None,
+            _state=None,
+            _new_message_index=None,
+            _traceparent_value=None,
+        )
+    )
+    summary_agent._summary_agent.run.return_value = summary_future
+    summary_agent._retrieve_recent_articles = MagicMock(return_value=["abstract"])
+
+    category = Category(category_id="cs.CL", category_name="Computation and Language")
+    response = await summary_agent.summarise(category, "2025-04-01")
+    assert store.get("cs.CL", "2025-04-01", MODEL) == response
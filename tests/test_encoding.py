@@ -0,0 +1,82 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from askademic.encoding import (
+    clip_sentences,
+    default_encoding,
+    encode_abstracts,
+    encode_articles,
+)
+from askademic.tools import _encode_page
+
+RECORDS = [
+    {
+        "article_link": "https://arxiv.org/pdf/2401.00001v2",
+        "title": "Attention   is\n all you need",
+        "abstract": "We propose a model. It uses attention | only. It is fast.",
+    },
+    {
+        "article_link": "http://arxiv.org/abs/hep-th/9901001v1",
+        "title": "Strings",
+        "abstract": "A short abstract.",
+    },
+]
+
+
+def test_compact_is_a_table_with_ids():
+    text = encode_articles(RECORDS, "compact", next_page_cursor="abc")
+    assert text.splitlines() == [
+        "id|title|abstract",
+        "2401.00001|Attention is all you need|We propose a model. It uses attention / only. It is fast.",
+        "hep-th/9901001|Strings|A short abstract.",
+        "next_page_cursor: abc",
+    ]
+    assert encode_articles([], "compact", next_page_cursor=None) == (
+        "next_page_cursor: none"
+    )
+
+
+def test_abstracts_clipped_to_sentences():
+    assert clip_sentences("One. Two! Three? Four.", 2) == "One. Two! ..."
+    assert clip_sentences("One. Two.", 2) == "One. Two."
+    assert clip_sentences("e.g. not a sentence end.", 1) == "e.g. not a sentence end."
+
+    text = encode_articles(RECORDS, "compact", max_sentences=1)
+    assert "|We propose a model. ...\n" in text
+    articles = json.loads(encode_articles(RECORDS, "json", max_sentences=1))
+    assert articles[0]["abstract"] == "We propose a model. ..."
+
+
+def test_json_is_unchanged():
+    assert json.loads(encode_articles(RECORDS)) == RECORDS
+    assert json.loads(_encode_page(RECORDS, "abc")) == {
+        "articles": RECORDS,
+        "next_page_cursor": "abc",
+    }
+
+
+def test_compact_is_shorter():
+    json_text = _encode_page(RECORDS, "abc")
+    compact_text = _encode_page(RECORDS, "abc", encoding="compact")
+    assert len(compact_text) < len(json_text) * 0.7
+
+    abstracts = ["An abstract\n  over two lines.", "Another one."]
+    assert encode_abstracts(abstracts, "compact") == (
+        "[1] An abstract over two lines.\n[2] Another one."
+    )
+    assert json.loads(encode_abstracts(abstracts)) == abstracts
+
+
+def test_unknown_encoding():
+    with pytest.raises(ValueError):
+        encode_articles(RECORDS, "yaml")
+    with patch.dict("os.environ", clear=True):
+        # compact is opted in to
+        assert default_encoding() == "json"
+    with patch.dict("os.environ", {"ASKADEMIC_ENCODING": "compact"}):
+        assert default_encoding() == "compact"
+    with patch.dict("os.environ", {"ASKADEMIC_ENCODING": "xml"}):
+        with pytest.raises(ValueError):
+            default_encoding()
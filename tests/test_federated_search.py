@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from askademic.store import MetadataStore
+from askademic.tools import search_articles_federated
+from askademic.vector_index import VectorIndex
+
+
+def _df(rows):
+    return pd.DataFrame(
+        [
+            {
+                "id": f"http://arxiv.org/pdf/{i}v1",
+                "title": title,
+                "abstract": f"Abstract of {title}",
+            }
+            for i, title in rows
+        ]
+    )
+
+
+ARXIV_RESULTS = {
+    "abs": _df([("2401.00001", "Attention"), ("2401.00002", "Transformers")]),
+    "ti": _df([("2401.00002", "Transformers"), ("2401.00003", "Attention heads")]),
+}
+
+
+def fake_search_articles(query, sortby, prefix, max_results):
+    return ARXIV_RESULTS[prefix].copy()
+
+
+@pytest.fixture
+def local(tmp_path):
+    store = MetadataStore(path=tmp_path / "metadata.db")
+    store.upsert_papers(
+        [
+            {
+                "id": "1706.03762",
+                "title": "Attention Is All You Need",
+                "abstract": "The Transformer, based solely on attention mechanisms.",
+            }
+        ]
+    )
+    index = VectorIndex(path=tmp_path / "index")
+    index.add(
+        ["1706.03762"], ["The Transformer, based solely on attention mechanisms."]
+    )
+    with (
+        patch("askademic.tools.get_store", return_value=store),
+        patch("askademic.tools.get_vector_index", return_value=index),
+    ):
+        yield
+    store.close()
+
+
+@patch("askademic.tools.search_articles", side_effect=fake_search_articles)
+def test_federated_search_merges_rankings(mock_search, local):
+    result = json.loads(search_articles_federated("attention transformer"))
+
+    assert mock_search.call_count == 2
+    links = [r["article_link"] for r in result]
+    # top of the local full text and similarity searches, with its metadata
+    assert links[0] == "https://arxiv.org/pdf/1706.03762"
+    assert result[0]["found_by"] == ["local", "similar"]
+    assert result[0]["title"] == "Attention Is All You Need"
+    # found by both arXiv searches
+    assert links[1] == "http://arxiv.org/pdf/2401.00002v1"
+    assert result[1]["found_by"] == ["abs", "title"]
+    # no duplicates
+    assert len(links) == len(set(links)) == 4
+
+
+@patch("askademic.tools.search_articles", side_effect=fake_search_articles)
+def test_federated_search_without_local(mock_search, local):
+    result = json.loads(
+        search_articles_federated("attention", max_results=2, include_local=False)
+    )
+    assert len(result) == 2
+    assert all("local" not in r["found_by"] for r in result)
+
+
+@patch("askademic.tools.search_articles", return_value=None)
+def test_federated_search_no_results(mock_search):
+    assert (
+        search_articles_federated("nothing", include_local=False) == "No articles found"
+    )
+
+
+@patch("askademic.tools.search_articles", side_effect=fake_search_articles)
+def test_federated_search_survives_failing_search(mock_search, local):
+    with patch("askademic.tools.get_store", side_effect=RuntimeError("broken")):
+        result = json.loads(search_articles_federated("attention"))
+    assert len(result) == 4
+
+
+def test_federated_search_calls_arxiv_one_at_a_time(local):
+    lock = threading.Lock()
+    running, overlaps = [], []
+
+    def slow_search(query, sortby, prefix, max_results):
+        with lock:
+            running.append(prefix)
+            overlaps.append(len(running) > 1)
+        time.sleep(0.05)
+        with lock:
+            running.remove(prefix)
+        return fake_search_articles(query, sortby, prefix, max_results)
+
+    with patch("askademic.tools.search_articles", side_effect=slow_search):
+        result = json.loads(search_articles_federated("attention transformer"))
+
+    assert overlaps == [False, False]
+    assert len(result) == 4
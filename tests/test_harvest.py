@@ -0,0 +1,194 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from askademic.harvest import HarvestError, harvest
+from askademic.http_client import HttpClient
+from askademic.store import MetadataStore
+from askademic.vector_index import VectorIndex
+
+OAI_TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+<responseDate>{response_date}</responseDate>
+{body}
+</OAI-PMH>"""
+
+RECORD_TEMPLATE = """<record>
+<header><identifier>oai:arXiv.org:{id}</identifier><datestamp>{updated}</datestamp></header>
+<metadata>
+<arXiv xmlns="http://arxiv.org/OAI/arXiv/">
+<id>{id}</id><created>{created}</created><updated>{updated}</updated>
+<authors><author><keyname>Vaswani</keyname><forenames>Ashish</forenames></author>
+<author><keyname>Shazeer</keyname><forenames>Noam</forenames></author></authors>
+<title>{title}</title><categories>cs.CL cs.LG</categories>
+<abstract>  {abstract}
+</abstract>
+</arXiv>
+</metadata>
+</record>"""
+
+DELETED_RECORD = """<record><header status="deleted">
+<identifier>oai:arXiv.org:1111.11111</identifier><datestamp>2025-03-02</datestamp>
+</header></record>"""
+
+
+def make_record(i: int, title: str = "Paper") -> str:
+    return RECORD_TEMPLATE.format(
+        id=f"2503.{i:05d}",
+        created="2025-03-01",
+        updated="2025-03-02",
+        title=f"{title} {i}",
+        abstract=f"An abstract about attention number {i}.",
+    )
+
+
+class FakeOAIEndpoint:
+    """A local OAI-PMH endpoint serving two pages of records joined by a resumption token."""
+
+    def __init__(self):
+        self.requests = []
+        self.pages = {
+            None: [make_record(1), make_record(2), DELETED_RECORD],
+            "token-1": [make_record(3)],
+        }
+        self.error = None
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {
+                    k: v[0] for k, v in parse_qs(urlparse(self.path).query).items()
+                }
+                endpoint.requests.append(params)
+                self.send_response(200)
+                self.send_header("Content-Type", "text/xml")
+                self.end_headers()
+                self.wfile.write(endpoint.respond(params).encode())
+
+            def log_message(self, *args):
+                pass
+
+        self._server = HTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._server.server_port}/oai"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def respond(self, params: dict) -> str:
+        if self.error:
+            body = f'<error code="{self.error}">error</error>'
+        else:
+            token = params.get("resumptionToken")
+            next_token = "token-1" if token is None else ""
+            body = (
+                "<ListRecords>"
+                + "".join(self.pages[token])
+                + f'<resumptionToken cursor="0">{next_token}</resumptionToken>'
+                + "</ListRecords>"
+            )
+        return OAI_TEMPLATE.format(response_date="2025-03-05T10:00:00Z", body=body)
+
+    def close(self):
+        self._server.shutdown()
+
+
+@pytest.fixture
+def endpoint():
+    endpoint = FakeOAIEndpoint()
+    yield endpoint
+    endpoint.close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetadataStore(path=tmp_path / "metadata.db")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def index(tmp_path):
+    return VectorIndex(path=tmp_path / "index")
+
+
+@pytest.fixture
+def client():
+    return HttpClient(min_interval=0)
+
+
+def test_harvest_follows_resumption_tokens(endpoint, store, index, client):
+    stats = harvest(
+        "cs", store=store, index=index, client=client, base_url=endpoint.url
+    )
+
+    assert stats.upserted == 3
+    assert stats.deleted == 1
+    assert stats.requests == 2
+    assert endpoint.requests[0] == {
+        "verb": "ListRecords",
+        "metadataPrefix": "arXiv",
+        "set": "cs",
+    }
+    assert endpoint.requests[1] == {"verb": "ListRecords", "resumptionToken": "token-1"}
+
+    paper = store.get_paper("2503.00001")
+    assert paper["title"] == "Paper 1"
+    assert paper["abstract"] == "An abstract about attention number 1."
+    assert paper["authors"] == "Ashish Vaswani, Noam Shazeer"
+    assert paper["published"] == "2025-03-01"
+    assert len(index) == 3
+
+
+def test_harvest_is_incremental(endpoint, store, index, client):
+    harvest("cs", store=store, index=index, client=client, base_url=endpoint.url)
+    assert store.get_state("harvest:cs") == "2025-03-05"
+
+    # the next harvest only asks for records changed since the watermark
+    endpoint.pages[None] = [make_record(1, title="Updated paper")]
+    harvest("cs", store=store, index=index, client=client, base_url=endpoint.url)
+    assert endpoint.requests[2]["from"] == "2025-03-05"
+    assert store.get_paper("2503.00001")["title"] == "Updated paper 1"
+    assert len(store) == 3
+
+    # watermarks are per set
+    harvest("math", store=store, index=index, client=client, base_url=endpoint.url)
+    assert "from" not in endpoint.requests[4]
+
+
+def test_harvest_removes_deleted_records(endpoint, store, client):
+    harvest("cs", store=store, client=client, base_url=endpoint.url, with_index=False)
+    assert store.search("attention number 2")
+
+    withdrawn = DELETED_RECORD.replace("1111.11111", "2503.00002")
+    no_metadata = (
+        "<record><header><identifier>oai:arXiv.org:2503.00009</identifier>"
+        + "</header></record>"
+    )
+    endpoint.pages[None] = [withdrawn, no_metadata]
+    stats = harvest(
+        "cs", store=store, client=client, base_url=endpoint.url, with_index=False
+    )
+
+    assert stats.deleted == 1
+    assert stats.skipped == 1
+    assert store.get_paper("2503.00002") is None
+    assert len(store) == 2
+    # gone from the full-text index too
+    assert "2503.00002" not in [p["id"] for p in store.search("attention", limit=10)]
+
+
+def test_harvest_no_records(endpoint, store, client):
+    endpoint.error = "noRecordsMatch"
+    stats = harvest(
+        "cs", store=store, client=client, base_url=endpoint.url, with_index=False
+    )
+    assert stats.upserted == 0
+    assert store.get_state("harvest:cs") == "2025-03-05"
+
+
+def test_harvest_error_keeps_watermark(endpoint, store, client):
+    store.set_state("harvest:cs", "2025-01-01")
+    endpoint.error = "badArgument"
+    with pytest.raises(HarvestError):
+        harvest("cs", store=store, client=client, base_url=endpoint.url)
+    assert store.get_state("harvest:cs") == "2025-01-01"
@@ -0,0 +1,71 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from askademic.http_client import HttpClient, RateLimiter, get_http_client
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(min_interval=0.05)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait()
+    assert time.monotonic() - start >= 0.1
+
+
+def _response(status_code: int, headers: dict | None = None):
+    res = MagicMock()
+    res.status_code = status_code
+    res.ok = status_code == 200
+    res.headers = headers or {}
+    return res
+
+
+def test_retries_on_503_with_retry_after():
+    client = HttpClient(min_interval=0)
+    with (
+        patch.object(
+            client._session,
+            "get",
+            side_effect=[_response(503, {"Retry-After": "0"}), _response(200)],
+        ) as mock_get,
+        patch("askademic.http_client.time.sleep") as mock_sleep,
+    ):
+        res = client.get("http://example.com")
+    assert res.ok
+    assert mock_get.call_count == 2
+    mock_sleep.assert_called_once_with(0)
+
+
+def test_gives_up_after_max_retries():
+    client = HttpClient(min_interval=0, max_retries=2, retry_delay=0)
+    with patch.object(
+        client._session,
+        "get",
+        side_effect=requests.exceptions.ConnectionError,
+    ) as mock_get:
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client.get("http://example.com")
+    assert mock_get.call_count == 3
+
+
+def test_shared_client_is_created_once_across_threads():
+    created = []
+
+    def slow_client():
+        time.sleep(0.05)
+        created.append(MagicMock())
+        return created[-1]
+
+    with (
+        patch("askademic.http_client._http_client", None),
+        patch("askademic.http_client.HttpClient", side_effect=slow_client),
+        ThreadPoolExecutor(max_workers=4) as executor,
+    ):
+        clients = list(executor.map(lambda _: get_http_client(), range(4)))
+
+    assert len(created) == 1
+    assert all(client is created[0] for client in clients)
@@ -0,0 +1,88 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from askademic.ingest import ingest_snapshot, parse_snapshot_record
+from askademic.store import MetadataStore
+from askademic.vector_index import VectorIndex
+
+FIXTURE = Path(__file__).parent / "fixtures" / "arxiv-metadata-sample.jsonl"
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = MetadataStore(path=tmp_path / "metadata.db")
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def index(tmp_path):
+    return VectorIndex(path=tmp_path / "index")
+
+
+def test_parse_snapshot_record():
+    line = FIXTURE.read_bytes().splitlines()[2]
+    paper = parse_snapshot_record(line)
+    assert paper["id"] == "1706.03762"
+    assert paper["title"] == "Attention Is All You Need"
+    assert paper["published"] == "2017-06-12"
+    assert paper["updated"] == "2023-08-02"
+    assert paper["categories"] == "cs.CL cs.LG"
+    assert not paper["abstract"].startswith(" ")
+
+
+def test_parse_invalid_record():
+    assert parse_snapshot_record(b"not json") is None
+    assert parse_snapshot_record(b'{"id": "1234.5678"}') is None
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_ingest_snapshot(store, index, workers):
+    stats = ingest_snapshot(
+        FIXTURE, store=store, index=index, batch_size=2, workers=workers
+    )
+
+    assert stats.rows == 6
+    assert stats.skipped == 1
+    assert stats.rows_per_second > 0
+    assert len(store) == 6
+    assert len(index) == 6
+    assert store.get_paper("hep-th/9711200")["published"] == "1997-11-27"
+    assert store.search("variational inference")[0]["id"] == "1312.6114"
+    assert index.search("stochastic optimization adaptive moments", k=1)[0][0][0] == (
+        "1412.6980"
+    )
+
+
+def test_ingest_is_resumable(store, index):
+    original_upsert = store.upsert_papers
+    calls = []
+
+    def failing_upsert(papers, state=None):
+        calls.append(papers)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        original_upsert(papers, state)
+
+    with patch.object(store, "upsert_papers", side_effect=failing_upsert):
+        with pytest.raises(KeyboardInterrupt):
+            ingest_snapshot(FIXTURE, store=store, index=index, batch_size=2, workers=1)
+    assert len(store) == 2
+
+    stats = ingest_snapshot(FIXTURE, store=store, index=index, batch_size=2, workers=1)
+    assert stats.resumed_from > 0
+    assert stats.rows == 4
+    assert len(store) == 6
+    # vectors written before the interruption are not duplicated
+    assert len(index) == 6
+
+    # nothing left to ingest
+    assert ingest_snapshot(FIXTURE, store=store, index=index, workers=1).rows == 0
+
+
+def test_ingest_without_index(store, tmp_path):
+    stats = ingest_snapshot(FIXTURE, store=store, with_index=False, workers=1)
+    assert stats.rows == 6
+    assert not (tmp_path / "index").exists()
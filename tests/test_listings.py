@@ -0,0 +1,197 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from askademic.listings import (
+    ListingStore,
+    days_between,
+    fetch_listings,
+    iter_listing_pages,
+    load_listings,
+    stream_listing,
+)
+from askademic.tools import retrieve_recent_articles
+
+
+def make_feed(articles: list[tuple[str, str]]) -> bytes:
+    """An arXiv API Atom feed with (arXiv ID, published day) entries."""
+    entries = "".join(
+        f"""
+        <entry>
+            <id>http://arxiv.org/abs/{arxiv_id}v1</id>
+            <updated>{day}T10:00:00Z</updated>
+            <published>{day}T10:00:00Z</published>
+            <title>Title of {arxiv_id}</title>
+            <summary>Abstract of {arxiv_id}</summary>
+        </entry>"""
+        for arxiv_id, day in articles
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        + f'<feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'
+    ).encode()
+
+
+def make_client(articles: list[tuple[str, str]]) -> MagicMock:
+    client = MagicMock()
+    client.get.return_value = MagicMock(ok=True, content=make_feed(articles))
+    return client
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ListingStore(tmp_path / "listings.db")
+    yield store
+    store.close()
+
+
+def test_days_between():
+    assert days_between("2025-02-27", "2025-03-01") == [
+        "2025-02-27",
+        "2025-02-28",
+        "2025-03-01",
+    ]
+    assert days_between("2025-03-01", "2025-03-01") == ["2025-03-01"]
+
+
+def test_store_closed_and_open_days(store):
+    store.put("cs.AI", "2025-03-28", [{"id": "2503.00001"}], closed=True)
+    store.put("cs.AI", "2025-03-29", [{"id": "2503.00002"}], closed=False)
+
+    assert store.get("cs.AI", "2025-03-28") == [{"id": "2503.00001"}]
+    assert store.get("cs.AI", "2025-03-29") == [{"id": "2503.00002"}]
+    assert store.get("cs.CL", "2025-03-28") is None
+
+    # after the next announcement, only the closed day is still valid
+    later = datetime.now(timezone.utc) + timedelta(days=7)
+    assert store.get_range("cs.AI", "2025-03-28", "2025-03-29", now=later) == {
+        "2025-03-28": [{"id": "2503.00001"}]
+    }
+
+
+def test_fetch_listings():
+    client = make_client([("2503.00002", "2025-03-29"), ("2503.00001", "2025-03-28")])
+    listings = fetch_listings("cs.AI", "2025-03-28", "2025-03-29", client=client)
+
+    assert [a["id"] for a in listings["2025-03-28"]] == ["2503.00001"]
+    assert listings["2025-03-29"][0]["abstract"] == "Abstract of 2503.00002"
+
+    params = client.get.call_args.kwargs["params"]
+    assert (
+        params["search_query"]
+        == "cat:cs.AI AND submittedDate:[202503280000 TO 202503292359]"
+    )
+
+
+def test_fetch_listings_error():
+    client = MagicMock()
+    client.get.return_value = MagicMock(ok=False, status_code=500)
+    assert fetch_listings("cs.AI", "2025-03-28", "2025-03-29", client=client) is None
+
+
+def test_load_listings_fetches_missing_days_once(store):
+    client = make_client(
+        [
+            ("2503.00003", "2025-03-29"),
+            ("2503.00002", "2025-03-28"),
+            ("2503.00001", "2025-03-27"),
+        ]
+    )
+    listings = load_listings(
+        "cs.AI", "2025-03-27", "2025-03-29", store=store, client=client
+    )
+    assert list(listings) == ["2025-03-27", "2025-03-28", "2025-03-29"]
+    assert client.get.call_count == 1
+
+    # stored: no more requests
+    again = load_listings(
+        "cs.AI", "2025-03-27", "2025-03-29", store=store, client=client
+    )
+    assert again == listings
+    assert client.get.call_count == 1
+
+    # the latest day is open, the others closed
+    later = datetime.now(timezone.utc) + timedelta(days=7)
+    assert list(store.get_range("cs.AI", "2025-03-27", "2025-03-29", now=later)) == [
+        "2025-03-27",
+        "2025-03-28",
+    ]
+
+
+def test_load_listings_skips_days_not_announced(store):
+    client = make_client([("2503.00001", "2025-03-28")])
+    listings = load_listings(
+        "cs.AI",
+        "2025-03-28",
+        "2025-03-30",
+        latest_day="2025-03-28",
+        store=store,
+        client=client,
+    )
+    assert list(listings) == ["2025-03-28"]
+    assert store.get("cs.AI", "2025-03-29") is None
+
+
+def test_iter_listing_pages_follows_pages():
+    client = MagicMock()
+    client.get.side_effect = [
+        MagicMock(ok=True, content=make_feed([("2503.00003", "2025-03-28")] * 2)),
+        MagicMock(ok=True, content=make_feed([("2503.00001", "2025-03-28")])),
+    ]
+    pages = list(
+        iter_listing_pages(
+            "cs.AI", "2025-03-28", "2025-03-28", page_size=2, client=client
+        )
+    )
+    assert [len(page) for page in pages] == [2, 1]
+    assert [c.kwargs["params"]["start"] for c in client.get.call_args_list] == [0, 2]
+
+
+def test_stream_listing_stores_complete_listing(store):
+    client = MagicMock()
+    client.get.side_effect = [
+        MagicMock(ok=True, content=make_feed([("2503.00003", "2025-03-28")] * 2)),
+        MagicMock(ok=True, content=make_feed([("2503.00001", "2025-03-28")])),
+    ]
+    pages = stream_listing(
+        "cs.AI", "2025-03-28", page_size=2, store=store, client=client
+    )
+    assert len(next(pages)) == 2
+    # not stored until complete
+    assert store.get("cs.AI", "2025-03-28") is None
+    assert len(next(pages)) == 1
+    assert next(pages, None) is None
+    assert len(store.get("cs.AI", "2025-03-28")) == 3
+
+    # stored: one page, no more requests
+    assert [len(p) for p in stream_listing("cs.AI", "2025-03-28", store=store)] == [3]
+    assert client.get.call_count == 2
+
+
+def test_stream_listing_error_stores_nothing(store):
+    client = MagicMock()
+    client.get.side_effect = [
+        MagicMock(ok=True, content=make_feed([("2503.00003", "2025-03-28")] * 2)),
+        MagicMock(ok=False, status_code=500),
+    ]
+    pages = list(
+        stream_listing("cs.AI", "2025-03-28", page_size=2, store=store, client=client)
+    )
+    assert [len(p) for p in pages] == [2]
+    assert store.get("cs.AI", "2025-03-28") is None
+
+
+@patch("askademic.tools.load_listings")
+def test_retrieve_recent_articles(mock_load_listings):
+    mock_load_listings.return_value = {
+        "2025-03-29": [{"abstract": "First"}, {"abstract": "Second"}]
+    }
+    assert retrieve_recent_articles("cs.AI", "2025-03-29") == ["First", "Second"]
+    mock_load_listings.assert_called_once_with(
+        "cs.AI", "2025-03-29", "2025-03-29", latest_day="2025-03-29"
+    )
+
+    mock_load_listings.return_value = {}
+    assert retrieve_recent_articles("cs.AI", "2025-03-29") == "No articles found"
+    assert retrieve_recent_articles("cs.AI", "Not Found") == "No articles found"
@@ -0,0 +1,242 @@
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from pydantic import BaseModel
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    ModelMessagesTypeAdapter,
+    ModelResponse,
+    TextPart,
+    ToolCallPart,
+)
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+
+from askademic.llm_cache import CachedModel, LLMCache, cached_model
+
+# only deterministic requests are cached
+DETERMINISTIC = {"temperature": 0}
+
+
+class Answer(BaseModel):
+    answer: str
+
+
+def make_model(calls: list):
+    """A model answering with a structured output, recording its calls."""
+
+    def respond(messages, info: AgentInfo) -> ModelResponse:
+        calls.append(messages)
+        return ModelResponse(
+            parts=[
+                ToolCallPart(
+                    info.output_tools[0].name,
+                    {"answer": f"answer {len(calls)}"},
+                )
+            ]
+        )
+
+    async def stream(messages, info: AgentInfo):
+        calls.append(messages)
+        args = json.dumps({"answer": f"answer {len(calls)}"})
+        yield {0: DeltaToolCall(name=info.output_tools[0].name)}
+        for start in range(0, len(args), 4):
+            end = start + 4
+            yield {0: DeltaToolCall(json_args=args[start:end])}
+
+    return FunctionModel(respond, stream_function=stream)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(path=tmp_path / "llm.db")
+    yield cache
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_repeated_request_is_answered_from_cache(cache):
+    calls = []
+    agent = Agent(
+        model=CachedModel(make_model(calls), cache=cache),
+        system_prompt="Answer.",
+        output_type=Answer,
+        model_settings=DETERMINISTIC,
+    )
+
+    first = await agent.run("What is a transformer?")
+    second = await agent.run("What is a transformer?")
+
+    assert len(calls) == 1
+    assert second.output == first.output == Answer(answer="answer 1")
+    assert second.usage().total_tokens == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_cache_is_keyed_by_prompt_settings_and_output_schema(cache):
+    calls = []
+    model = CachedModel(make_model(calls), cache=cache)
+
+    def agent(system_prompt="Answer.", output_type=Answer, **settings):
+        return Agent(
+            model=model,
+            system_prompt=system_prompt,
+            output_type=output_type,
+            model_settings={**DETERMINISTIC, **settings},
+        )
+
+    await agent().run("a")
+    await agent().run("b")
+    await agent(system_prompt="Reply.").run("a")
+    await agent(max_tokens=100).run("a")
+
+    class Other(BaseModel):
+        answer: str
+        confidence: float = 1.0
+
+    await agent(output_type=Other).run("a")
+
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("model_settings", [{"temperature": 0.7}, {}, None])
+async def test_non_deterministic_request_is_not_cached(cache, model_settings):
+    calls = []
+    agent = Agent(
+        model=CachedModel(make_model(calls), cache=cache),
+        output_type=Answer,
+        model_settings=model_settings,
+    )
+
+    await agent.run("a")
+    await agent.run("a")
+
+    # without a temperature, the provider's default, not 0, applies
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+async def collect(events: list, ctx, stream):
+    async for event in stream:
+        events.append(event)
+
+
+@pytest.mark.asyncio
+async def test_streamed_request_is_cached_once_streamed(cache):
+    calls, events = [], []
+    agent = Agent(
+        model=CachedModel(make_model(calls), cache=cache),
+        output_type=Answer,
+        model_settings=DETERMINISTIC,
+    )
+
+    def handle(ctx, stream):
+        return collect(events, ctx, stream)
+
+    first = await agent.run("a", event_stream_handler=handle)
+    n_events = len(events)
+    second = await agent.run("a", event_stream_handler=handle)
+
+    # the orchestrator streams its runs, they must reach the cache as well
+    assert len(calls) == 1
+    assert len(cache) == 1
+    assert second.output == first.output == Answer(answer="answer 1")
+    assert second.usage().input_tokens == 0
+    # the cached response is streamed back to the handler
+    assert len(events) > n_events
+    # and found by a run that does not stream
+    assert (await agent.run("a")).output == first.output
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_non_deterministic_streamed_request_is_not_cached(cache):
+    calls, events = [], []
+    agent = Agent(
+        model=CachedModel(make_model(calls), cache=cache),
+        output_type=Answer,
+        model_settings={"temperature": 0.7},
+    )
+
+    def handle(ctx, stream):
+        return collect(events, ctx, stream)
+
+    await agent.run("a", event_stream_handler=handle)
+    await agent.run("a", event_stream_handler=handle)
+
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_persists(tmp_path):
+    calls = []
+    cache = LLMCache(path=tmp_path / "llm.db")
+    agent = Agent(
+        model=CachedModel(make_model(calls), cache=cache),
+        output_type=Answer,
+        model_settings=DETERMINISTIC,
+    )
+    await agent.run("a")
+    cache.close()
+
+    cache = LLMCache(path=tmp_path / "llm.db")
+    agent = Agent(
+        model=CachedModel(make_model(calls), cache=cache),
+        output_type=Answer,
+        model_settings=DETERMINISTIC,
+    )
+    result = await agent.run("a")
+    cache.close()
+
+    assert len(calls) == 1
+    assert result.output == Answer(answer="answer 1")
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_not_served(tmp_path):
+    calls = []
+    cache = LLMCache(path=tmp_path / "llm.db", ttl=60)
+    agent = Agent(
+        model=CachedModel(make_model(calls), cache=cache),
+        output_type=Answer,
+        model_settings=DETERMINISTIC,
+    )
+
+    await agent.run("a")
+    with patch("askademic.llm_cache.time.time", return_value=time.time() + 120):
+        await agent.run("a")
+    cache.close()
+
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    response = ModelResponse(parts=[TextPart("x" * 300)])
+    size = len(ModelMessagesTypeAdapter.dump_json([response]))
+    cache._max_bytes = int(2.5 * size)
+
+    cache.put("a", "test", response)
+    cache.put("b", "test", response)
+    cache.get("a")
+    cache.put("c", "test", response)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_cached_model_opt_out():
+    model = cached_model("google-gla:gemini-2.0-flash")
+    assert isinstance(model, CachedModel)
+    assert cached_model(model) is model
+    assert cached_model(model, enabled=False) == "google-gla:gemini-2.0-flash"
+
+    with patch.dict(os.environ, {"ASKADEMIC_LLM_CACHE": "0"}):
+        assert cached_model("google-gla:gemini-2.0-flash") == (
+            "google-gla:gemini-2.0-flash"
+        )
@@ -0,0 +1,140 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from pydantic_ai.messages import ModelResponse, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+from askademic.general import GeneralAgent, general_agent_base
+from askademic.llm_cache import LLMCache
+from askademic.orchestrator import Context, orchestrator_agent_base
+from askademic.question import QuestionAgent
+from askademic.registry import AgentRegistry
+
+
+def make_model(name: str, tool: str | None = None):
+    """A model calling a tool once, if given, then answering with its name."""
+
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        called = any(
+            isinstance(part, ToolReturnPart)
+            for message in messages
+            for part in message.parts
+        )
+        if tool and not called:
+            return ModelResponse(parts=[ToolCallPart(tool, {"question": "q"})])
+        # let the other run interleave
+        await asyncio.sleep(0.01)
+        output = {"response": name}
+        if tool:
+            output = {"type": "general", "response": {"response": name}}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, output)])
+
+    return FunctionModel(respond, model_name=name)
+
+
+@pytest.mark.asyncio
+async def test_general_agents_with_different_models_run_concurrently():
+    agent_a = GeneralAgent(make_model("a"), use_llm_cache=False)
+    agent_b = GeneralAgent(make_model("b"), {"max_tokens": 10}, use_llm_cache=False)
+
+    response_a, response_b = await asyncio.gather(agent_a("a?"), agent_b("b?"))
+
+    assert response_a.response == "a"
+    assert response_b.response == "b"
+    # the shared agent is not reconfigured
+    assert general_agent_base.model is None
+
+
+@pytest.mark.asyncio
+async def test_sub_agents_use_the_model_of_their_run():
+    model_a = make_model("a", tool="answer_question")
+    model_b = make_model("b", tool="answer_question")
+    registry = MagicMock()
+    registry.get.return_value = AsyncMock(return_value=["answer"])
+
+    with patch("askademic.orchestrator.get_agent_registry", return_value=registry):
+        result_a, result_b = await asyncio.gather(
+            orchestrator_agent_base.run(
+                "a?",
+                model=model_a,
+                deps=Context(model=model_a, model_settings={"max_tokens": 1}),
+            ),
+            orchestrator_agent_base.run(
+                "b?",
+                model=model_b,
+                deps=Context(model=model_b, model_settings={"max_tokens": 2}),
+            ),
+        )
+
+    assert result_a.output.response.response == "a"
+    assert result_b.output.response.response == "b"
+    calls = [c.args for c in registry.get.call_args_list]
+    assert sorted(calls, key=lambda c: c[2]["max_tokens"]) == [
+        (QuestionAgent, model_a, {"max_tokens": 1}),
+        (QuestionAgent, model_b, {"max_tokens": 2}),
+    ]
+    assert orchestrator_agent_base.model is None
+
+
+@pytest.mark.asyncio
+async def test_sub_agents_default_to_the_orchestrator_model():
+    model = make_model("a", tool="answer_question")
+    registry = MagicMock()
+    registry.get.return_value = AsyncMock(return_value=["answer"])
+
+    with patch("askademic.orchestrator.get_agent_registry", return_value=registry):
+        await orchestrator_agent_base.run("a?", model=model)
+
+    assert registry.get.call_args.args == (QuestionAgent, model, None)
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_cached_with_the_settings_of_the_run(tmp_path):
+    summary_calls = []
+
+    async def summarise(messages, info: AgentInfo) -> ModelResponse:
+        summary_calls.append(messages)
+        output = {"summary": "Summary of cs.AI articles."}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, output)])
+
+    async def orchestrate(messages, info: AgentInfo) -> ModelResponse:
+        called = any(
+            isinstance(part, ToolReturnPart)
+            for message in messages
+            for part in message.parts
+        )
+        if not called:
+            return ModelResponse(
+                parts=[
+                    ToolCallPart(
+                        "summarise_latest_articles",
+                        {"request": "get me the latest papers in AI"},
+                    )
+                ]
+            )
+        output = {"type": "general", "response": {"response": "done"}}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, output)])
+
+    summary_model = FunctionModel(summarise, model_name="summary")
+    cache = LLMCache(path=tmp_path / "llm.db")
+    with (
+        patch(
+            "askademic.orchestrator.get_agent_registry", return_value=AgentRegistry()
+        ),
+        patch("askademic.orchestrator.get_digest_store", return_value=None),
+        patch("askademic.llm_cache.get_llm_cache", return_value=cache),
+        patch("askademic.summary.identify_latest_day", return_value="2025-03-29"),
+        patch("askademic.summary.retrieve_recent_articles", return_value=["abstract"]),
+        patch.dict("os.environ", {"ASKADEMIC_LLM_CACHE": "1"}),
+    ):
+        for _ in range(2):
+            await orchestrator_agent_base.run(
+                "What is new in AI?",
+                model=FunctionModel(orchestrate),
+                deps=Context(model=summary_model, model_settings={"temperature": 0}),
+            )
+    cache.close()
+
+    # the summary agents get the settings of the run, so their calls are cached
+    assert len(summary_calls) == 1
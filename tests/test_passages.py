@@ -0,0 +1,136 @@
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from askademic import passages
+from askademic.passages import (
+    BM25Index,
+    chunk_text,
+    get_passage_index,
+    search_article_passages,
+)
+from askademic.tokens import count_tokens
+
+ARTICLE = (
+    '<article url="https://arxiv.org/pdf/1706.03762.pdf">\n'
+    + "Introduction. Recurrent neural networks have been the state of the art. " * 20
+    + "The Transformer relies entirely on self-attention to compute representations. "
+    + "Training took 3.5 days on eight GPUs. " * 5
+    + "\n</article>"
+)
+
+
+@pytest.fixture
+def temp_cache_dir():
+    temp_dir = tempfile.mkdtemp()
+    with patch("askademic.passages.get_cache_path", return_value=Path(temp_dir)):
+        yield temp_dir
+    shutil.rmtree(temp_dir)
+    passages._indexes.clear()
+
+
+def test_chunk_text_overlaps_and_covers_text():
+    text = " ".join(f"word{i}" for i in range(500))
+    chunks = chunk_text(text, passage_size=200, overlap=50)
+
+    assert chunks[0][0] == 0
+    assert chunks[-1][1].endswith("word499")
+    for (offset, passage), (next_offset, _) in zip(chunks, chunks[1:]):
+        assert text[offset:].startswith(passage)
+        # consecutive passages overlap
+        assert next_offset < offset + len(passage)
+        # and do not start mid-word
+        assert text[next_offset - 1] == " "
+
+
+def test_bm25_ranks_relevant_passage_first():
+    index = BM25Index(
+        [0, 100, 200],
+        [
+            "lyapunov exponents of chaotic systems",
+            "self-attention in the transformer architecture",
+            "training on eight GPUs",
+        ],
+    )
+    results = index.search("how does self-attention work in the transformer?")
+    assert results[0][0] == 100
+    assert len(results) == 1
+
+
+def test_bm25_no_match():
+    index = BM25Index([0], ["lyapunov exponents"])
+    assert index.search("transformer") == []
+
+
+def test_search_article_passages(temp_cache_dir):
+    url = "https://arxiv.org/pdf/1706.03762.pdf"
+    with patch("askademic.passages.get_article", return_value=ARTICLE):
+        result = json.loads(search_article_passages(url, "self-attention", top_k=2))
+
+    assert len(result) <= 2
+    assert "self-attention" in result[0]["passage"]
+    assert {"offset", "score", "passage"} == set(result[0])
+
+
+def test_search_article_passages_fits_max_tokens(temp_cache_dir):
+    url = "https://arxiv.org/pdf/1706.03762.pdf"
+    with patch("askademic.passages.get_article", return_value=ARTICLE):
+        full = json.loads(search_article_passages(url, "transformer training", top_k=5))
+        fitted = search_article_passages(
+            url, "transformer training", top_k=5, max_tokens=150
+        )
+        clipped = search_article_passages(
+            url, "transformer training", top_k=5, max_tokens=30
+        )
+
+    assert len(full) > 1
+    assert count_tokens(fitted) <= 150
+    # the best passages are kept whole, the worst dropped
+    assert 0 < len(json.loads(fitted)) < len(full)
+    assert json.loads(fitted)[0] == full[0]
+    assert count_tokens(clipped) <= 30
+    assert json.loads(clipped)[0]["passage"].endswith("...")
+
+
+def test_passage_index_is_built_once(temp_cache_dir):
+    url = "https://arxiv.org/pdf/1706.03762.pdf"
+    with patch("askademic.passages.get_article", return_value=ARTICLE) as mock_get:
+        first = get_passage_index(url)
+        second = get_passage_index(url)
+        assert first is second
+        assert mock_get.call_count == 1
+
+        # a new process (empty in-memory cache) loads the index from disk
+        passages._indexes.clear()
+        third = get_passage_index(url)
+        assert mock_get.call_count == 1
+        assert third.passages == first.passages
+
+
+@pytest.mark.parametrize("text", ["Article Not Found", ""])
+def test_failed_article_is_not_cached(temp_cache_dir, text):
+    url = "https://arxiv.org/pdf/0000.00000.pdf"
+    failed = f'<article url="{url}">\n{text}\n</article>'
+    with patch("askademic.passages.get_article", return_value=failed) as mock_get:
+        get_passage_index(url)
+        get_passage_index(url)
+        assert mock_get.call_count == 2
+    assert list(Path(temp_cache_dir).iterdir()) == []
+
+
+def test_passage_index_expires_with_the_article(temp_cache_dir):
+    url = "https://arxiv.org/pdf/1706.03762.pdf"
+    with patch("askademic.passages.get_article", return_value=ARTICLE) as mock_get:
+        get_passage_index(url)
+        passages._indexes.clear()
+        later = datetime.now() + timedelta(days=8)
+        with patch("askademic.passages.datetime") as mock_datetime:
+            mock_datetime.now.return_value = later
+            mock_datetime.fromisoformat = datetime.fromisoformat
+            get_passage_index(url)
+        assert mock_get.call_count == 2
@@ -1,6 +1,6 @@
 import asyncio
 import os
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 from pydantic_ai.agent import AgentRunResult
@@ -142,3 +142,55 @@ def test_fetch_article_tool():
     assert question_agent._agent._function_toolset is not None
     tool_names = list(question_agent._agent._function_toolset.tools)
     assert "fetch_article" in tool_names
+
+
+def test_search_article_tool():
+    """Test that the search_article tool is properly registered."""
+    question_agent = QuestionAgent("google-gla:gemini-2.0-flash")
+
+    tools = question_agent._agent._function_toolset.tools
+    assert "search_article" in tools
+    json_schema = tools["search_article"].function_schema.json_schema
+    assert {"link", "query"} <= set(json_schema.get("properties", {}))
+
+
+@pytest.mark.asyncio
+async def test_fetched_articles_share_the_turn_budget():
+    """Each article fetched in a run is sized to what is left of the budget."""
+    from pydantic_ai.messages import ModelResponse, ToolCallPart
+    from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+    calls = []
+
+    def respond(messages, info: AgentInfo) -> ModelResponse:
+        calls.append(messages)
+        if len(calls) <= 2:
+            return ModelResponse(
+                parts=[
+                    ToolCallPart("fetch_article", {"link": f"2401.0000{len(calls)}"})
+                ]
+            )
+        return ModelResponse(
+            parts=[
+                ToolCallPart(
+                    info.output_tools[0].name, {"response": "A", "article_list": []}
+                )
+            ]
+        )
+
+    question_agent = QuestionAgent(FunctionModel(respond), use_llm_cache=False)
+    question_agent._turn_tokens = 4000
+
+    with (
+        patch("askademic.question.get_article") as mock_get_article,
+        patch("askademic.tokens._get_encoding", return_value=None),
+    ):
+        mock_get_article.side_effect = lambda link, use_cache, max_tokens: "x" * (
+            4 * max_tokens
+        )
+        await question_agent.run("What do these articles say?")
+
+    assert [c.kwargs["max_tokens"] for c in mock_get_article.call_args_list] == [
+        2000,
+        1000,
+    ]
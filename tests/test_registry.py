@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock
+
+from pydantic_ai.models.test import TestModel
+
+from askademic.llm_cache import CachedModel
+from askademic.registry import AgentRegistry
+
+
+def test_agent_is_built_once_per_model_and_settings():
+    registry = AgentRegistry()
+    agent_class = MagicMock(side_effect=lambda *args, **kwargs: object())
+    agent_class.__name__ = "FakeAgent"
+
+    first = registry.get(agent_class, "test", {"temperature": 0})
+    second = registry.get(agent_class, "test", {"temperature": 0})
+    other_settings = registry.get(agent_class, "test", {"max_tokens": 10})
+    other_model = registry.get(agent_class, "google-gla:gemini-2.0-flash")
+    other_options = registry.get(agent_class, "test", {"temperature": 0}, a=1)
+
+    assert first is second
+    assert len({id(first), id(other_settings), id(other_model), id(other_options)}) == 4
+    assert agent_class.call_count == 4
+    assert len(registry) == 4
+
+
+def test_model_names_are_resolved_to_a_shared_model():
+    registry = AgentRegistry()
+
+    model = registry.model("google-gla:gemini-2.0-flash")
+
+    assert isinstance(model, CachedModel)
+    assert registry.model("google-gla:gemini-2.0-flash") is model
+    test_model = TestModel()
+    assert registry.model(test_model) is test_model
+
+
+def test_agents_share_the_model():
+    registry = AgentRegistry()
+    agent_class = MagicMock()
+    agent_class.__name__ = "FakeAgent"
+
+    registry.get(agent_class, "test")
+    registry.get(agent_class, "test", {"temperature": 0})
+
+    models = [c.args[0] for c in agent_class.call_args_list]
+    assert models[0] is models[1]
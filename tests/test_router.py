@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from askademic.article import ArticleAgent, ArticleResponse, article_to_read
+from askademic.router import article_exchange, route_to_article
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "request_",
+    [
+        "What is attention?",
+        "Compare 1706.03762 and 1810.04805",
+        "find papers similar to 1706.03762",
+        "latest papers citing 1706.03762",
+        "summarise cs.LG since 1706.03762",
+    ],
+)
+async def test_requests_not_about_one_article_are_not_routed(request_):
+    with patch("askademic.router.prefetch_article") as mock_prefetch:
+        assert await route_to_article(request_, "test") is None
+    mock_prefetch.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "request_,expected",
+    [
+        ("1706.03762", "1706.03762"),
+        ("https://arxiv.org/abs/1706.03762v5", "1706.03762"),
+        ("Summarise 1706.03762", "1706.03762"),
+        ("What does 1706.03762 say about positional encodings?", "1706.03762"),
+        ("1706.03762 and positional encodings", None),
+        ("What are the papers related to 1706.03762?", None),
+    ],
+)
+def test_article_to_read(request_, expected):
+    assert article_to_read(request_) == expected
+
+
+@pytest.mark.asyncio
+async def test_request_about_one_article_goes_to_the_article_agent():
+    article_agent = MagicMock()
+    article_agent.read = AsyncMock(return_value="result")
+    registry = MagicMock()
+    registry.get.return_value = article_agent
+    fetch = MagicMock()
+
+    with (
+        patch("askademic.router.get_agent_registry", return_value=registry),
+        patch("askademic.router.prefetch_article", return_value=fetch) as prefetch,
+    ):
+        result = await route_to_article(
+            "Explain https://arxiv.org/abs/1706.03762", "test", {"temperature": 0}
+        )
+
+    assert result == "result"
+    prefetch.assert_called_once_with("1706.03762")
+    registry.get.assert_called_once_with(
+        ArticleAgent, "test", {"temperature": 0}, use_cache=True
+    )
+    article_agent.read.assert_called_once_with(
+        "Explain https://arxiv.org/abs/1706.03762", "1706.03762", fetch
+    )
+
+
+def test_article_exchange_leaves_the_article_out():
+    response = ArticleResponse(
+        response="It introduces the transformer.",
+        article_title="Attention Is All You Need",
+        article_link="https://arxiv.org/pdf/1706.03762.pdf",
+    )
+
+    request, answer = article_exchange("Explain 1706.03762", response)
+
+    assert request.parts[0].content == "Explain 1706.03762"
+    assert ArticleResponse.model_validate_json(answer.parts[0].content) == response
@@ -0,0 +1,128 @@
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+
+from askademic.allower import AllowResponse
+from askademic.speculation import (
+    SpeculationStats,
+    allow_then_orchestrate,
+    speculation_enabled,
+)
+
+
+def make_allow(is_scientific: bool, events: list, delay: float = 0.05):
+    async def allow():
+        events.append("allow started")
+        await asyncio.sleep(delay)
+        events.append("allow done")
+        return AllowResponse(is_scientific=is_scientific, pun="")
+
+    return allow
+
+
+def make_orchestrate(events: list, delay: float = 0.1):
+    async def orchestrate(usage):
+        events.append("orchestrate started")
+        usage.input_tokens += 100
+        await asyncio.sleep(delay)
+        usage.output_tokens += 10
+        events.append("orchestrate done")
+        return "answer"
+
+    return orchestrate
+
+
+@pytest.mark.asyncio
+async def test_not_speculative_waits_for_the_allower():
+    events = []
+
+    allowed, result = await allow_then_orchestrate(
+        make_allow(True, events), make_orchestrate(events)
+    )
+
+    assert allowed.is_scientific
+    assert result == "answer"
+    assert events.index("allow done") < events.index("orchestrate started")
+
+
+@pytest.mark.asyncio
+async def test_speculative_starts_the_orchestrator_with_the_allower():
+    events, stats = [], SpeculationStats()
+
+    allowed, result = await allow_then_orchestrate(
+        make_allow(True, events), make_orchestrate(events), True, stats
+    )
+
+    assert result == "answer"
+    assert events.index("orchestrate started") < events.index("allow done")
+    assert (stats.started, stats.discarded, stats.tokens) == (1, 0, 110)
+    assert stats.waste_ratio == 0
+
+
+@pytest.mark.asyncio
+async def test_speculative_run_is_discarded_when_rejected():
+    events, stats = [], SpeculationStats()
+
+    allowed, result = await allow_then_orchestrate(
+        make_allow(False, events), make_orchestrate(events), True, stats
+    )
+    await asyncio.sleep(0.1)
+
+    assert not allowed.is_scientific
+    assert result is None
+    assert "orchestrate done" not in events
+    assert (stats.started, stats.discarded) == (1, 1)
+    assert stats.wasted_tokens == stats.tokens == 100
+    assert stats.waste_ratio == 1
+
+
+@pytest.mark.asyncio
+async def test_speculative_run_is_discarded_when_the_allower_fails():
+    events = []
+
+    async def allow():
+        raise RuntimeError("allower failed")
+
+    with pytest.raises(RuntimeError):
+        await allow_then_orchestrate(allow, make_orchestrate(events), True)
+    await asyncio.sleep(0.15)
+
+    assert "orchestrate done" not in events
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("speculative", [False, True])
+async def test_on_allowed_is_called_before_waiting_for_the_orchestrator(speculative):
+    events = []
+
+    await allow_then_orchestrate(
+        make_allow(True, events),
+        make_orchestrate(events),
+        speculative,
+        on_allowed=lambda: events.append("allowed"),
+    )
+    await allow_then_orchestrate(
+        make_allow(False, events),
+        make_orchestrate(events),
+        speculative,
+        on_allowed=lambda: events.append("rejected but called"),
+    )
+
+    assert events.index("allowed") < events.index("orchestrate done")
+    assert "rejected but called" not in events
+
+
+def test_waste_ratio():
+    stats = SpeculationStats(started=4, discarded=1, tokens=1000, wasted_tokens=50)
+    assert stats.waste_ratio == 0.25
+    assert stats.wasted_token_ratio == 0.05
+    assert SpeculationStats().waste_ratio == 0
+
+
+def test_speculation_switch():
+    with patch.dict(os.environ, {"ASKADEMIC_SPECULATIVE": "1"}):
+        assert speculation_enabled()
+    with patch.dict(os.environ, {"ASKADEMIC_SPECULATIVE": "0"}):
+        assert not speculation_enabled()
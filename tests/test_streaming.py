@@ -0,0 +1,129 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from pydantic import BaseModel
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    FunctionToolCallEvent,
+    PartDeltaEvent,
+    PartStartEvent,
+    ToolCallPart,
+    ToolCallPartDelta,
+)
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+from rich.console import Console
+
+from askademic.general import Context, search_papers_by_title_keyword
+from askademic.progress import progress_reporter, report_progress
+from askademic.streaming import StreamRenderer
+
+
+class Answer(BaseModel):
+    response: str
+    sources: list[str]
+
+
+def make_renderer() -> StreamRenderer:
+    return StreamRenderer(Console(file=None, quiet=True))
+
+
+def test_tool_calls_set_the_status():
+    renderer = make_renderer()
+
+    renderer.on_event(FunctionToolCallEvent(ToolCallPart("answer_question", {})))
+    assert renderer.status == "Searching arXiv and reading articles"
+
+    renderer.on_event(FunctionToolCallEvent(ToolCallPart("other_tool", {})))
+    assert renderer.status == "Calling other_tool"
+
+
+def test_partial_output_is_parsed_as_it_streams():
+    renderer = make_renderer()
+
+    renderer.on_event(
+        PartStartEvent(index=0, part=ToolCallPart("final_result", '{"type": "gen'))
+    )
+    assert renderer.output == {"type": "gen"}
+
+    renderer.on_event(
+        PartDeltaEvent(
+            index=0,
+            delta=ToolCallPartDelta(
+                args_delta='eral", "response": {"response": "Atten'
+            ),
+        )
+    )
+    assert renderer.output == {"type": "general", "response": {"response": "Atten"}}
+
+
+def test_other_tool_calls_are_not_taken_for_output():
+    renderer = make_renderer()
+
+    renderer.on_event(
+        PartStartEvent(index=0, part=ToolCallPart("answer_question", '{"quest'))
+    )
+    renderer.on_event(
+        PartDeltaEvent(index=0, delta=ToolCallPartDelta(args_delta='ion": "q"}'))
+    )
+
+    assert renderer.output == {}
+
+
+@pytest.mark.asyncio
+async def test_run_is_rendered_as_it_streams():
+    renderer = make_renderer()
+    seen = []
+
+    async def stream(messages, info: AgentInfo):
+        if len(messages) == 1:
+            yield {0: DeltaToolCall(name="search", json_args='{"query": "attention"}')}
+            return
+        # the name comes with the first chunk only
+        for name, chunk in [
+            ("final_result", '{"response": "Attention'),
+            (None, ' is all", "sources": []}'),
+        ]:
+            yield {0: DeltaToolCall(name=name, json_args=chunk)}
+            await asyncio.sleep(0)
+            seen.append(dict(renderer.output))
+
+    agent = Agent(FunctionModel(stream_function=stream), output_type=Answer)
+
+    @agent.tool_plain
+    def search(query: str) -> str:
+        report_progress(f"Searching arXiv for: {query}")
+        return "results"
+
+    with progress_reporter(renderer.progress):
+        result = await agent.run("?", event_stream_handler=renderer.handle)
+
+    assert result.output == Answer(response="Attention is all", sources=[])
+    assert {"response": "Attention"} in seen
+    assert renderer.output == {"response": "Attention is all", "sources": []}
+    assert renderer.status == "Searching arXiv for: attention"
+
+
+@pytest.mark.asyncio
+async def test_progress_reaches_the_reporter_from_threads():
+    messages = []
+
+    with progress_reporter(messages.append):
+        await asyncio.to_thread(report_progress, "Fetching the PDF")
+    report_progress("not reported")
+
+    assert messages == ["Fetching the PDF"]
+
+
+@pytest.mark.asyncio
+async def test_title_search_of_the_general_agent_is_reported():
+    messages = []
+    ctx = MagicMock(deps=Context())
+
+    with (
+        progress_reporter(messages.append),
+        patch("askademic.general.search_articles_by_title", return_value="[]"),
+    ):
+        await search_papers_by_title_keyword(ctx, "attention is all you need")
+
+    assert messages == ["Searching arXiv for the title: attention is all you need"]
@@ -1,17 +1,21 @@
 import asyncio
 import os
-from unittest.mock import MagicMock
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 from pydantic_ai.agent import AgentRunResult
 
 os.environ["GOOGLE_API_KEY"] = "mock"
 
+from askademic.category_classifier import CategoryClassifier  # noqa: E402
 from askademic.summary import (  # noqa: E402
     Category,
+    ClusteredSummary,
     Summary,
     SummaryAgent,
     SummaryResponse,
+    batch_by_tokens,
 )
 
 testdata = [
@@ -60,6 +64,9 @@ async def test_summary_agent(
     summary_agent = SummaryAgent(model)
     summary_agent._category_agent = MagicMock()
     summary_agent._summary_agent = MagicMock()
+    # not confident locally, so the category agent is asked
+    summary_agent._category_classifier = MagicMock()
+    summary_agent._category_classifier.classify.return_value = None
 
     category_future = asyncio.Future()
     category_future.set_result(
@@ -92,3 +99,279 @@ async def test_summary_agent(
     assert response == summary_response
     assert summary_agent._category_agent.run.called
     assert summary_agent._summary_agent.run.called
+    summary_agent._category_classifier.learn.assert_called_once_with(
+        agent_request, category.category_id
+    )
+
+
+@pytest.mark.asyncio
+async def test_summary_agent_local_category(tmp_path):
+    """The category agent is skipped when the local classifier is confident."""
+    model = "google-gla:gemini-2.0-flash"
+    summary_agent = SummaryAgent(model)
+    summary_agent._category_classifier = CategoryClassifier(
+        decisions_path=tmp_path / "decisions.json"
+    )
+    summary_agent._category_agent = MagicMock()
+    summary_agent._summary_agent = MagicMock()
+
+    summary_future = asyncio.Future()
+    summary_future.set_result(
+        AgentRunResult(
+            output=Summary(summary="Summary of cs.AI articles."),
+            _output_tool_name=None,
+            _state=None,
+            _new_message_index=None,
+            _traceparent_value=None,
+        )
+    )
+    summary_agent._summary_agent.run.return_value = summary_future
+    summary_agent._identify_latest_day = MagicMock(return_value="2025-03-29")
+    summary_agent._retrieve_recent_articles = MagicMock(return_value="")
+
+    response = await summary_agent("get me the latest papers in AI")
+    assert response.category == Category(
+        category_id="cs.AI", category_name="Artificial Intelligence"
+    )
+    assert not summary_agent._category_agent.run.called
+    summary_agent._identify_latest_day.assert_called_once_with("cs.AI")
+
+
+def make_run_result(output) -> AgentRunResult:
+    return AgentRunResult(
+        output=output,
+        _output_tool_name=None,
+        _state=None,
+        _new_message_index=None,
+        _traceparent_value=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_summary_agent_range():
+    """Each day with articles is summarised, then the days are combined."""
+    model = "google-gla:gemini-2.0-flash"
+    summary_agent = SummaryAgent(model)
+    summary_agent._identify_latest_day = MagicMock(return_value="2025-03-28")
+
+    listings = {
+        "2025-03-26": [{"abstract": "A1"}, {"abstract": "A2"}],
+        "2025-03-27": [],
+        "2025-03-28": [{"abstract": "A3"}],
+    }
+    summary_agent._load_listings = MagicMock(
+        side_effect=lambda category, day, end_day, latest_day: {day: listings[day]}
+    )
+
+    prompts = []
+
+    async def run(prompt):
+        prompts.append(prompt)
+        return make_run_result(Summary(summary=f"Summary #{len(prompts)}"))
+
+    summary_agent._summary_agent = MagicMock()
+    summary_agent._summary_agent.run = AsyncMock(side_effect=run)
+
+    category = Category(category_id="cs.CL", category_name="Computation and Language")
+    # the range is capped to the latest day
+    response = await summary_agent.summarise_category_range(
+        category, "2025-03-26", "2025-03-30"
+    )
+
+    assert response.start_day == "2025-03-26"
+    assert response.end_day == "2025-03-28"
+    assert [(d.day, d.n_articles) for d in response.daily_summaries] == [
+        ("2025-03-26", 2),
+        ("2025-03-28", 1),
+    ]
+    assert summary_agent._load_listings.call_count == 3
+    # two days and the combination of their summaries
+    assert len(prompts) == 3
+    assert 'part="2025-03-26"' in prompts[-1]
+    assert response.summary == "Summary #3"
+
+
+@pytest.mark.asyncio
+async def test_summary_agent_range_batches_long_days():
+    """Abstracts too long for one call are summarised in batches."""
+    model = "google-gla:gemini-2.0-flash"
+    summary_agent = SummaryAgent(model)
+    summary_agent._max_batch_tokens = 3
+    summary_agent._load_listings = MagicMock(
+        return_value={"2025-03-28": [{"abstract": "x" * 8} for _ in range(3)]}
+    )
+    summary_agent._summary_agent = MagicMock()
+    summary_agent._summary_agent.run = AsyncMock(
+        return_value=make_run_result(Summary(summary="Summary"))
+    )
+
+    category = Category(category_id="cs.CL", category_name="Computation and Language")
+    response = await summary_agent.summarise_category_range(
+        category, "2025-03-28", "2025-03-28", latest_day="2025-03-28"
+    )
+
+    # three batches and their combination
+    assert summary_agent._summary_agent.run.await_count == 4
+    assert response.daily_summaries[0].n_articles == 3
+
+
+def test_batch_by_tokens():
+    texts = ["x" * 40, "x" * 40, "x" * 40, "x" * 400]
+    # 10 tokens each, and 100 for the last
+    assert batch_by_tokens(texts, 25) == [texts[:2], texts[2:3], texts[3:]]
+    assert batch_by_tokens(texts, 1000) == [texts]
+    assert batch_by_tokens([], 25) == []
+
+
+@pytest.mark.asyncio
+async def test_summarise_large_listing_map_reduce():
+    """A listing over the token budget is summarised in concurrent batches, then reduced."""
+    summary_agent = SummaryAgent("google-gla:gemini-2.0-flash", max_batch_tokens=50)
+    summary_agent._retrieve_recent_articles = MagicMock(
+        return_value=[f"Abstract {i} " + "x" * 80 for i in range(6)]
+    )
+
+    running, most_running, prompts = 0, 0, []
+
+    async def run(prompt):
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        prompts.append(prompt)
+        return make_run_result(Summary(summary=f"Summary #{len(prompts)}"))
+
+    summary_agent._summary_agent = MagicMock()
+    summary_agent._summary_agent.run = AsyncMock(side_effect=run)
+
+    category = Category(category_id="cs.LG", category_name="Machine Learning")
+    response = await summary_agent.summarise(category, latest_day="2025-03-28")
+
+    # three batches of two abstracts, summarised at the same time, then reduced
+    assert len(prompts) == 4
+    assert most_running == 3
+    assert all(p.count("Abstract") == 2 for p in prompts[:3])
+    assert 'part="part 3"' in prompts[-1]
+    assert response.summary == "Summary #4"
+
+
+@pytest.mark.asyncio
+async def test_summarise_clustered_listing():
+    """Big listings are grouped by topic, and only representatives are sent."""
+    summary_agent = SummaryAgent("google-gla:gemini-2.0-flash", cluster=True)
+    summary_agent._min_cluster_articles = 4
+    summary_agent._n_representatives = 2
+    abstracts = [
+        f"Galaxy survey {i} with a radio telescope and dark matter halos."
+        for i in range(5)
+    ] + [f"Protein folding {i} of enzyme mutants in cells." for i in range(3)]
+    summary_agent._retrieve_recent_articles = MagicMock(return_value=abstracts)
+    summary_agent._summary_agent = MagicMock()
+    summary_agent._clustered_summary_agent = MagicMock()
+    summary_agent._clustered_summary_agent.run = AsyncMock(
+        return_value=make_run_result(
+            ClusteredSummary(summary="Astronomy and biology.", labels=["Galaxies"])
+        )
+    )
+
+    category = Category(category_id="q-bio", category_name="Quantitative Biology")
+    with patch("askademic.clustering.default_n_clusters", return_value=2):
+        response = await summary_agent.summarise(category, latest_day="2025-03-28")
+
+    prompt = summary_agent._clustered_summary_agent.run.await_args.args[0]
+    assert prompt.count("<abstract>") == 4
+    assert 'articles="5"' in prompt and 'articles="3"' in prompt
+    assert not summary_agent._summary_agent.run.called
+    assert response.summary == "Astronomy and biology."
+    assert [(t.label, t.n_articles) for t in response.topics] == [
+        ("Galaxies", 5),
+        (", ".join(response.topics[1].keywords), 3),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_summarise_pipelined():
+    """The first page is summarised while the next one is being fetched."""
+    summary_agent = SummaryAgent("google-gla:gemini-2.0-flash", pipelined=True)
+    first_summary_started = threading.Event()
+
+    def stream_listing(category, day, latest_day, page_size):
+        yield [{"abstract": "A1"}, {"abstract": "A2"}]
+        # the second page only arrives once the first is being summarised
+        assert first_summary_started.wait(timeout=5)
+        yield [{"abstract": "A3"}]
+
+    summary_agent._stream_listing = stream_listing
+    summary_agent._retrieve_recent_articles = MagicMock()
+
+    prompts = []
+
+    async def run(prompt):
+        prompts.append(prompt)
+        first_summary_started.set()
+        return make_run_result(Summary(summary=f"Summary #{len(prompts)}"))
+
+    summary_agent._summary_agent = MagicMock()
+    summary_agent._summary_agent.run = AsyncMock(side_effect=run)
+
+    category = Category(category_id="cs.LG", category_name="Machine Learning")
+    response = await summary_agent.summarise(category, latest_day="2025-03-28")
+
+    assert not summary_agent._retrieve_recent_articles.called
+    # a summary per page, then their combination
+    assert len(prompts) == 3
+    assert "A1" in prompts[0] and "A3" in prompts[1]
+    assert 'part="part 2"' in prompts[2]
+    assert response.summary == "Summary #3"
+
+
+@pytest.mark.asyncio
+async def test_summary_agent_range_too_long():
+    summary_agent = SummaryAgent("google-gla:gemini-2.0-flash")
+    category = Category(category_id="cs.CL", category_name="Computation and Language")
+    with pytest.raises(ValueError):
+        await summary_agent.summarise_category_range(
+            category, "2025-01-01", "2025-03-28", latest_day="2025-03-28"
+        )
+
+
+@pytest.mark.asyncio
+async def test_summary_agent_many_categories(tmp_path):
+    """Categories are summarised concurrently, within the limit, then synthesised."""
+    model = "google-gla:gemini-2.0-flash"
+    summary_agent = SummaryAgent(model, max_concurrency=2)
+    summary_agent._category_classifier = CategoryClassifier(
+        decisions_path=tmp_path / "decisions.json"
+    )
+    summary_agent._identify_latest_day = MagicMock(return_value="2025-03-28")
+    summary_agent._retrieve_recent_articles = MagicMock(return_value=["abstract"])
+
+    running, most_running, prompts = 0, 0, []
+
+    async def run(prompt):
+        nonlocal running, most_running
+        prompts.append(prompt)
+        running += 1
+        most_running = max(most_running, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return make_run_result(Summary(summary=f"Summary #{len(prompts)}"))
+
+    summary_agent._summary_agent = MagicMock()
+    summary_agent._summary_agent.run = AsyncMock(side_effect=run)
+
+    response = await summary_agent.summarise_many(
+        ["cs.LG", "stat.ML", "cs.CL", "computation and language"]
+    )
+
+    assert [s.category.category_id for s in response.summaries] == [
+        "cs.LG",
+        "stat.ML",
+        "cs.CL",
+    ]
+    assert most_running == 2
+    # three summaries and the synthesis
+    assert len(prompts) == 4
+    assert 'category="Computation and Language (cs.CL)"' in prompts[-1]
+    assert response.summary == "Summary #4"
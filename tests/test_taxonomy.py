@@ -0,0 +1,70 @@
+import pytest
+
+from askademic.taxonomy import get_taxonomy
+from askademic.tools import find_categories
+from askademic.utils import list_categories
+
+
+def test_taxonomy_is_built_once():
+    assert get_taxonomy() is get_taxonomy()
+    assert list_categories() is list_categories()
+
+
+def test_taxonomy_is_read_only():
+    taxonomy = get_taxonomy()
+    with pytest.raises(TypeError):
+        taxonomy.categories["xx.YY"] = None
+    with pytest.raises(TypeError):
+        list_categories()["Something"] = "xx.YY"
+
+
+def test_lookup():
+    taxonomy = get_taxonomy()
+    assert taxonomy.get("cs.cl").name == "Computation and Language"
+    assert taxonomy.get("Computation and Language").id == "cs.CL"
+    assert taxonomy.get("NLP").id == "cs.CL"
+    assert taxonomy.get("Machine Learning").id == "cs.LG"
+    assert taxonomy.get("nothing like this") is None
+    assert taxonomy.canonical_id("cs.IT") == "math.IT"
+    assert "CS.AI" in taxonomy
+
+
+def test_hierarchy():
+    taxonomy = get_taxonomy()
+    category = taxonomy.get("astro-ph.GA")
+    assert category.archive == "astro-ph"
+    assert category.group == "Physics"
+    assert "astro-ph" in taxonomy.groups["Physics"]
+    assert [c.id for c in taxonomy.children("hep-th")] == ["hep-th"]
+    assert len(taxonomy.children("cs")) > 30
+
+
+def test_list_categories():
+    categories = list_categories()
+    assert categories["Artificial Intelligence"] == "cs.AI"
+    assert categories["Machine Learning"] == "cs.LG"
+    assert categories["Machine Learning (stat.ML)"] == "stat.ML"
+    assert len(categories) == len(get_taxonomy())
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("cs.CV", ["cs.CV"]),
+        ("vision", ["cs.CV"]),
+        ("galax", ["astro-ph.GA"]),
+        ("machine learning", ["cs.LG", "stat.ML"]),
+        ("machine lerning", ["cs.LG"]),
+        ("hep", ["hep-ex", "hep-lat", "hep-ph", "hep-th"]),
+    ],
+)
+def test_find(query, expected):
+    assert [c.id for c in get_taxonomy().find(query)] == expected
+
+
+def test_find_categories_tool():
+    assert find_categories("computer vision") == {
+        "cs.CV": "Computer Vision and Pattern Recognition"
+    }
+    assert find_categories("zzzz") == {}
+    assert len(find_categories("astro-ph")) == 6
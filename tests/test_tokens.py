@@ -0,0 +1,92 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+from askademic.tokens import (
+    TokenBudget,
+    clip_to_tokens,
+    context_window,
+    count_tokens,
+    estimate_tokens,
+    fit_records,
+    turn_budget,
+)
+from askademic.tools import fit_article, get_article, save_article_to_cache
+
+
+@pytest.fixture(autouse=True)
+def no_tokenizer():
+    """Count with the heuristic, so that the tests do not depend on tiktoken."""
+    with patch("askademic.tokens._get_encoding", return_value=None):
+        yield
+
+
+def test_count_and_clip_without_tokenizer():
+    assert estimate_tokens("") == 0
+    assert count_tokens("x" * 41) == 11
+    assert clip_to_tokens("x" * 100, 5) == "x" * 20
+    assert clip_to_tokens("x" * 100, 0) == ""
+
+
+def test_budget_sizes_outputs_to_what_remains():
+    budget = TokenBudget(total=1000, max_share=0.5, min_tokens=100)
+    assert budget.allowance() == 500
+
+    assert budget.spend("x" * 2000) == "x" * 2000
+    assert budget.remaining == 500
+    assert budget.allowance() == 250
+
+    budget.spend("x" * 4000)
+    assert budget.remaining == 0
+    assert budget.spent == 1000
+    # a tool never gets less than the minimum
+    assert budget.allowance() == 100
+
+
+def test_fit_records_clips_abstracts_then_drops_records():
+    records = [{"title": f"T{i}", "abstract": "x" * 400} for i in range(4)]
+    assert fit_records(records, 10_000) == records
+
+    fitted = fit_records(records, 200)
+    assert len(fitted) == 4
+    assert count_tokens(json.dumps(fitted)) <= 200
+    assert all(r["abstract"].endswith("...") for r in fitted)
+    assert [r["title"] for r in fitted] == ["T0", "T1", "T2", "T3"]
+
+    fitted = fit_records(records, 20)
+    assert 0 < len(fitted) < 4
+    assert count_tokens(json.dumps(fitted)) <= 20
+
+
+def test_turn_budget_follows_context_window():
+    assert context_window("google-gla:gemini-2.0-flash") == 1_048_576
+    assert context_window("anthropic:claude-3-5-sonnet-latest") == 200_000
+    assert context_window("openai:some-model") == 128_000
+    assert turn_budget("google-gla:gemini-2.0-flash") == 100_000
+    assert turn_budget("openai:some-model") == 64_000
+
+
+def test_fit_article_keeps_closing_tag():
+    article = '<article url="u">\n' + "x" * 1000 + "\n</article>"
+    assert fit_article(article, None) == article
+    assert fit_article(article, 1000) == article
+
+    fitted = fit_article(article, 100)
+    assert fitted.startswith('<article url="u">')
+    assert fitted.endswith("[...]\n</article>")
+    assert count_tokens(fitted) <= 100
+
+
+def test_cached_article_records_tokens(tmp_path):
+    url = "https://arxiv.org/pdf/2401.00001.pdf"
+    content = '<article url="u">\n' + "x" * 1000 + "\n</article>"
+    with patch("askademic.tools.get_cache_path", return_value=tmp_path):
+        save_article_to_cache(url, content)
+        (cache_file,) = tmp_path.glob("*.json")
+        assert json.loads(cache_file.read_text())["tokens"] == count_tokens(content)
+
+        with patch("askademic.tools.requests.get") as mock_get:
+            assert get_article(url) == content
+            assert len(get_article(url, max_tokens=50)) < len(content)
+            assert not mock_get.called
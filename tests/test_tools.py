@@ -1,6 +1,10 @@
+import threading
 from unittest.mock import MagicMock, patch
 
-from askademic.tools import get_article, identify_latest_day
+import pandas as pd
+
+from askademic.tokens import ARTICLE_MAX_TOKENS, count_tokens
+from askademic.tools import get_article, identify_latest_day, search_articles
 
 
 @patch("askademic.tools.requests.get")
@@ -81,6 +85,37 @@ def test_get_article_is_curtailed():
     # a book
     article = get_article("http://arxiv.org/pdf/1302.6946")
 
-    assert len(article) == 70058  # max len + xml tags
+    assert count_tokens(article) <= ARTICLE_MAX_TOKENS
     assert article.startswith("<article url=")
-    assert article.endswith("</article>")
+    assert article.endswith("[...]\n</article>")
+
+
+@patch("askademic.tools.get_http_client")
+@patch("askademic.tools.organise_api_response_as_dataframe")
+def test_search_articles_indexes_in_background(mock_organise, mock_client):
+    mock_organise.return_value = pd.DataFrame(
+        [
+            {
+                "id": "http://arxiv.org/abs/2401.00001v1",
+                "title": "Attention",
+                "abstract": "An abstract.",
+            }
+        ]
+    )
+    release, indexed = threading.Event(), threading.Event()
+    seen = []
+
+    def slow_index(records):
+        release.wait(5)
+        seen.extend(records)
+        indexed.set()
+
+    with patch("askademic.tools.index_articles", side_effect=slow_index):
+        df = search_articles("attention", prefix="ti")
+        # the search returned while the indexing is still blocked
+        assert len(df) == 1
+        mock_client.return_value.get.assert_called_once()
+        assert not indexed.is_set()
+        release.set()
+        assert indexed.wait(5)
+    assert seen[0]["id"] == "2401.00001"
@@ -0,0 +1,57 @@
+import pytest
+
+from askademic.utils import (
+    extract_arxiv_id,
+    find_arxiv_id,
+    find_arxiv_ids,
+    reciprocal_rank_fusion,
+)
+
+
+@pytest.mark.parametrize(
+    "link,expected",
+    [
+        ("https://arxiv.org/pdf/1706.03762.pdf", "1706.03762"),
+        ("https://arxiv.org/abs/1706.03762v5", "1706.03762"),
+        ("http://arxiv.org/pdf/2401.00001v2", "2401.00001"),
+        ("1706.03762", "1706.03762"),
+        ("http://arxiv.org/abs/hep-th/9901001v1", "hep-th/9901001"),
+        ("math.GT/0309136", "math.GT/0309136"),
+        ("not-a-valid-link", None),
+    ],
+)
+def test_extract_arxiv_id(link, expected):
+    assert extract_arxiv_id(link) == expected
+
+
+def test_extract_arxiv_id_keep_version():
+    assert (
+        extract_arxiv_id("https://arxiv.org/abs/1706.03762v5", True) == "1706.03762v5"
+    )
+    assert extract_arxiv_id("1706.03762", keep_version=True) == "1706.03762"
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("Explain https://arxiv.org/abs/1706.03762v5 please", "1706.03762"),
+        ("What does 1706.03762 say?", "1706.03762"),
+        ("what is in (hep-th/9901001)?", "hep-th/9901001"),
+        ("What is attention?", None),
+        ("Who won the election 2024.12345", None),
+    ],
+)
+def test_find_arxiv_id(text, expected):
+    assert find_arxiv_id(text) == expected
+
+
+def test_reciprocal_rank_fusion():
+    rankings = [["a", "b", "c"], ["b", "d"], ["b", "a"]]
+    assert reciprocal_rank_fusion(rankings) == ["b", "a", "d", "c"]
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_find_arxiv_ids():
+    assert find_arxiv_ids(
+        "Compare 1706.03762, https://arxiv.org/pdf/1810.04805v2 and 1706.03762"
+    ) == ["1706.03762", "1810.04805"]
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from askademic.vector_index import HashingEmbedder, TfidfSvdEmbedder, VectorIndex
+
+ABSTRACTS = {
+    "2401.00001": "We study attention mechanisms in transformer language models.",
+    "2401.00002": "Lyapunov exponents characterise chaos in dynamical systems.",
+    "2401.00003": "Superconductivity in twisted bilayer graphene at low temperature.",
+    "2401.00004": "Transformer language models scale with attention and data.",
+}
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = VectorIndex(path=tmp_path)
+    index.add(list(ABSTRACTS), list(ABSTRACTS.values()))
+    return index
+
+
+def test_hashing_embedder_is_normalized_and_deterministic():
+    embedder = HashingEmbedder(dim=64)
+    a = embedder(["attention in transformers"])
+    b = embedder(["attention in transformers"])
+    assert a.shape == (1, 64)
+    assert a.dtype == np.float32
+    assert np.allclose(a, b)
+    assert np.isclose(np.linalg.norm(a), 1.0)
+
+
+def test_add_skips_existing_ids(index):
+    assert len(index) == 4
+    added = index.add(["2401.00001", "2401.00005"], ["duplicate", "new abstract"])
+    assert added == 1
+    assert len(index) == 5
+    assert "2401.00005" in index
+
+
+def test_search_returns_most_similar(index):
+    results = index.search("attention in transformer language models", k=2)
+    ids = [arxiv_id for arxiv_id, _ in results[0]]
+    assert set(ids) == {"2401.00001", "2401.00004"}
+    scores = [score for _, score in results[0]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_search_batched_queries(index):
+    results = index.search(
+        ["chaos in dynamical systems", "graphene superconductivity"], k=1, batch_size=2
+    )
+    assert results[0][0][0] == "2401.00002"
+    assert results[1][0][0] == "2401.00003"
+
+
+def test_reopen_index(index, tmp_path):
+    reopened = VectorIndex(path=tmp_path)
+    assert len(reopened) == 4
+    assert reopened.search("lyapunov chaos", k=1)[0][0][0] == "2401.00002"
+
+
+def test_interrupted_append_is_dropped(index, tmp_path):
+    # vectors written without their IDs, as if the process died in between
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(index.embedder(["orphan"]).tobytes())
+    assert len(index) == 4
+
+    index.add(["2401.00005"], ["Chaotic dynamical systems."])
+    assert len(index) == 5
+    assert (tmp_path / "vectors.f32").stat().st_size == 5 * 4 * index.dim
+    assert index.search("chaotic dynamical systems", k=1)[0][0][0] == "2401.00005"
+
+
+def test_reopen_with_different_embedder_fails(index, tmp_path):
+    with pytest.raises(ValueError):
+        VectorIndex(path=tmp_path, embedder=HashingEmbedder(dim=32))
+
+
+def test_partitioned_search(index):
+    index.build_partitions(n_partitions=2)
+    assert index.is_partitioned
+    index.add(["2401.00005"], ["Chaotic dynamical systems and Lyapunov exponents."])
+    results = index.search("lyapunov exponents chaos", k=2, n_probe=2)
+    ids = [arxiv_id for arxiv_id, _ in results[0]]
+    assert set(ids) == {"2401.00002", "2401.00005"}
+
+
+def test_interrupted_append_to_partitioned_index(index, tmp_path):
+    index.build_partitions(n_partitions=2)
+    # vectors and partitions written without their IDs
+    with open(tmp_path / "vectors.f32", "ab") as f:
+        f.write(index.embedder(["orphan"]).tobytes())
+    with open(tmp_path / "partitions.i32", "ab") as f:
+        f.write(np.array([0], dtype=np.int32).tobytes())
+
+    index.add(["2401.00005"], ["Chaotic dynamical systems and Lyapunov exponents."])
+    assert (tmp_path / "partitions.i32").stat().st_size == 5 * 4
+    results = index.search("lyapunov exponents chaos", k=2, n_probe=2)
+    assert {arxiv_id for arxiv_id, _ in results[0]} == {"2401.00002", "2401.00005"}
+
+
+def test_empty_index(tmp_path):
+    index = VectorIndex(path=tmp_path)
+    assert len(index) == 0
+    assert index.search("anything") == [[]]
+
+
+def test_tfidf_svd_embedder(tmp_path):
+    texts = list(ABSTRACTS.values()) * 2
+    embedder = TfidfSvdEmbedder(dim=3).fit(texts)
+    vectors = embedder(texts)
+    assert vectors.shape == (len(texts), 3)
+
+    embedder.save(tmp_path / "embedder.npz")
+    loaded = TfidfSvdEmbedder.load(tmp_path / "embedder.npz")
+    assert np.allclose(loaded(texts), vectors)